@@ -1,43 +1,1693 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pandas as pd
+import numpy as np
 import json
 import re
+import regex
 import nltk
 import string
 import unicodedata
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict, deque
 import emoji
 import requests
 from urllib.parse import urlparse
 import threading
+import queue
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from spellchecker import SpellChecker
 import stanza
 import os
+import sys
+import gc
+import io
+import glob
+import html
+import fnmatch
+import codecs
+import mmap
 import difflib
+import time
+import hashlib
+import math
+import multiprocessing
+import platform
+import bisect
+import zlib
+import random
+import tracemalloc
+from array import array
+from contextlib import contextmanager, nullcontext
+
+# Unicode-aware word pattern for the "regex" tokenizer backend: letter/digit runs
+# (Turkish letters and combining marks included) that keep apostrophe suffixes
+# attached (Ankara'ya, don't), plus runs of remaining symbols like NLTK emits them.
+REGEX_TOKEN_PATTERN = regex.compile(r"\w+(?:['’]\w+)*|[^\w\s]+")
+
+TOKENIZER_BACKENDS = ["nltk", "regex"]
+
+# Processing options and their defaults (the GUI checkboxes start from these)
+DEFAULT_OPTIONS = {
+    'lowercase': True,
+    'punctuation': True,
+    'special_chars': True,
+    'numbers': False,
+    'normalize': True,
+    'tokenize': True,
+    'stopwords': True,
+    'lemmatize': True,
+    'negation': True,
+    'spellcheck': False,
+    'use_custom_corrections': True,
+    'tokenizer': "nltk",
+    'max_tokens': 0,  # per-row token budget for the model stage (0: no limit)
+    'min_tokens': 0,  # rows with fewer tokens are dropped before the model stage
+    'truncation': "head",
+}
+TRUNCATION_POLICIES = ["head", "head_tail"]
+
+
+LANGUAGES = ["turkish", "english"]
+AUTO_LANGUAGE = "auto"  # detect the language of every row
+
+
+# Turkish casefolding: I/İ lowercase to ı/i instead of i/i̇
+TURKISH_LOWER_TABLE = str.maketrans({'I': 'ı', 'İ': 'i'})
+TURKISH_CHARS = frozenset("çğıöşüÇĞİÖŞÜ")
+
+
+def turkish_lower(text):
+    """str.lower() with Turkish dotted/dotless I"""
+    return text.translate(TURKISH_LOWER_TABLE).lower()
+
+
+class TurkishDeasciifier:
+    """Restores ç/ğ/ı/ö/ş/ü in Turkish typed on an ASCII keyboard.
+
+    Words are first looked up in a table of known words by their ASCII form
+    (dogru -> doğru). Unknown words are decided character by character from
+    a context table: for each ambiguous letter (c, g, i, o, s, u) the number
+    of known words with its plain and accented form after/before 2, 1 and 0
+    letters, looked up from the widest context down. A letter is only
+    accented on strong evidence, as unknown words are often loanwords and
+    brands (super, not şuper). Words in
+    `keep` (English stopwords in mixed reviews) are left as they are. Only
+    rows without any Turkish letter are deasciified, whole words at a time:
+    words with other non-ASCII letters are skipped, the rest are looked up
+    lowercased and get their case back (Dogru -> Doğru). Results are
+    memoized per token.
+    """
+    ASCII_TABLE = str.maketrans("çğıöşü", "cgiosu")
+    ACCENTED = {'c': 'ç', 'g': 'ğ', 'i': 'ı', 'o': 'ö', 's': 'ş', 'u': 'ü'}
+    UPPER = {'ı': 'I', 'i': 'İ'}
+    WORD_PATTERN = re.compile(r"[a-z]+")
+    TEXT_WORD_PATTERN = re.compile(r"\b[^\W\d_]+\b")
+    # Minimum evidence for accenting a letter of an unknown word
+    MIN_CONTEXT_COUNT = 10
+    MIN_ACCENTED_SHARE = 0.9
+    SEED_WORDS = (
+        "doğru sağlık öğrenci öğretmen eğitim türkiye türkçe üniversite havalimanı yoğurt "
+        "düşünce araştırma gelişme kullanıcı teşekkür ederim güzel mükemmel çok için değil "
+        "şey gibi göre ürün ürünü kargo hızlı hızlıydı satıcı fiyatı kalitesi beğendim memnun "
+        "teslimat sipariş siparişim geldi değişim iade tavsiye ediyorum başarılı sorunsuz "
+        "kötü büyük küçük yavaş şık kullanışlı özellikle öneririm aldım aldığım işe yaradı"
+    ).split()
+
+    def __init__(self, words, keep=()):
+        self.known = {word: word for word in keep if self.WORD_PATTERN.fullmatch(word)}
+        best = {}
+        self.contexts = defaultdict(lambda: [0, 0])  # (width, left, letter, right) -> [plain, accented] words
+        for word, count in words.items():
+            plain = word.translate(self.ASCII_TABLE)
+            if not self.WORD_PATTERN.fullmatch(plain):
+                continue
+            if count > best.get(plain, 0) or plain in self.known and plain not in best:
+                best[plain] = count
+                self.known[plain] = word
+            padded = f"  {plain}  "
+            for i, letter in enumerate(plain):
+                if letter in self.ACCENTED:
+                    accented = word[i] != letter
+                    for width in (2, 1, 0):
+                        key = (width, padded[i + 2 - width:i + 2], letter, padded[i + 3:i + 3 + width])
+                        self.contexts[key][accented] += 1
+        self.contexts = dict(self.contexts)
+        self.memo = {}
+
+    @classmethod
+    def from_lexicon(cls, stopwords=(), lexicon=None, keep=()):
+        """Deasciifier knowing the seed words, Turkish stopwords and a {word: count} lexicon"""
+        words = Counter(dict.fromkeys(cls.SEED_WORDS, 1))
+        words.update(turkish_lower(word) for word in stopwords)
+        words.update(lexicon or {})
+        return cls(words, keep)
+
+    def deasciify_word(self, word):
+        result = self.memo.get(word)
+        if result is not None:
+            return result
+        result = self.known.get(word)
+        if result is None:
+            letters = list(word)
+            padded = f"  {word}  "
+            for i, letter in enumerate(word):
+                if letter not in self.ACCENTED:
+                    continue
+                for width in (2, 1, 0):
+                    counts = self.contexts.get((width, padded[i + 2 - width:i + 2], letter,
+                                                padded[i + 3:i + 3 + width]))
+                    if counts is not None and counts[0] + counts[1] >= self.MIN_CONTEXT_COUNT:
+                        if counts[1] >= self.MIN_ACCENTED_SHARE * (counts[0] + counts[1]):
+                            letters[i] = self.ACCENTED[letter]
+                        break
+            result = ''.join(letters)
+        if len(self.memo) > 500000:
+            self.memo.clear()
+        self.memo[word] = result
+        return result
+
+    def deasciify_text_word(self, word):
+        """deasciify_word for a word of any case; non-ASCII words are kept"""
+        if not word.isascii():
+            return word
+        lower = word.lower()
+        result = self.deasciify_word(lower)
+        if result == lower:
+            return word
+        if lower == word:
+            return result
+        return ''.join(self.UPPER.get(new, new.upper()) if old.isupper() else new
+                       for old, new in zip(word, result))
+
+    def deasciify(self, text, typed=None):
+        """Text with Turkish letters restored in its ASCII words.
+
+        typed is the row as it was before Turkish casefolding made ı of its
+        I: the row counts as ASCII-typed when typed has no Turkish letter,
+        and the ı of the fold are read as i again.
+        """
+        if not TURKISH_CHARS.isdisjoint(text if typed is None else typed):
+            return text
+        if typed is not None:
+            text = text.replace('ı', 'i')
+        return self.TEXT_WORD_PATTERN.sub(lambda match: self.deasciify_text_word(match.group()), text)
+
+
+class LanguageDetector:
+    """Fast character n-gram (1-3) naive Bayes language identifier.
+
+    Profiles are built from the stopword lists plus a few seed sentences, which
+    is enough to separate Turkish and English review text. Only the first
+    `max_chars` characters of a row are looked at.
+    """
+
+    SEED_TEXT = {
+        'turkish': [
+            "ürün çok güzel geldi kargo hızlıydı teşekkür ederim",
+            "fiyatına göre kaliteli bir ürün tavsiye ediyorum herkese",
+            "beklediğim gibi değildi iade etmek istiyorum maalesef",
+            "kullanışlı ve şık tasarımı var ama biraz pahalı buldum",
+            "siparişim zamanında ulaştı paketleme özenliydi memnun kaldım",
+            "fiyat performans urunu kargo hizli geldi satici ilgiliydi",
+            "urunu begendim rengi resimdeki gibi kumasi kalitesiz olmus",
+            "bedeni buyuk geldi degisim yaptim sorunsuz halledildi",
+        ],
+        'english': [
+            "the product arrived quickly and works great thank you",
+            "good quality for the price i would recommend it to everyone",
+            "not what i expected i want to return it unfortunately",
+            "useful and stylish design but a little expensive",
+            "my order was delivered on time and well packaged very happy",
+            "this is the best purchase i have made love the color and size",
+            "the seller was helpful but the shipping took too long",
+            "cheap material broke after two weeks would not buy again",
+        ],
+    }
+    WORD_PATTERN = regex.compile(r"\p{L}+")
+    TURKISH_ONLY_CHARS = frozenset("ğışĞŞİ")
+
+    def __init__(self, samples, default="turkish", max_chars=300):
+        self.default = default
+        self.max_chars = max_chars
+        counts = {language: Counter() for language in samples}
+        for language, texts in samples.items():
+            for text in texts:
+                for word in self.WORD_PATTERN.findall(self.casefold(text)):
+                    counts[language].update(self.ngrams(word))
+
+        vocabulary_size = len(set().union(*counts.values())) + 1
+        self.log_probs = {}
+        self.unseen_log_prob = {}
+        for language, language_counts in counts.items():
+            total = sum(language_counts.values()) + vocabulary_size
+            self.log_probs[language] = {gram: math.log((n + 1) / total) for gram, n in language_counts.items()}
+            self.unseen_log_prob[language] = math.log(1 / total)
+
+    @classmethod
+    def from_stopwords(cls, stopwords, default="turkish"):
+        samples = {language: list(stopwords.get(language, [])) + cls.SEED_TEXT[language]
+                   for language in LANGUAGES}
+        return cls(samples, default)
+
+    @staticmethod
+    def casefold(text):
+        # "I" is left to lower(): it is far more common in English than in Turkish
+        return text.replace('İ', 'i').lower()
+
+    @staticmethod
+    def ngrams(word):
+        padded = f" {word} "
+        return [padded[i:i + n] for n in (1, 2, 3) for i in range(len(padded) - n + 1)
+                if n > 1 or padded[i] != ' ']
+
+    def detect(self, text):
+        """Most likely language of a text (the default for empty/unknown text)"""
+        if text is None or (not isinstance(text, str) and pd.isna(text)):
+            return self.default
+        text = str(text)[:self.max_chars]
+        if 'turkish' in self.log_probs and not self.TURKISH_ONLY_CHARS.isdisjoint(text):
+            return 'turkish'
+        text = self.casefold(text)
+
+        grams = [gram for word in self.WORD_PATTERN.findall(text) for gram in self.ngrams(word)]
+        if not grams:
+            return self.default
+        best_language, best_score = self.default, None
+        for language, log_probs in self.log_probs.items():
+            unseen = self.unseen_log_prob[language]
+            score = sum(log_probs.get(gram, unseen) for gram in grams)
+            if best_score is None or score > best_score:
+                best_language, best_score = language, score
+        return best_language
+
+
+STANZA_LANGUAGE_CODES = {'turkish': 'tr', 'english': 'en'}
+
+
+def current_rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+        except ImportError:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def process_rss_bytes(pid):
+    """Resident set size of another process (0 where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def process_memory(pid='self'):
+    """RSS, PSS and USS (private pages) of a process in bytes, from smaps_rollup (Linux).
+
+    Elsewhere only RSS is known; PSS and USS are then reported as RSS.
+    """
+    memory = {'rss': 0, 'pss': 0, 'uss': 0}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key == 'Rss':
+                    memory['rss'] = int(value.split()[0]) * 1024
+                elif key == 'Pss':
+                    memory['pss'] = int(value.split()[0]) * 1024
+                elif key in ('Private_Clean', 'Private_Dirty'):
+                    memory['uss'] += int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        rss = current_rss_bytes() if pid == 'self' else process_rss_bytes(pid)
+        memory = {'rss': rss, 'pss': rss, 'uss': rss}
+    return memory
+
+
+def set_torch_threads(threads):
+    """Set torch's intra-op thread count (unchanged when threads is falsy).
+
+    Returns the previous count, or None when torch is unavailable.
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    previous = torch.get_num_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    return previous
+
+
+# Worker processes are forked from an engine with everything loaded; they
+# find it here instead of receiving it through pickling.
+FORK_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+_WORKER_ENGINE = None
+
+
+def _init_worker(torch_threads):
+    set_torch_threads(torch_threads)
+    # Allocations of the workers aren't traced (see MemoryProfiler)
+    if _WORKER_ENGINE is not None:
+        _WORKER_ENGINE.memory_profiler = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _worker_clean_texts(job):
+    texts, language, options, languages = job
+    _WORKER_ENGINE.skipped = Counter()
+    features = []
+    results = _WORKER_ENGINE.clean_texts(texts, language, options, languages, features)
+    return results, _WORKER_ENGINE.skipped, features
+
+
+def _worker_tokenize_texts(job):
+    return _WORKER_ENGINE.tokenize_texts(*job)
+
+
+def _worker_plan_tokens(job):
+    return _WORKER_ENGINE.plan_token_strings(*job)
+
+
+def _worker_prepare_texts(job):
+    texts, language, options, languages = job
+    _WORKER_ENGINE.skipped = Counter()
+    features = []
+    rows = _WORKER_ENGINE.prepare_texts(texts, language, options, languages, features)
+    return rows, _WORKER_ENGINE.skipped, features
+
+
+def _worker_read_csv_range(job):
+    return CsvRowIndex.read_range(*job)
+
+
+class TuningProfile:
+    """Best torch threads / worker processes / Stanza batch rows per machine (JSON file).
+
+    Entries are keyed by host name, architecture and CPU count, so one file
+    can be shared between machines.
+    """
+    DEFAULTS = {'torch_threads': None, 'workers': 1, 'batch_rows': 64}
+
+    def __init__(self, path="tuning_profile.json"):
+        self.path = path
+
+    @staticmethod
+    def machine_key():
+        return f"{platform.node()}|{platform.machine()}|{os.cpu_count()} cpu"
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self):
+        """Settings for this machine (defaults when it was never tuned)"""
+        settings = dict(self.DEFAULTS)
+        settings.update(self.read().get(self.machine_key(), {}))
+        return settings
+
+    def save(self, settings):
+        profiles = self.read()
+        profiles[self.machine_key()] = settings
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(profiles, f, ensure_ascii=False, indent=2)
+
+
+class Vocabulary:
+    """Interned token strings with integer IDs, shared by the token stages.
+
+    Between tokenization and output, rows are carried as array('i') ID
+    sequences, so each distinct token exists once as a string. Per-token
+    results of the stages (see AdvancedTextProcessor.token_plan) are memoized
+    per ID in `memo` and are dropped together with the vocabulary.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+        self.memo = {}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def id(self, token):
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.strings)
+            self.strings.append(token)
+        return token_id
+
+    def encode(self, tokens):
+        ids = self.ids
+        return array('i', [ids[token] if token in ids else self.id(token) for token in tokens])
+
+    def decode(self, ids):
+        strings = self.strings
+        return [strings[token_id] for token_id in ids]
+
+    def negated(self, token_id):
+        """ID of '<token>_NEG'"""
+        negated = self.memo.setdefault('negated', {})
+        result = negated.get(token_id)
+        if result is None:
+            result = negated[token_id] = self.id(f"{self.strings[token_id]}_NEG")
+        return result
+
+
+class SymSpellIndex:
+    """Symmetric-delete spelling index (SymSpell) over a word frequency lexicon.
+
+    Every lexicon word is indexed under the strings made by deleting up to
+    max_distance characters from its first prefix_length characters. A
+    lookup generates the same deletes of the input and verifies the hits
+    with a bounded edit distance, so no edit candidates are enumerated.
+    Delete strings are stored as crc32 hashes packed with the word number
+    into one sorted array('Q'); hash collisions only add candidates that
+    the distance check rejects. The index is written to a binary file with
+    a JSON header and reloaded when the lexicon fingerprint matches.
+    """
+    FORMAT = 1
+
+    def __init__(self, words, counts, keys, max_distance=2, prefix_length=7, fingerprint=None):
+        self.words = words  # sorted
+        self.counts = counts
+        self.keys = keys
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.fingerprint = fingerprint
+        self.longest = max(map(len, words), default=0)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        i = bisect.bisect_left(self.words, word)
+        return i < len(self.words) and self.words[i] == word
+
+    @staticmethod
+    def deletes(word, distance):
+        """word and every string made by deleting up to `distance` characters (min. 1 char left)"""
+        found = {word}
+        frontier = found
+        for _ in range(distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            found |= frontier
+        return found
+
+    @classmethod
+    def build(cls, frequencies, max_distance=2, prefix_length=7, fingerprint=None):
+        """Index a {word: count} lexicon"""
+        words = sorted(word for word in frequencies if word)
+        counts = array('Q', [frequencies[word] for word in words])
+        crc32 = zlib.crc32
+        keys = array('Q')
+        for number, word in enumerate(words):
+            keys.extend((crc32(delete.encode('utf-8')) << 32) | number
+                        for delete in cls.deletes(word[:prefix_length], max_distance))
+        return cls(words, counts, array('Q', sorted(keys)), max_distance, prefix_length, fingerprint)
+
+    def save(self, path):
+        words = '\n'.join(self.words).encode('utf-8')
+        header = {'format': self.FORMAT, 'fingerprint': self.fingerprint, 'byteorder': sys.byteorder,
+                  'max_distance': self.max_distance, 'prefix_length': self.prefix_length,
+                  'words': len(self.words), 'words_bytes': len(words), 'keys': len(self.keys)}
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(words)
+            self.counts.tofile(f)
+            self.keys.tofile(f)
+
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """Index saved at path, or None when missing, unreadable or built from another lexicon"""
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if (header.get('format') != cls.FORMAT or header.get('byteorder') != sys.byteorder
+                        or header.get('fingerprint') != fingerprint):
+                    return None
+                words = f.read(header['words_bytes']).decode('utf-8').split('\n') if header['words'] else []
+                counts = array('Q')
+                counts.fromfile(f, header['words'])
+                keys = array('Q')
+                keys.fromfile(f, header['keys'])
+        except (OSError, ValueError, EOFError, KeyError):
+            return None
+        return cls(words, counts, keys, header['max_distance'], header['prefix_length'], fingerprint)
+
+    @staticmethod
+    def edit_distance(a, b, limit):
+        """Optimal string alignment distance of a and b, or limit + 1 once it exceeds limit"""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        # Common prefix and suffix don't change the distance
+        start = 0
+        while start < len(a) and start < len(b) and a[start] == b[start]:
+            start += 1
+        end = 0
+        while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+            end += 1
+        a, b = a[start:len(a) - end], b[start:len(b) - end]
+        if not a or not b:
+            return max(len(a), len(b))
+        previous2 = None
+        previous = list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            current = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cost = a[i - 1] != b[j - 1]
+                value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if (cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+                        and previous2[j - 2] + 1 < value):
+                    value = previous2[j - 2] + 1
+                current[j] = value
+            if min(current) > limit:
+                return limit + 1
+            previous2, previous = previous, current
+        return previous[-1] if previous[-1] <= limit else limit + 1
+
+    @staticmethod
+    def strip_diacritics(word):
+        return ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c))
+
+    def lookup(self, word, max_distance=None):
+        """Closest lexicon word as (word, distance), or None.
+
+        Ranked by distance, then words differing only in diacritics (hic for
+        hiç), then frequency. Numbers and words much longer than any lexicon
+        word are not looked up.
+        """
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if word in self:
+            return word, 0
+        if len(word) > self.longest + limit or word.replace('.', '', 1).isdigit():
+            return None
+        plain = self.strip_diacritics(word)
+        keys = self.keys
+        prefix = word[:self.prefix_length]
+        best = None
+        seen = set()
+        # Words one edit away share a delete of depth <= 1 with the input, so
+        # the deeper deletes are only looked up when nothing that close exists
+        for depth in (1, limit) if limit > 1 else (limit,):
+            numbers = set()
+            for delete in self.deletes(prefix, depth):
+                low = zlib.crc32(delete.encode('utf-8')) << 32
+                start = bisect.bisect_left(keys, low)
+                end = bisect.bisect_left(keys, low + (1 << 32), start)
+                numbers.update(key & 0xFFFFFFFF for key in keys[start:end])
+            numbers -= seen
+            seen |= numbers
+            for number in numbers:
+                candidate = self.words[number]
+                distance = self.edit_distance(word, candidate, limit)
+                if distance > limit:
+                    continue
+                rank = (distance, self.strip_diacritics(candidate) != plain, -self.counts[number], candidate)
+                if best is None or rank < best:
+                    best = rank
+                    limit = distance  # farther candidates can't win any more
+            if best is not None and best[0] <= 1:
+                break
+        return (best[3], best[0]) if best is not None else None
+
+    @staticmethod
+    def read_lexicon(path):
+        """{word: count} from a 'word count' per line text file (count defaults to 1)"""
+        frequencies = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if parts:
+                    count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+                    frequencies[parts[0]] = frequencies.get(parts[0], 0) + count
+        return frequencies
+
+    @staticmethod
+    def write_lexicon(path, frequencies):
+        with open(path, 'w', encoding='utf-8') as f:
+            for word, count in sorted(frequencies.items(), key=lambda item: (-item[1], item[0])):
+                f.write(f"{word} {count}\n")
+
+
+class StageTimer:
+    """Accumulated wall time per pipeline stage (see AdvancedTextProcessor.stage)"""
 
-class AdvancedTextProcessor:
     def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("Advanced Text Processor - Gelişmiş Metin İşleyici v3.0")
-        self.root.geometry("1000x700")
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def total(self):
+        return sum(self.seconds.values())
+
+
+class MemoryProfiler:
+    """Python allocations (tracemalloc) per pipeline stage and run phase, plus sampled RSS.
+
+    stage() is entered like StageTimer.stage around the batch-level stages
+    of clean_texts (see AdvancedTextProcessor.stage); every call adds its
+    net allocation, peak above the start and RSS change, and the first call
+    of a stage also keeps a snapshot diff of its top allocation sites.
+    phase() wraps the few coarse steps of a run (load, process, save) and
+    always keeps the snapshot diff. A background thread samples the RSS,
+    which also covers memory tracemalloc doesn't see (torch tensors, numpy
+    buffers allocated in C). Allocations of worker processes are not seen;
+    their memory is reported by measure_worker_memory.
+    """
+
+    IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                     "<unknown>")
+
+    def __init__(self, top=10, sample_interval=0.1, max_samples=2000):
+        self.top = top
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.stages = {}
+        self.phases = {}
+        self.open_frames = []
+        self.samples = []
+        self.peak_rss = 0
+        self.peak_traced = 0
+        self.current_phase = None
+        self.started = None
+        self.started_tracing = False
+        self.sampler = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.started = time.perf_counter()
+        self.start_rss = current_rss_bytes()
+        self.start_snapshot = self.snapshot()
+        self.stopping.clear()
+        self.sampler = threading.Thread(target=self.sample_rss, daemon=True)
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        """Stop tracing and sampling; returns the report"""
+        self.stopping.set()
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+        self.fold_peak()
+        end_snapshot = self.snapshot()
+        report = self.report(end_snapshot)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        return report
+
+    def sample_rss(self):
+        while True:
+            rss = current_rss_bytes()
+            self.peak_rss = max(self.peak_rss, rss)
+            self.samples.append((round(time.perf_counter() - self.started, 3), rss, self.current_phase))
+            if len(self.samples) > self.max_samples:
+                # Keep every other sample and sample half as often
+                self.samples = self.samples[::2]
+                self.sample_interval *= 2
+            if self.stopping.wait(self.sample_interval):
+                return
+
+    @staticmethod
+    def snapshot():
+        return tracemalloc.take_snapshot()
+
+    def top_sites(self, before, after):
+        """Largest net allocation sites between two snapshots"""
+        sites = []
+        # Filtering the grouped statistics is much cheaper than Snapshot.filter_traces on every trace
+        for diff in after.compare_to(before, 'lineno'):
+            frame = diff.traceback[0]
+            if frame.filename in self.IGNORED_FILES:
+                continue
+            sites.append({'site': f"{frame.filename}:{frame.lineno}", 'size_bytes': diff.size_diff,
+                          'count': diff.count_diff})
+            if len(sites) == self.top:
+                break
+        return sites
+
+    def fold_peak(self):
+        """Carry the traced peak into the open frames before tracemalloc's peak is reset"""
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak_traced = max(self.peak_traced, peak)
+        for frame in self.open_frames:
+            frame['peak'] = max(frame['peak'], peak)
+
+    @contextmanager
+    def measure(self, entry, snapshot):
+        self.fold_peak()
+        tracemalloc.reset_peak()
+        before = self.snapshot() if snapshot else None
+        current = tracemalloc.get_traced_memory()[0]
+        frame = {'start': current, 'peak': current}
+        self.open_frames.append(frame)
+        rss = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fold_peak()
+            self.open_frames.remove(frame)
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+            entry['net_bytes'] += tracemalloc.get_traced_memory()[0] - frame['start']
+            entry['peak_bytes'] = max(entry['peak_bytes'], frame['peak'] - frame['start'])
+            entry['rss_delta_bytes'] += current_rss_bytes() - rss
+            if before is not None:
+                entry['top'] = self.top_sites(before, self.snapshot())
+
+    @staticmethod
+    def new_entry():
+        return {'calls': 0, 'seconds': 0.0, 'net_bytes': 0, 'peak_bytes': 0, 'rss_delta_bytes': 0, 'top': []}
+
+    def stage(self, name):
+        """Measure one call of a pipeline stage (top sites of the first call only)"""
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = self.new_entry()
+        return self.measure(entry, snapshot=entry['calls'] == 0)
+
+    @contextmanager
+    def phase(self, name):
+        """Measure a step of the run, with the top allocation sites of its net allocation"""
+        entry = self.phases.setdefault(name, self.new_entry())
+        outer, self.current_phase = self.current_phase, name
+        try:
+            with self.measure(entry, snapshot=True):
+                yield
+        finally:
+            self.current_phase = outer
+
+    def report(self, end_snapshot):
+        return {
+            'seconds': round(time.perf_counter() - self.started, 3),
+            'start_rss_bytes': self.start_rss,
+            'end_rss_bytes': current_rss_bytes(),
+            'peak_rss_bytes': self.peak_rss,
+            'peak_traced_bytes': self.peak_traced,
+            'phases': self.phases,
+            'stages': self.stages,
+            # What the run allocated and still holds at the end (results, caches, frames...)
+            'top_sites': self.top_sites(self.start_snapshot, end_snapshot),
+            'rss_samples': [list(sample) for sample in self.samples],
+        }
+
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler of one thread, with collapsed-stack and flame graph output.
+
+    A background thread reads the stack of the profiled thread every
+    `interval` seconds (sys._current_frames). Samples are kept per stack of
+    code objects and written as collapsed stacks ("a;b;c count" lines, the
+    input format of flamegraph.pl and speedscope) and as a self-contained
+    SVG flame graph. summary() attributes every sample to the innermost
+    AREAS function on its stack and splits it into time in this module and
+    in library code (leaf frame in another file). Worker processes are not
+    sampled, so profiled runs clean in-process.
+
+    The sampler needs the GIL to read a stack. While it waits, the profiled
+    thread keeps the GIL until the switch interval ends or it blocks (I/O,
+    print), which would pile samples up on blocking calls; a short switch
+    interval during profiling keeps the samples evenly spread.
+    """
+
+    AREAS = OrderedDict([
+        ('stanza_lemmatize', ('stanza_lemmatize', 'stanza_lemmatize_batch', 'stanza_lemmatize_ids',
+                              'lemmatize_segments')),
+        ('spell_check_tokens', ('spell_check_tokens', 'correct_token')),
+        ('clean_text', ('clean_text', 'clean_texts')),
+    ])
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self.seconds = 0.0
+        self.sampler = None
+        self.stopping = threading.Event()
+        self.area_of_name = {name: area for area, names in self.AREAS.items() for name in names}
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval / 20))
+        self.started = time.perf_counter()
+        self.stopping.clear()
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+            sys.setswitchinterval(self.switch_interval)
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def sample(self):
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    @staticmethod
+    def frame_name(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)})".replace(';', ':')
+
+    def collapsed(self):
+        """{collapsed stack: samples}, root first"""
+        lines = Counter()
+        for stack, count in self.stacks.items():
+            lines[';'.join(self.frame_name(code) for code in stack)] += count
+        return lines
+
+    def area(self, stack):
+        """AREAS name of the innermost area function of this module on a stack ('other' if none)"""
+        for code in reversed(stack):
+            if code.co_filename == __file__:
+                area = self.area_of_name.get(code.co_name)
+                if area is not None:
+                    return area
+        return 'other'
+
+    def summary(self, top=15):
+        """Per-area and per-function sample shares"""
+        total = max(self.samples, 1)
+        areas = defaultdict(lambda: [0, 0])  # area -> [samples, samples with a library leaf]
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            entry = areas[self.area(stack)]
+            entry[0] += count
+            if stack[-1].co_filename != __file__:
+                entry[1] += count
+            own[self.frame_name(stack[-1])] += count
+            for name in {self.frame_name(code) for code in stack}:
+                inclusive[name] += count
+        return {
+            'samples': self.samples,
+            'seconds': self.seconds,
+            'interval': self.interval,
+            'areas': {area: {'share': samples / total, 'library_share': library / total}
+                      for area, (samples, library) in sorted(areas.items(), key=lambda item: -item[1][0])},
+            'own': [(name, count / total) for name, count in own.most_common(top)],
+            'inclusive': [(name, count / total) for name, count in inclusive.most_common(top)],
+        }
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.collapsed().items()):
+                f.write(f"{stack} {count}\n")
+
+    def write_svg(self, path, title="Flame graph", width=1200, row_height=16, min_width=0.5):
+        """Flame graph of the collapsed stacks (root at the bottom, frame width = share of samples)"""
+        root = {'children': {}, 'count': 0}
+        for stack, count in self.collapsed().items():
+            node = root
+            node['count'] += count
+            for name in stack.split(';'):
+                node = node['children'].setdefault(name, {'children': {}, 'count': 0})
+                node['count'] += count
+
+        def depth_of(node):
+            return 1 + max((depth_of(child) for child in node['children'].values()), default=0)
+
+        depth = depth_of(root)
+        height = (depth + 2) * row_height
+        scale = (width - 20) / max(root['count'], 1)
+        rects = []
+
+        def draw(name, node, x, level):
+            node_width = node['count'] * scale
+            if node_width < min_width:
+                return
+            y = height - (level + 1) * row_height
+            share = node['count'] / max(root['count'], 1)
+            digest = zlib.crc32(name.encode('utf-8'))
+            color = f"rgb({205 + digest % 50},{80 + (digest >> 8) % 130},{(digest >> 16) % 60})"
+            label = name if len(name) * 7 < node_width else name[:max(int(node_width / 7) - 2, 0)] + '..'
+            label = html.escape(label) if node_width > 21 else ''
+            rects.append(f'<g><title>{html.escape(name)} ({node["count"]} samples, {share:.1%})</title>'
+                         f'<rect x="{x:.1f}" y="{y}" width="{node_width:.1f}" height="{row_height - 1}" '
+                         f'fill="{color}" rx="2"/><text x="{x + 3:.1f}" y="{y + row_height - 4}">{label}</text></g>')
+            child_x = x
+            for child_name, child in sorted(node['children'].items()):
+                draw(child_name, child, child_x, level + 1)
+                child_x += child['count'] * scale
+
+        draw('all', root, 10, 0)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                    f'font-family="Verdana, sans-serif" font-size="11">\n'
+                    f'<rect width="100%" height="100%" fill="#f8f8f0"/>\n'
+                    f'<text x="{width / 2}" y="{row_height}" text-anchor="middle" font-size="14">'
+                    f'{html.escape(title)}</text>\n')
+            f.write('\n'.join(rects))
+            f.write('\n</svg>\n')
+
+
+class RunningStats:
+    """Count, mean and variance of a stream of numbers (Welford's algorithm)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class HeavyHitters:
+    """Approximate top-K frequencies in bounded memory (Space-Saving, batched).
+
+    Counts of a chunk are merged at once. When more than twice `capacity` items
+    are tracked, only the `capacity` largest are kept; items seen afterwards
+    start from the largest dropped count, so every count is an over-estimate
+    by at most that floor.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0
+
+    def update(self, counter):
+        counts = self.counts
+        for item, n in counter.items():
+            counts[item] = counts.get(item, self.floor) + n
+        if len(counts) > 2 * self.capacity:
+            ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            self.floor = max(self.floor, ranked[self.capacity][1])
+            self.counts = dict(ranked[:self.capacity])
+
+    def top(self, k=10):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class StreamingStats:
+    """Statistics of a processed column, accumulated chunk by chunk while it is processed"""
+
+    def __init__(self, top_capacity=1000):
+        self.rows = 0
+        self.original_non_empty = 0
+        self.processed_empty = 0
+        self.original_length = RunningStats()
+        self.processed_length = RunningStats()
+        self.tokens = RunningStats()
+        self.top_tokens = HeavyHitters(top_capacity)
+        self.top_bigrams = HeavyHitters(top_capacity)
+        self.languages = Counter()
+        self.skipped = Counter()  # early exits by stage (see AdvancedTextProcessor.EARLY_EXITS)
+
+    def add(self, originals, processed, languages=None):
+        """Add a chunk of original texts with their processed versions (and row languages)"""
+        token_counts = Counter()
+        bigram_counts = Counter()
+        for original, text in zip(originals, processed):
+            self.rows += 1
+            if not pd.isna(original):
+                self.original_non_empty += 1
+                self.original_length.add(len(str(original)))
+            self.processed_length.add(len(text))
+            if not text:
+                self.processed_empty += 1
+            tokens = text.split()
+            self.tokens.add(len(tokens))
+            token_counts.update(tokens)
+            bigram_counts.update(zip(tokens, tokens[1:]))
+        self.top_tokens.update(token_counts)
+        self.top_bigrams.update(bigram_counts)
+        if languages is not None:
+            self.languages.update(languages)
+
+
+class StanzaModelPool:
+    """Per-language Stanza pipelines, loaded on first use and shared by the run.
+
+    When the resident size of the loaded models exceeds memory_budget_mb, the
+    least recently used pipelines are dropped (the one just requested is always
+    kept). Load times and model sizes are kept for report().
+    """
+
+    def __init__(self, memory_budget_mb=None, **pipeline_kwargs):
+        self.memory_budget_mb = memory_budget_mb
+        self.pipeline_kwargs = pipeline_kwargs
+        self.models = OrderedDict()  # language -> pipeline, least recently used first
+        self.sizes = {}
+        self.load_times = {}
+        self.failed = {}
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def get(self, language):
+        """Pipeline for a language, loading it if needed; None if unavailable"""
+        with self.lock:
+            pipeline = self.models.get(language)
+            if pipeline is not None:
+                self.models.move_to_end(language)
+                return pipeline
+            code = STANZA_LANGUAGE_CODES.get(language)
+            if code is None or language in self.failed:
+                return None
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                pipeline = stanza.Pipeline(code, verbose=False, **self.pipeline_kwargs)
+            except Exception as e:
+                print(f"Stanza '{code}' modeli yüklenemedi: {e}")
+                self.failed[language] = str(e)
+                return None
+            self.load_times[language] = time.perf_counter() - start
+            self.sizes[language] = max(self.model_size(pipeline), current_rss_bytes() - rss_before)
+            self.models[language] = pipeline
+            self.evict(keep=language)
+            return pipeline
+
+    def evict(self, keep=None):
+        """Drop least recently used pipelines until the budget is respected"""
+        if not self.memory_budget_mb:
+            return
+        budget = self.memory_budget_mb * 1024 * 1024
+        while sum(self.sizes[language] for language in self.models) > budget and len(self.models) > 1:
+            language = next(iter(self.models))
+            if language == keep:
+                self.models.move_to_end(language)
+                continue
+            del self.models[language]
+            self.evictions += 1
+            print(f"Stanza '{language}' modeli bellek sınırı nedeniyle kaldırıldı")
+        gc.collect()
+
+    @staticmethod
+    def torch_modules(pipeline):
+        """torch modules held by the processors of a pipeline"""
+        for processor in getattr(pipeline, 'processors', {}).values():
+            trainer = getattr(processor, '_trainer', None)
+            for module in (getattr(processor, '_model', None), getattr(trainer, 'model', None)):
+                if module is not None and hasattr(module, 'parameters'):
+                    yield module
+
+    @classmethod
+    def model_size(cls, pipeline):
+        """Bytes held by the torch parameters/buffers of a pipeline's processors"""
+        total = 0
+        seen = set()
+        for module in cls.torch_modules(pipeline):
+            for tensor in list(module.parameters()) + list(module.buffers()):
+                if tensor.data_ptr() not in seen:
+                    seen.add(tensor.data_ptr())
+                    total += tensor.numel() * tensor.element_size()
+        return total
+
+    def share_memory(self):
+        """Move the weights of all loaded models to shared memory (before forking workers)"""
+        with self.lock:
+            for pipeline in self.models.values():
+                for module in self.torch_modules(pipeline):
+                    if hasattr(module, 'share_memory'):
+                        module.share_memory()
+
+    def report(self):
+        """Load time and size of every model the pool has seen"""
+        with self.lock:
+            return [{
+                'language': language,
+                'loaded': language in self.models,
+                'load_seconds': round(self.load_times.get(language, 0.0), 2),
+                'size_mb': round(self.sizes.get(language, 0) / (1024 * 1024), 1),
+                'error': self.failed.get(language),
+            } for language in sorted(set(self.load_times) | set(self.failed))]
+
+
+class RunCheckpoint:
+    """Append-only JSONL checkpoint of a processing run.
+
+    The first line is a header identifying the run (input file identity,
+    options fingerprint, language, columns); every further line holds a chunk
+    of processed rows of one column. Chunks are buffered and flushed (with
+    fsync) every `every_rows` rows or `every_seconds` seconds, so an
+    interrupted run loses at most one interval of work.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path, header, completed=None, every_rows=1000, every_seconds=30.0, features=None):
+        self.path = path
+        self.header = header
+        self.completed = completed or {column: [] for column in header['columns']}
+        # ROW_FEATURES counts per completed row (None where a chunk has none)
+        self.features = features or {column: [None] * len(rows) for column, rows in self.completed.items()}
+        self.every_rows = every_rows
+        self.every_seconds = every_seconds
+        self.pending_lines = []
+        self.pending_rows = 0
+        self.last_flush = time.monotonic()
+
+    @staticmethod
+    def path_for(input_path):
+        return f"{input_path}.checkpoint.jsonl"
+
+    @staticmethod
+    def file_identity(path, sample_bytes=65536):
+        """Size, mtime and a hash of the first/last bytes of a file"""
+        stat = os.stat(path)
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            digest.update(f.read(sample_bytes))
+            if stat.st_size > sample_bytes:
+                f.seek(max(stat.st_size - sample_bytes, sample_bytes))
+                digest.update(f.read(sample_bytes))
+        return {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sample_sha1': digest.hexdigest(),
+        }
+
+    @classmethod
+    def make_header(cls, input_path, fingerprint, language, columns, resources=None):
+        return {
+            'version': cls.VERSION,
+            'input': cls.file_identity(input_path),
+            'fingerprint': fingerprint,
+            'resources': resources,
+            'language': language,
+            'columns': list(columns),
+        }
+
+    @classmethod
+    def load(cls, path, header):
+        """(completed rows, row features) per column from a checkpoint matching header, or None"""
+        if not os.path.exists(path):
+            return None
+        completed = {column: [] for column in header['columns']}
+        features = {column: [] for column in header['columns']}
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                if json.loads(f.readline()) != header:
+                    return None
+            except ValueError:
+                return None
+            for line in f:
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    break  # partially written last line
+                rows = completed.get(chunk.get('column'))
+                if rows is None or chunk.get('start') != len(rows):
+                    break
+                rows.extend(chunk['rows'])
+                chunk_features = chunk.get('features') or [None] * len(chunk['rows'])
+                features[chunk['column']].extend(None if row is None else tuple(row) for row in chunk_features)
+        return completed, features
+
+    @classmethod
+    def start(cls, input_path, fingerprint, language, columns, resume=False, resources=None, **kwargs):
+        """Open the checkpoint of a run, continuing a matching one if resume is set"""
+        path = cls.path_for(input_path)
+        header = cls.make_header(input_path, fingerprint, language, columns, resources)
+        loaded = cls.load(path, header) if resume else None
+        if loaded is None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            loaded = (None, None)
+        completed, features = loaded
+        return cls(path, header, completed, features=features, **kwargs)
+
+    def completed_rows(self):
+        return sum(len(rows) for rows in self.completed.values())
+
+    def add(self, column, start, rows, features=None):
+        """Record processed rows (and their ROW_FEATURES counts) of a column; start is the index of rows[0]"""
+        self.completed[column].extend(rows)
+        self.features[column].extend(features or [None] * len(rows))
+        line = {'column': column, 'start': start, 'rows': rows}
+        if features is not None:
+            line['features'] = features
+        self.pending_lines.append(json.dumps(line, ensure_ascii=False))
+        self.pending_rows += len(rows)
+        if (self.pending_rows >= self.every_rows
+                or time.monotonic() - self.last_flush >= self.every_seconds):
+            self.flush()
+
+    def flush(self):
+        if self.pending_lines:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(self.pending_lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending_lines = []
+            self.pending_rows = 0
+        self.last_flush = time.monotonic()
+
+    def discard(self):
+        """Remove the checkpoint once its results are safely written"""
+        self.pending_lines = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CsvRowIndex:
+    """Byte offsets of the records of a CSV file, every `every`-th record.
+
+    The file is memory-mapped and scanned in blocks with numpy: a newline
+    ends a record only when the number of double quotes before it is even,
+    so newlines inside quoted fields (multi-line review texts) don't split
+    rows, and escaped quotes ("") keep the parity. Blank lines are skipped
+    like pandas does. Offsets split the file into byte ranges that parse
+    independently (read_csv_parallel) and let readers seek to a row without
+    re-scanning; the index can be saved next to the input
+    (<input>.rowindex) and is reused while the file is unchanged.
+    """
+    FORMAT = 1
+    BLOCK_BYTES = 1 << 24
+
+    def __init__(self, offsets, rows, header_end, size, every=1000, identity=None):
+        self.offsets = offsets  # array('Q'): start of data rows 0, every, 2 * every, ...
+        self.rows = rows
+        self.header_end = header_end
+        self.size = size
+        self.every = every
+        self.identity = identity
+
+    @staticmethod
+    def path_for(input_path):
+        return f"{input_path}.rowindex"
+
+    @classmethod
+    def build(cls, path, every=1000):
+        """Scan a CSV file for its record boundaries"""
+        identity = RunCheckpoint.file_identity(path)
+        size = identity['size']
+        offsets = array('Q')
+        rows = 0
+        header_end = None
+        if size == 0:
+            return cls(offsets, 0, 0, 0, every, identity)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = np.frombuffer(data, np.uint8)
+            parity = 0
+            for block_start in range(0, size, cls.BLOCK_BYTES):
+                block = view[block_start:block_start + cls.BLOCK_BYTES]
+                # uint8 sums wrap around, the parity stays right
+                quotes = np.cumsum(block == 34, dtype=np.uint8)
+                starts = np.flatnonzero((block == 10) & ((quotes + parity) & 1 == 0)) + (block_start + 1)
+                parity = (parity + int(quotes[-1])) & 1
+                if header_end is None:
+                    if not len(starts):
+                        continue
+                    header_end = int(starts[0])
+                starts = starts[starts < size]
+                # Blank lines aren't rows
+                blank = (view[starts] == 10) | ((view[starts] == 13) & (view[np.minimum(starts + 1, size - 1)] == 10))
+                starts = starts[~blank]
+                selected = starts[(np.arange(rows, rows + len(starts)) % every) == 0]
+                offsets.extend(selected.tolist())
+                rows += len(starts)
+            del view, block  # views of the map must be gone before it closes
+        return cls(offsets, rows, size if header_end is None else header_end, size, every, identity)
+
+    def save(self, path):
+        header = {'format': self.FORMAT, 'identity': self.identity, 'byteorder': sys.byteorder,
+                  'rows': self.rows, 'header_end': self.header_end, 'size': self.size, 'every': self.every,
+                  'offsets': len(self.offsets)}
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            self.offsets.tofile(f)
+
+    @classmethod
+    def load(cls, path, identity):
+        """Index saved at path, or None when missing, unreadable or made for another file state"""
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if (header.get('format') != cls.FORMAT or header.get('byteorder') != sys.byteorder
+                        or header.get('identity') != identity):
+                    return None
+                offsets = array('Q')
+                offsets.fromfile(f, header['offsets'])
+        except (OSError, ValueError, EOFError, KeyError):
+            return None
+        return cls(offsets, header['rows'], header['header_end'], header['size'], header['every'], identity)
+
+    @classmethod
+    def open(cls, input_path, every=1000, persist=False):
+        """The saved index of a file while it is current, else a new one (saved if persist is set)"""
+        index = cls.load(cls.path_for(input_path), RunCheckpoint.file_identity(input_path))
+        if index is None:
+            index = cls.build(input_path, every)
+            if persist:
+                index.save(cls.path_for(input_path))
+        return index
+
+    @staticmethod
+    def header_length(path, block_bytes=1 << 20):
+        """Bytes up to the end of the header record (quote-aware, like build)"""
+        with open(path, 'rb') as f:
+            position = 0
+            parity = 0
+            for block in iter(lambda: f.read(block_bytes), b''):
+                ends = np.flatnonzero(np.frombuffer(block, np.uint8) == 10)
+                quotes = np.cumsum(np.frombuffer(block, np.uint8) == 34, dtype=np.uint8)
+                ends = ends[(quotes[ends] + parity) & 1 == 0]
+                if len(ends):
+                    return position + int(ends[0]) + 1
+                parity = (parity + int(quotes[-1])) & 1
+                position += len(block)
+        return position
+
+    @staticmethod
+    def decodes(path, encoding, block_bytes=1 << 24):
+        """Whether the whole file decodes with an encoding"""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(block_bytes), b''):
+                    decoder.decode(block)
+                decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def seek(self, row):
+        """(byte offset of the nearest indexed row at or before `row`, rows to skip from there)"""
+        if row >= self.rows:
+            return self.size, 0
+        return self.offsets[row // self.every], row % self.every
+
+    def ranges(self, parts):
+        """Up to `parts` byte ranges of about equal size that start and end on record boundaries"""
+        if not self.rows:
+            return []
+        cuts = {self.offsets[0]}
+        for k in range(1, parts):
+            target = self.header_end + (self.size - self.header_end) * k // parts
+            cuts.add(self.offsets[min(bisect.bisect_left(self.offsets, target), len(self.offsets) - 1)])
+        cuts = sorted(cuts) + [self.size]
+        return list(zip(cuts, cuts[1:]))
+
+    @staticmethod
+    def read_range(path, encoding, header_end, start, end, nrows=None, dtype=None):
+        """Rows in a byte range of a CSV file as a DataFrame (with the header from the file start)"""
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            buffer = io.BytesIO(data[:header_end] + data[start:end])
+        return pd.read_csv(buffer, encoding=encoding, nrows=nrows, dtype=dtype)
+
+    def read_rows(self, path, start, count, encoding='utf-8'):
+        """Rows start .. start + count - 1 of the file, parsed from the nearest indexed row"""
+        offset, skip = self.seek(start)
+        end = self.seek(start + count + self.every)[0]
+        frame = self.read_range(path, encoding, self.header_end, offset, end, skip + count).iloc[skip:]
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        return frame
+
+    def read_csv_parallel(self, path, encoding, workers):
+        """The whole file parsed as byte ranges in `workers` forked processes.
+
+        Column types are inferred per range. A column that is text in some
+        ranges and numbers in others is parsed again as text everywhere, as
+        a single read would have returned it.
+        """
+        jobs = [(path, encoding, self.header_end, start, end) for start, end in self.ranges(workers)]
+        if len(jobs) < 2:
+            return pd.read_csv(path, encoding=encoding)
+        with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+            parts = pool.map(_worker_read_csv_range, jobs)
+            kinds = {column: {part[column].dtype == object for part in parts} for column in parts[0].columns}
+            textual = {column: str for column, kind in kinds.items() if len(kind) > 1}
+            if textual:
+                parts = pool.map(_worker_read_csv_range, [job + (None, textual) for job in jobs])
+        return pd.concat(parts, ignore_index=True)
+
+
+class AppendWatermark:
+    """How far a growing input file has been processed into its output (process --append).
+
+    Saved next to the output (<output>.watermark.json) after every append
+    run: the processed prefix of the input (bytes, rows and sha1), the max
+    of the watermark column ('id' or 'date') when there is one, the last
+    comment_id written with its width, and the output size. The next run
+    checks the prefix checksum and parses only the bytes after it; when the
+    prefix changed (rewritten export), rows past the column maximum are
+    taken from the whole file instead.
+    """
+
+    VERSION = 1
+    AUTO_COLUMNS = ('id', 'date')
+
+    def __init__(self, input_path, fingerprint, columns, column=None, value=None, prefix_bytes=0,
+                 prefix_sha1=None, rows=0, last_id=0, id_digits=1, output_bytes=0):
+        self.input_path = input_path
+        self.fingerprint = fingerprint
+        self.columns = columns
+        self.column = column
+        self.value = value
+        self.prefix_bytes = prefix_bytes
+        self.prefix_sha1 = prefix_sha1
+        self.rows = rows
+        self.last_id = last_id
+        self.id_digits = id_digits
+        self.output_bytes = output_bytes
+
+    @staticmethod
+    def path_for(output_path):
+        return f"{output_path}.watermark.json"
+
+    @classmethod
+    def load(cls, path):
+        """Watermark saved at path, or None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.pop('version', None) != cls.VERSION:
+                return None
+            return cls(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path):
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.__dict__, version=self.VERSION), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def pick_column(cls, columns, choice='auto'):
+        """Watermark column for a --watermark-column choice ('auto', 'none' or a column name)"""
+        if choice == 'none':
+            return None
+        if choice == 'auto':
+            return next((column for column in cls.AUTO_COLUMNS if column in columns), None)
+        if choice not in columns:
+            raise ValueError(f"Watermark column '{choice}' not found")
+        return choice
+
+    @staticmethod
+    def column_values(values, column):
+        """Comparable values of a watermark column (dates for 'date' columns, else numbers)"""
+        if 'date' in column.lower():
+            return pd.to_datetime(values, errors='coerce')
+        return pd.to_numeric(values, errors='coerce')
+
+    @staticmethod
+    def complete_bytes(path):
+        """Size of the file up to its last newline (a row still being written is left for the next run)"""
+        size = os.path.getsize(path)
+        if not size:
+            return 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data.rfind(b'\n', 0, size) + 1 if data[size - 1:size] != b'\n' else size
+
+    @staticmethod
+    def prefix_digests(path, middle, end, block_bytes=1 << 24):
+        """sha1 hex digests of the first `middle` and first `end` bytes of a file, in one read"""
+        digest = hashlib.sha1()
+        middle_digest = None
+        position = 0
+        with open(path, 'rb') as f:
+            for stop in (middle, end):
+                while position < stop:
+                    block = f.read(min(block_bytes, stop - position))
+                    if not block:
+                        break
+                    digest.update(block)
+                    position += len(block)
+                if middle_digest is None:
+                    middle_digest = digest.hexdigest()
+        return middle_digest, digest.hexdigest()
+
+    @classmethod
+    def read_new_rows(cls, path, previous, fingerprint, columns, choice='auto'):
+        """(rows of the input past `previous`, watermark of the input after them, how they were found)"""
+        end = cls.complete_bytes(path)
+        header_end = CsvRowIndex.header_length(path)
+        start = header_end
+        prefix_ok = False
+        if previous is not None and header_end <= previous.prefix_bytes <= end:
+            middle_sha1, end_sha1 = cls.prefix_digests(path, previous.prefix_bytes, end)
+            prefix_ok = middle_sha1 == previous.prefix_sha1
+        else:
+            end_sha1 = cls.prefix_digests(path, 0, end)[1]
+        if prefix_ok:
+            start = previous.prefix_bytes
+        elif previous is not None and previous.column is None:
+            raise ValueError("The input changed before the watermark and has no id/date column to find "
+                             "the new rows; process the whole file again without --append")
+        try:
+            frame = CsvRowIndex.read_range(path, 'utf-8', header_end, start, max(start, end))
+        except UnicodeDecodeError:
+            frame = CsvRowIndex.read_range(path, 'latin-1', header_end, start, max(start, end))
+        rows_read = len(frame)
+
+        column = previous.column if previous is not None else cls.pick_column(frame.columns, choice)
+        value = previous.value if previous is not None else None
+        how = 'tail' if prefix_ok else ('full' if previous is None else 'column')
+        if column is not None:
+            values = cls.column_values(frame[column], column)
+            old_max = cls.column_values(pd.Series([value]), column)[0] if value is not None else None
+            if how == 'column' and old_max is not None:
+                # Rewritten export: past the old maximum only. Rows after an unchanged
+                # prefix are new whatever their value (same-day dates, unordered ids).
+                keep = ~(values <= old_max)
+                frame, values = frame[keep.values], values[keep.values]
+            if values.notna().any():
+                top = values.max()
+                if old_max is None or pd.isna(old_max) or top > old_max:
+                    value = top.isoformat() if hasattr(top, 'isoformat') else top.item()
+        rows = (previous.rows if prefix_ok else 0) + rows_read
+        mark = cls(os.path.abspath(path), fingerprint, list(columns), column, value, end, end_sha1, rows,
+                   previous.last_id if previous is not None else 0,
+                   previous.id_digits if previous is not None else None,
+                   previous.output_bytes if previous is not None else 0)
+        return frame.reset_index(drop=True), mark, how
+
+
+class AdvancedTextProcessor:
+    # Negation vocabularies shared by the staged (debug) and fused token paths
+    NEGATION_WORDS = {
+        'turkish': frozenset(['değil', 'yok', 'hiç', 'asla', 'hayır', 'olmaz', 'imkansız']),
+        'english': frozenset(['not', 'no', 'never', 'nothing', 'nobody', 'nowhere', 'neither']),
+    }
+    TURKISH_NEGATION_SUFFIXES = ('ma', 'me', 'maz', 'mez')
+    ENGLISH_CONTRACTIONS = ("n't", "nt")
+    CACHE_LIMIT = 500000  # entries per memo cache before it is cleared
+    TOKEN_DROP = -1  # plan_token outcomes besides a token ID
+    STANZA_SEGMENT_TOKENS = 200  # longer rows go to Stanza as several segments
+    STANZA_BATCH_TOKENS = 4000  # tokens per bulk Stanza call
+    PARALLEL_READ_BYTES = 32 * 1024 * 1024  # larger CSVs are parsed by the worker processes
+    SENTENCE_END_CHARS = ('.', '!', '?', '…')
+    TOKEN_NEGATE_NEXT = -2
+    # Max. edits of spelling index corrections; Turkish suffixes make unknown
+    # but valid word forms common, so only single edits are corrected there
+    SPELL_INDEX_DISTANCE = {'english': 2, 'turkish': 1}
+    # Early exits of rows that can't produce (enough) output, in pipeline order
+    EARLY_EXITS = {
+        'cached': "repeated text, served from the cache",
+        'preprocess': "empty after character cleanup (not tokenized)",
+        'tokenize': "no tokens (token stages skipped)",
+        'token_stages': "no tokens left after negation/stopwords/spell check",
+        'min_tokens': "fewer tokens than the minimum (dropped before Stanza)",
+    }
+    # Per-row counts captured while cleaning (clean_texts(features=...)),
+    # written as {prefix}_{name} columns next to the {prefix}_tokens count
+    ROW_FEATURES = ('negations', 'corrections', 'urls_removed', 'mentions_removed', 'emojis_removed')
+    NO_FEATURES = (0, 0, 0, 0, 0)
+    # Rating columns recognized for the sentiment column, in order of preference
+    RATING_COLUMNS = ('score', 'rating')
+    SENTIMENT_OF_RATING = {1.0: 'negative', 2.0: 'negative', 3.0: 'neutral', 4.0: 'positive', 5.0: 'positive'}
+
+    def __init__(self, headless=False, options=None):
+        # Headless mode (service/CLI): no Tk root, options come from a plain dict
+        self.headless = headless
+        self.options = dict(DEFAULT_OPTIONS, **(options or {}))
+        if not headless:
+            self.root = tk.Tk()
+            self.root.title("Advanced Text Processor - Gelişmiş Metin İşleyici v3.0")
+            self.root.geometry("1000x700")
+        else:
+            self.root = None
+
+        # Memo caches shared by all columns/rows of a session (see get_cache)
+        self.caches = {}
+        self.vocab = Vocabulary()
+        self._deasciifier = None  # see get_deasciifier
+        self.skipped = Counter()  # rows per early exit (see EARLY_EXITS)
+        # Optional StageTimer collecting per-stage cost of batch runs (see stage)
+        self.stage_timer = None
+        # Optional MemoryProfiler measuring the same stages and the phases of a run
+        self.memory_profiler = None
+        # SamplingProfiler of a profiled run (see start_profile)
+        self.run_profiler = None
 
         # Data variables
         self.df = None
         self.original_df = None
         self.current_file = None
+        self.run_checkpoint = None
         self.processing = False
 
         # Spell checkers
         self.init_spell_checkers()
 
-        # Stanza NLP pipeline
-        self.stanza_nlp = None
+        # Stanza NLP pipelines (Turkish is preloaded, other languages on first use)
+        self.stanza_pool = StanzaModelPool()
         self.stanza_ready = False
+        self.stanza_loaded = threading.Event()  # set once loading finished (ok or not)
+        
+        # Autotuned torch threads / worker processes / batch rows of this machine
+        self.tuning_profile = TuningProfile()
+        self.tuning = self.tuning_profile.load()
+        set_torch_threads(self.tuning['torch_threads'])
+        self.worker_memory = None  # memory report of the last multi-process run
+        self.pretokenized = None  # (language, text) -> (tokens, removed counts, early exit) during a vocabulary-first run
+        self.rating_column = None  # sentiment source; None picks the first of RATING_COLUMNS
+        self.vocabulary_report = None
         self.init_stanza_async()
 
         # Stopwords dosyası
         self.stopwords_file = "stopwords.json"
+        self._stopword_sets = {}
         self.load_stopwords()
 
         # Custom corrections (user-provided or learned from corpus)
@@ -46,14 +1696,16 @@ class AdvancedTextProcessor:
         self.load_custom_corrections_json(silent=True)
 
         # Ana GUI'yi oluştur
-        self.create_widgets()
+        if not headless:
+            self.create_widgets()
     
     def init_stanza_async(self):
         """Stanza'yı arka planda başlat"""
         def init_stanza():
             try:
                 print("Stanza NLP sistemi başlatılıyor...")
-                self.stanza_nlp = stanza.Pipeline('tr', verbose=False)
+                if self.stanza_pool.get('turkish') is None:
+                    raise RuntimeError(self.stanza_pool.failed.get('turkish'))
                 self.stanza_ready = True
                 print("✅ Stanza hazır!")
                 # GUI'yi güncelle
@@ -64,6 +1716,8 @@ class AdvancedTextProcessor:
                 self.stanza_ready = False
                 if hasattr(self, 'status_label'):
                     self.status_label.config(text="Durum: Stanza yüklenemedi ❌")
+            finally:
+                self.stanza_loaded.set()
         
         # Thread'de başlat
         threading.Thread(target=init_stanza, daemon=True).start()
@@ -85,6 +1739,93 @@ class AdvancedTextProcessor:
             self.spell_en = None
             self.spell_tr = None
         
+        # Symmetric-delete indexes (built or loaded on first use, see get_spell_index)
+        self.spell_indexes = {}
+        self.spell_index_lock = threading.Lock()
+    
+    def lexicon_file(self, language):
+        """Word frequency list ('word count' lines) the index of a language is built from"""
+        return f"lexicon_{language}.txt"
+    
+    def spell_lexicon_fingerprint(self, language):
+        """Identifies the lexicon of a language (None when there is none)"""
+        if language == "english":
+            if self.spell_en is None:
+                return None
+            frequency = self.spell_en.word_frequency
+            return f"pyspellchecker:{len(frequency.dictionary)}:{frequency.total_words}"
+        try:
+            with open(self.lexicon_file(language), 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest()[:16]
+        except OSError:
+            return None
+    
+    def get_spell_index(self, language):
+        """SymSpellIndex of a language, loaded from disk or built from its lexicon once (None without one)"""
+        if language in self.spell_indexes:
+            return self.spell_indexes[language]
+        with self.spell_index_lock:
+            if language not in self.spell_indexes:
+                self.spell_indexes[language] = self.load_spell_index(language)
+        return self.spell_indexes[language]
+    
+    def load_spell_index(self, language):
+        fingerprint = self.spell_lexicon_fingerprint(language)
+        if fingerprint is None:
+            return None
+        path = f"symspell_{language}.idx"
+        index = SymSpellIndex.load(path, fingerprint)
+        if index is not None:
+            return index
+        
+        if language == "english":
+            frequencies = self.spell_en.word_frequency.dictionary
+        else:
+            frequencies = SymSpellIndex.read_lexicon(self.lexicon_file(language))
+        start = time.perf_counter()
+        index = SymSpellIndex.build(frequencies, self.SPELL_INDEX_DISTANCE.get(language, 2),
+                                    fingerprint=fingerprint)
+        print(f"Built {language} spelling index ({len(index)} words) in {time.perf_counter() - start:.1f}s")
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Could not save spelling index {path}: {e}")
+        return index
+    
+    def learn_lexicon(self, file_paths, language="turkish", min_count=3):
+        """Add word counts from processed CSVs to the lexicon of a language and rebuild its index.
+
+        Counts the words of every '<column>_processed' column and of its
+        source column; words seen fewer than min_count times in total (mostly
+        typos) are left out. Returns the number of words in the lexicon.
+        """
+        counts = Counter()
+        word_pattern = regex.compile(r"[\p{L}\p{M}_]+")
+        for path in file_paths:
+            df = self.detect_and_read_csv(path)
+            for column in df.columns:
+                if not str(column).endswith('_processed'):
+                    continue
+                sources = [column, column[:-len('_processed')]]
+                for source in sources:
+                    if source not in df.columns:
+                        continue
+                    for text in df[source].dropna():
+                        # Bigrams and negation markers (x_y, x_NEG) are not words
+                        counts.update(token for token in word_pattern.findall(str(text).lower())
+                                      if len(token) > 1 and '_' not in token)
+        
+        path = self.lexicon_file(language)
+        frequencies = SymSpellIndex.read_lexicon(path) if os.path.exists(path) else {}
+        for word, count in counts.items():
+            if count >= min_count:
+                frequencies[word] = frequencies.get(word, 0) + count
+        SymSpellIndex.write_lexicon(path, frequencies)
+        with self.spell_index_lock:
+            self.spell_indexes.pop(language, None)
+        self.reset_caches()
+        return len(frequencies)
+        
     def download_nltk_data(self):
         """Download required NLTK data"""
         try:
@@ -96,16 +1837,163 @@ class AdvancedTextProcessor:
     
     def load_stopwords(self):
         """Load stopwords from JSON file"""
+        self._stopword_sets = {}
+        self._language_detector = None
+        self.reset_caches()
         try:
             with open('stopwords.json', 'r', encoding='utf-8') as f:
                 self.stopwords = json.load(f)
         except FileNotFoundError:
-            messagebox.showwarning("Warning", "stopwords.json not found. Using default stopwords.")
+            if self.headless:
+                print("stopwords.json not found. Using default stopwords.")
+            else:
+                messagebox.showwarning("Warning", "stopwords.json not found. Using default stopwords.")
             self.stopwords = {
                 "turkish": ["ve", "ile", "bu", "bir", "o", "şu", "da", "de", "ki", "mi", "mı", "mu", "mü"],
                 "english": ["and", "the", "is", "in", "to", "of", "a", "that", "it", "with", "for", "as", "was", "on", "are"]
             }
     
+    def get_cache(self, name, *key):
+        """Memo dict for a cache name ('clean', 'correction', 'lemma') and key.
+
+        Caches live for the whole session so several columns (and runs) share
+        them; reset_caches drops them whenever stopwords or corrections change.
+        """
+        cache = self.caches.get((name,) + key)
+        if cache is None:
+            cache = self.caches[(name,) + key] = {}
+        return cache
+    
+    def reset_caches(self):
+        """Forget all memoized results (call after changing resources)"""
+        self.caches = {}
+        self.vocab = Vocabulary()
+        self._deasciifier = None
+    
+    def stage(self, name):
+        """Context manager timing (StageTimer) and/or measuring (MemoryProfiler) one batch-level pipeline stage"""
+        if self.memory_profiler is None:
+            return nullcontext() if self.stage_timer is None else self.stage_timer.stage(name)
+        if self.stage_timer is None:
+            return self.memory_profiler.stage(name)
+        return self.timed_memory_stage(name)
+    
+    @contextmanager
+    def timed_memory_stage(self, name):
+        with self.stage_timer.stage(name), self.memory_profiler.stage(name):
+            yield
+    
+    def phase(self, name):
+        """Context manager measuring a step of a run (load, process, save) when a MemoryProfiler is set"""
+        if self.memory_profiler is None:
+            return nullcontext()
+        return self.memory_profiler.phase(name)
+    
+    def start_memory_profile(self):
+        self.memory_profiler = MemoryProfiler().start()
+    
+    def finish_memory_profile(self, path):
+        """Stop the MemoryProfiler, log its report and write it (with the worker memory) to path as JSON"""
+        if self.memory_profiler is None:
+            return None
+        report = self.memory_profiler.stop()
+        self.memory_profiler = None
+        report['workers'] = self.worker_memory
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.log_memory_report(report)
+        self.log_result(f"Memory report saved to {path}")
+        return report
+    
+    def start_profile(self, interval=0.005):
+        """Sample the stacks of the calling thread until finish_profile"""
+        self.run_profiler = SamplingProfiler(interval).start()
+    
+    def finish_profile(self, base_path, title="CleanText run"):
+        """Stop the profiler, log its summary and write <base>_profile.folded and <base>_profile.svg"""
+        if self.run_profiler is None:
+            return None
+        profiler = self.run_profiler.stop()
+        self.run_profiler = None
+        stem = f"{os.path.splitext(base_path)[0] if base_path else 'cleantext'}_profile"
+        profiler.write_collapsed(stem + ".folded")
+        profiler.write_svg(stem + ".svg", f"{title}: {profiler.samples} samples in {profiler.seconds:.1f}s")
+        summary = profiler.summary()
+        self.log_profile(summary)
+        self.log_result(f"Profile saved to {stem}.folded (collapsed stacks) and {stem}.svg (flame graph)")
+        return summary
+    
+    def log_profile(self, summary, top=10):
+        """Sample shares per area (clean_text, spell check, Stanza; library part) and the top functions"""
+        self.log_result(f"\nProfile: {summary['samples']} samples every {summary['interval'] * 1000:.0f} ms "
+                        f"over {summary['seconds']:.1f}s")
+        self.log_result(f"  {'area':<20} {'share':>7} {'library':>8}")
+        for area, entry in summary['areas'].items():
+            self.log_result(f"  {area:<20} {entry['share']:>7.1%} {entry['library_share']:>8.1%}")
+        self.log_result("  Top functions (own time):")
+        for name, share in summary['own'][:top]:
+            self.log_result(f"    {share:6.1%}  {name}")
+    
+    @staticmethod
+    def memory_report_path(input_path):
+        return f"{os.path.splitext(input_path)[0]}_memory.json" if input_path else "memory_report.json"
+    
+    def log_memory_report(self, report, top=5):
+        """Peak RSS, phases and stages by net allocation, and the top allocation sites of a MemoryProfiler run"""
+        mb = 1024 * 1024
+        self.log_result(f"\nMemory: peak RSS {report['peak_rss_bytes'] / mb:.0f} MB "
+                        f"(start {report['start_rss_bytes'] / mb:.0f} MB, end {report['end_rss_bytes'] / mb:.0f} MB), "
+                        f"peak traced {report['peak_traced_bytes'] / mb:.1f} MB")
+        for title, entries in (("Phase", report['phases']), ("Stage", report['stages'])):
+            if not entries:
+                continue
+            self.log_result(f"  {title:<16} {'calls':>7} {'net MB':>9} {'peak MB':>9} {'RSS +MB':>9}")
+            for name, entry in sorted(entries.items(), key=lambda item: -item[1]['net_bytes']):
+                self.log_result(f"  {name:<16} {entry['calls']:>7} {entry['net_bytes'] / mb:>9.1f} "
+                                f"{entry['peak_bytes'] / mb:>9.1f} {entry['rss_delta_bytes'] / mb:>9.1f}")
+        if report['top_sites']:
+            self.log_result("  Held at the end (top allocation sites):")
+            for site in report['top_sites'][:top]:
+                self.log_result(f"    {site['size_bytes'] / mb:8.1f} MB  {site['count']:>8} blocks  {site['site']}")
+    
+    
+    def options_fingerprint(self, options, language):
+        """Short stable hash of the processing options and language"""
+        payload = json.dumps({'language': language, 'options': options}, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def resource_fingerprint(self):
+        """Short hash of the stopword lists, custom corrections and spelling lexicons in use"""
+        payload = json.dumps({'stopwords': self.stopwords, 'custom_corrections': self.custom_corrections,
+                              'lexicons': {language: self.spell_lexicon_fingerprint(language)
+                                           for language in LANGUAGES}},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def resource_versions(self):
+        """Short hash of every resource resource_fingerprint covers, by name (for comparing machines)"""
+        def version(value):
+            payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+            return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+        versions = {'stopwords': version(self.stopwords), 'custom_corrections': version(self.custom_corrections)}
+        for language in LANGUAGES:
+            versions[f'lexicon_{language}'] = self.spell_lexicon_fingerprint(language)
+        return versions
+    
+    def detect_language(self, text):
+        """Language of a single row for the 'auto' language mode"""
+        if self._language_detector is None:
+            self._language_detector = LanguageDetector.from_stopwords(self.stopwords)
+        return self._language_detector.detect(text)
+    
+    def get_stopword_set(self, language):
+        """Return the stopwords of a language as a cached set for O(1) lookups"""
+        stopword_set = self._stopword_sets.get(language)
+        if stopword_set is None:
+            stopword_set = frozenset(self.stopwords.get(language, []))
+            self._stopword_sets[language] = stopword_set
+        return stopword_set
+    
     def create_widgets(self):
         """Create the main GUI widgets"""
         # Create notebook for tabs
@@ -172,9 +2060,18 @@ class AdvancedTextProcessor:
         ttk.Label(col_select_frame, text="Language:").pack(side='left', padx=(0, 10))
         self.language_var = tk.StringVar(value="turkish")
         language_combo = ttk.Combobox(col_select_frame, textvariable=self.language_var, 
-                                    values=["turkish", "english"], state="readonly", width=15)
+                                    values=LANGUAGES + [AUTO_LANGUAGE], state="readonly", width=15)
         language_combo.pack(side='left')
         
+        # Additional columns cleaned in the same run (shares caches, one read/write)
+        extra_frame = ttk.Frame(column_frame)
+        extra_frame.pack(fill='x', pady=(0, 10))
+        
+        ttk.Label(extra_frame, text="Also process:").pack(side='left', padx=(0, 10), anchor='n')
+        self.extra_columns_listbox = tk.Listbox(extra_frame, selectmode='multiple', height=3,
+                                                exportselection=False, width=30)
+        self.extra_columns_listbox.pack(side='left')
+        
         # Processing options
         options_frame = ttk.LabelFrame(column_frame, text="Processing Options", padding="5")
         options_frame.pack(fill='x')
@@ -187,6 +2084,9 @@ class AdvancedTextProcessor:
         button_frame.pack(fill='x', pady=10)
         
         ttk.Button(button_frame, text="Process Text", command=self.process_text_threaded).pack(side='left', padx=(0, 10))
+        ttk.Button(button_frame, text="Resume", command=self.resume_processing_threaded).pack(side='left', padx=(0, 10))
+        ttk.Button(button_frame, text="Estimate", command=self.estimate_run_threaded).pack(side='left', padx=(0, 10))
+        ttk.Button(button_frame, text="Process Folder…", command=self.process_folder_threaded).pack(side='left', padx=(0, 10))
         ttk.Button(button_frame, text="Step-by-Step Analysis", command=self.open_step_analysis).pack(side='left', padx=(0, 10))
         ttk.Button(button_frame, text="Save Processed CSV", command=self.save_csv).pack(side='left', padx=(0, 10))
         ttk.Button(button_frame, text="Reset Data", command=self.reset_data).pack(side='left', padx=(0, 10))
@@ -210,17 +2110,21 @@ class AdvancedTextProcessor:
     
     def create_processing_checkboxes(self, parent):
         """Create processing option checkboxes"""
-        self.lowercase_var = tk.BooleanVar(value=True)
-        self.punctuation_var = tk.BooleanVar(value=True)
-        self.special_chars_var = tk.BooleanVar(value=True)
-        self.numbers_var = tk.BooleanVar(value=False)
-        self.normalize_var = tk.BooleanVar(value=True)
-        self.tokenize_var = tk.BooleanVar(value=True)
-        self.stopwords_var = tk.BooleanVar(value=True)
-        self.lemmatize_var = tk.BooleanVar(value=True)
-        self.negation_var = tk.BooleanVar(value=True)
-        self.spellcheck_var = tk.BooleanVar(value=False)
-        self.use_custom_corrections_var = tk.BooleanVar(value=True)
+        self.lowercase_var = tk.BooleanVar(value=DEFAULT_OPTIONS['lowercase'])
+        self.punctuation_var = tk.BooleanVar(value=DEFAULT_OPTIONS['punctuation'])
+        self.special_chars_var = tk.BooleanVar(value=DEFAULT_OPTIONS['special_chars'])
+        self.numbers_var = tk.BooleanVar(value=DEFAULT_OPTIONS['numbers'])
+        self.normalize_var = tk.BooleanVar(value=DEFAULT_OPTIONS['normalize'])
+        self.tokenize_var = tk.BooleanVar(value=DEFAULT_OPTIONS['tokenize'])
+        self.stopwords_var = tk.BooleanVar(value=DEFAULT_OPTIONS['stopwords'])
+        self.lemmatize_var = tk.BooleanVar(value=DEFAULT_OPTIONS['lemmatize'])
+        self.negation_var = tk.BooleanVar(value=DEFAULT_OPTIONS['negation'])
+        self.spellcheck_var = tk.BooleanVar(value=DEFAULT_OPTIONS['spellcheck'])
+        self.use_custom_corrections_var = tk.BooleanVar(value=DEFAULT_OPTIONS['use_custom_corrections'])
+        self.tokenizer_var = tk.StringVar(value=DEFAULT_OPTIONS['tokenizer'])
+        self.max_tokens_var = tk.IntVar(value=DEFAULT_OPTIONS['max_tokens'])
+        self.min_tokens_var = tk.IntVar(value=DEFAULT_OPTIONS['min_tokens'])
+        self.truncation_var = tk.StringVar(value=DEFAULT_OPTIONS['truncation'])
 
         options = [
             ("Lowercase", self.lowercase_var),
@@ -240,6 +2144,35 @@ class AdvancedTextProcessor:
             row = i // 3
             col = i % 3
             ttk.Checkbutton(parent, text=text, variable=var).grid(row=row, column=col, sticky='w', padx=5, pady=2)
+
+        # Option name -> variable, used to snapshot the settings once per run
+        self.option_vars = {
+            'lowercase': self.lowercase_var,
+            'punctuation': self.punctuation_var,
+            'special_chars': self.special_chars_var,
+            'numbers': self.numbers_var,
+            'normalize': self.normalize_var,
+            'tokenize': self.tokenize_var,
+            'stopwords': self.stopwords_var,
+            'lemmatize': self.lemmatize_var,
+            'negation': self.negation_var,
+            'spellcheck': self.spellcheck_var,
+            'use_custom_corrections': self.use_custom_corrections_var,
+            'tokenizer': self.tokenizer_var,
+            'max_tokens': self.max_tokens_var,
+            'min_tokens': self.min_tokens_var,
+            'truncation': self.truncation_var,
+        }
+    
+    def get_processing_options(self):
+        """Snapshot the processing checkboxes into a plain dict.
+
+        Reading Tk variables is comparatively slow (and not thread-friendly), so
+        batch loops take one snapshot and pass it to clean_text for every row.
+        """
+        if self.headless:
+            return dict(self.options)
+        return {name: var.get() for name, var in self.option_vars.items()}
     
     def create_settings_tab(self, parent):
         """Create settings tab"""
@@ -286,10 +2219,63 @@ class AdvancedTextProcessor:
         ttk.Button(cc_frame, text="Save JSON", command=self.save_custom_corrections_json).grid(row=1, column=1, padx=5, pady=5, sticky='w')
         ttk.Button(cc_frame, text="Build from /input CSVs", command=self.build_corrections_from_input_dir).grid(row=1, column=2, padx=5, pady=5, sticky='w')
         ttk.Button(cc_frame, text="Clear In-Memory", command=self.clear_custom_corrections).grid(row=1, column=3, padx=5, pady=5, sticky='w')
+        ttk.Button(cc_frame, text="Learn Turkish Lexicon…", command=self.learn_lexicon_from_files).grid(row=1, column=4, padx=5, pady=5, sticky='w')
 
         # Small info
         self.cc_status_label = ttk.Label(cc_frame, text=f"Loaded {len(self.custom_corrections)} corrections.")
         self.cc_status_label.grid(row=2, column=0, columnspan=4, sticky='w', padx=5)
+
+        # Tokenizer backend
+        tok_frame = ttk.LabelFrame(parent, text="Tokenizer", padding="10")
+        tok_frame.pack(fill='x', pady=(5, 5))
+
+        ttk.Label(tok_frame, text="Backend:").pack(side='left', padx=(0, 10))
+        ttk.Combobox(tok_frame, textvariable=self.tokenizer_var, values=TOKENIZER_BACKENDS,
+                     state="readonly", width=10).pack(side='left', padx=(0, 20))
+        ttk.Button(tok_frame, text="Benchmark on Selected Column",
+                   command=self.benchmark_tokenizers_threaded).pack(side='left')
+
+        # Stanza model pool
+        stanza_frame = ttk.LabelFrame(parent, text="Stanza Models", padding="10")
+        stanza_frame.pack(fill='x', pady=(5, 5))
+
+        ttk.Label(stanza_frame, text="Memory budget (MB, 0 = unlimited):").pack(side='left', padx=(0, 10))
+        self.stanza_budget_var = tk.IntVar(value=0)
+        ttk.Spinbox(stanza_frame, from_=0, to=65536, increment=256, width=8,
+                    textvariable=self.stanza_budget_var).pack(side='left', padx=(0, 20))
+        self.stanza_budget_var.trace_add('write', self.on_stanza_budget_change)
+        ttk.Button(stanza_frame, text="Show Loaded Models",
+                   command=self.log_stanza_models).pack(side='left')
+
+        budget_frame = ttk.Frame(parent)
+        budget_frame.pack(fill='x', pady=(0, 5))
+        ttk.Label(budget_frame, text="Max tokens per row for Stanza (0 = no limit):").pack(side='left', padx=(10, 10))
+        ttk.Spinbox(budget_frame, from_=0, to=100000, increment=100, width=8,
+                    textvariable=self.max_tokens_var).pack(side='left', padx=(0, 20))
+        ttk.Label(budget_frame, text="Truncation:").pack(side='left', padx=(0, 10))
+        ttk.Combobox(budget_frame, textvariable=self.truncation_var, values=TRUNCATION_POLICIES,
+                     state="readonly", width=10).pack(side='left', padx=(0, 20))
+        ttk.Label(budget_frame, text="Min tokens per row:").pack(side='left', padx=(0, 10))
+        ttk.Spinbox(budget_frame, from_=0, to=1000, width=5,
+                    textvariable=self.min_tokens_var).pack(side='left')
+
+        # Autotuned threads / worker processes / batch size
+        perf_frame = ttk.LabelFrame(parent, text="Performance", padding="10")
+        perf_frame.pack(fill='x', pady=(5, 5))
+
+        ttk.Button(perf_frame, text="Autotune on Selected Column",
+                   command=self.autotune_threaded).pack(side='left', padx=(0, 20))
+        self.tuning_label = ttk.Label(perf_frame, text=self.tuning_summary())
+        self.tuning_label.pack(side='left')
+        self.two_pass_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(perf_frame, text="Vocabulary-first (two-pass)",
+                        variable=self.two_pass_var).pack(side='right')
+        self.memory_report_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(perf_frame, text="Memory report",
+                        variable=self.memory_report_var).pack(side='right', padx=(0, 10))
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(perf_frame, text="Profile",
+                        variable=self.profile_var).pack(side='right', padx=(0, 10))
     
     def create_results_tab(self, parent):
         """Create results and analysis tab"""
@@ -321,6 +2307,8 @@ class AdvancedTextProcessor:
         lang = self.stopwords_lang_var.get()
         content = self.stopwords_text.get(1.0, tk.END).strip()
         self.stopwords[lang] = [word.strip() for word in content.split('\n') if word.strip()]
+        self._stopword_sets.pop(lang, None)
+        self.reset_caches()
         
         try:
             with open('stopwords.json', 'w', encoding='utf-8') as f:
@@ -340,6 +2328,8 @@ class AdvancedTextProcessor:
         lang = self.stopwords_lang_var.get()
         if lang in defaults:
             self.stopwords[lang] = defaults[lang]
+            self._stopword_sets.pop(lang, None)
+            self.reset_caches()
             self.update_stopwords_display()
             messagebox.showinfo("Success", f"Stopwords for {lang} reset to default!")
     
@@ -355,260 +2345,1316 @@ class AdvancedTextProcessor:
                 # Try different encodings
                 for encoding in ['utf-8', 'utf-8-sig', 'latin1', 'cp1252']:
                     try:
-                        self.df = pd.read_csv(file_path, encoding=encoding)
+                        self.df = self.read_csv_file(file_path, encoding)
                         break
                     except UnicodeDecodeError:
                         continue
                 else:
                     raise UnicodeDecodeError("Could not decode file with any encoding")
                 
-                self.original_df = self.df.copy()
+                self.original_df = self.df.copy()
+                self.current_file = file_path
+                
+                # Update column combobox
+                self.set_column_choices(list(self.df.columns))
+                if 'comment' in self.df.columns:
+                    self.column_combo.set('comment')
+                elif len(self.df.columns) > 0:
+                    self.column_combo.set(self.df.columns[0])
+                
+                self.file_label.config(text=f"Loaded: {file_path.split('/')[-1]}")
+                
+                # Update info display
+                self.update_info_display()
+                
+                self.log_result(f"CSV file loaded successfully! Encoding: {encoding}")
+                self.log_result(f"Shape: {self.df.shape}")
+                self.log_result(f"Columns: {list(self.df.columns)}")
+                
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load CSV: {str(e)}")
+    
+    def update_info_display(self):
+        """Update data information display"""
+        if self.df is not None:
+            self.info_text.delete(1.0, tk.END)
+            
+            info = f"Shape: {self.df.shape}\n"
+            info += f"Columns: {', '.join(self.df.columns)}\n"
+            
+            # Show data types
+            info += "Data types:\n"
+            for col, dtype in self.df.dtypes.items():
+                info += f"  {col}: {dtype}\n"
+            
+            self.info_text.insert(1.0, info)
+    
+    def set_column_choices(self, columns):
+        """Fill the column combobox and the additional-columns list"""
+        self.column_combo['values'] = columns
+        self.extra_columns_listbox.delete(0, tk.END)
+        for column in columns:
+            self.extra_columns_listbox.insert(tk.END, column)
+    
+    def get_selected_columns(self):
+        """Main text column followed by any additionally selected columns"""
+        columns = [self.column_var.get()] if self.column_var.get() else []
+        for index in self.extra_columns_listbox.curselection():
+            column = self.extra_columns_listbox.get(index)
+            if column not in columns:
+                columns.append(column)
+        return columns
+    
+    def process_text_threaded(self):
+        """Process text in a separate thread"""
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing is already in progress.")
+            return
+        
+        thread = threading.Thread(target=self.process_text)
+        thread.daemon = True
+        thread.start()
+    
+    def process_folder_threaded(self):
+        """Process every CSV of a folder with the selected column(s) and options (see BatchQueue)"""
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing is already in progress.")
+            return
+        columns = self.get_selected_columns()
+        if not columns:
+            messagebox.showwarning("Warning", "Please select the text column(s) to process first.")
+            return
+        folder = filedialog.askdirectory(title="Select folder with CSV files")
+        if not folder:
+            return
+        watch = messagebox.askyesno("Process Folder", "Keep watching the folder for new files until "
+                                                      "'Stop Processing' is pressed?")
+        
+        def report(job):
+            self.progress_label.config(text=f"{os.path.basename(job.input_path)}: {job.state}")
+            if job.state in ('done', 'failed'):
+                self.log_result(f"{os.path.basename(job.input_path)}: {job.state}"
+                                + (f" ({job.error})" if job.error else f", {job.rows} rows in {job.seconds:.1f}s"))
+        
+        batch = BatchQueue(self, columns, self.language_var.get(), self.get_processing_options(),
+                           status_callback=report)
+        
+        def run():
+            self.processing = True
+            self.stop_button.config(state='normal')
+            try:
+                self.log_result(f"\nProcessing folder {folder} (columns {columns})...")
+                batch.run([folder], watch=watch, should_stop=lambda: not self.processing)
+                self.log_result(batch.status_table())
+            except Exception as e:
+                self.log_result(f"Error during folder processing: {e}")
+            finally:
+                self.processing = False
+                self.stop_button.config(state='disabled')
+                self.progress_label.config(text="Ready")
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def resume_processing_threaded(self):
+        """Continue the last interrupted run of the selected file from its checkpoint"""
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing is already in progress.")
+            return
+        
+        thread = threading.Thread(target=self.process_text, kwargs={'resume': True})
+        thread.daemon = True
+        thread.start()
+    
+    def open_run_checkpoint(self, columns, language, options, resume):
+        """RunCheckpoint for processing the current file, or None if there is no file"""
+        if not self.current_file or not os.path.exists(self.current_file):
+            return None
+        
+        fingerprint = self.options_fingerprint(options, language)
+        resources = self.resource_fingerprint()
+        if not resume:
+            # Don't silently throw away a matching checkpoint of an interrupted run
+            header = RunCheckpoint.make_header(self.current_file, fingerprint, language, columns, resources)
+            loaded = RunCheckpoint.load(RunCheckpoint.path_for(self.current_file), header)
+            completed = loaded[0] if loaded else None
+            if completed and any(completed.values()):
+                n_rows = sum(len(rows) for rows in completed.values())
+                resume = messagebox.askyesno(
+                    "Checkpoint", f"An interrupted run with {n_rows} processed rows was found. Resume it?")
+        
+        checkpoint = RunCheckpoint.start(self.current_file, fingerprint, language, columns, resume, resources)
+        if resume:
+            self.log_result(f"Resuming from checkpoint: {checkpoint.completed_rows()} rows already processed.")
+        return checkpoint
+    
+    def process_text(self, resume=False):
+        """Process the selected text column(s)"""
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load a CSV file first.")
+            return
+        
+        if not self.column_var.get():
+            messagebox.showwarning("Warning", "Please select a column to process.")
+            return
+        
+        columns = self.get_selected_columns()
+        language = self.language_var.get()
+        
+        for column_name in columns:
+            if column_name not in self.df.columns:
+                messagebox.showerror("Error", f"Column '{column_name}' not found in the dataset.")
+                return
+        
+        self.processing = True
+        self.stop_button.config(state='normal')
+        if self.memory_report_var.get():
+            self.start_memory_profile()
+        if self.profile_var.get():
+            # The sampler sees this thread only, so a profiled run cleans in-process
+            self.start_profile()
+        
+        try:
+            self.log_result(f"\nStarting processing of column(s) {columns} with language '{language}'...")
+            
+            self.progress.config(maximum=len(self.df) * len(columns))
+            options = self.get_processing_options()
+            
+            # Periodic checkpoints so an interrupted run can be resumed
+            self.run_checkpoint = self.open_run_checkpoint(columns, language, options, resume)
+            
+            def update_progress(done, total, column):
+                self.progress.config(value=done)
+                self.progress_label.config(text=f"Processing {column}: {done}/{total}")
+                self.root.update_idletasks()
+            
+            detected_languages = {}
+            stats = {}
+            features = {}
+            with self.phase('process'):
+                results = self.process_columns(self.df, columns, language, options,
+                                               progress_callback=update_progress,
+                                               should_stop=lambda: not self.processing,
+                                               checkpoint=self.run_checkpoint,
+                                               languages_out=detected_languages,
+                                               stats_out=stats, two_pass=self.two_pass_var.get(),
+                                               features_out=features,
+                                               workers=1 if self.run_profiler is not None else None)
+            if results is None:  # Check if stopped
+                self.log_result("Processing stopped by user.")
+                if self.run_checkpoint is not None:
+                    self.log_result("Progress is saved in the checkpoint; use 'Resume' to continue.")
+                return
+            
+            with self.phase('add_columns'):
+                self.add_processed_columns(columns, results, detected_languages, stats, features)
+            
+            # Show results
+            for column_name in columns:
+                prefix = 'comment' if len(columns) == 1 else column_name
+                self.show_processing_results(column_name, f"{column_name}_processed", prefix,
+                                             stats.get(column_name))
+            if self.vocabulary_report is not None:
+                self.log_vocabulary_report(self.vocabulary_report)
+            self.log_worker_memory()
+            
+            self.log_result(f"Processing completed successfully!")
+            
+        except Exception as e:
+            self.log_result(f"Error during processing: {str(e)}")
+            messagebox.showerror("Error", f"Failed to process text: {str(e)}")
+        
+        finally:
+            self.finish_memory_profile(self.memory_report_path(self.current_file))
+            self.finish_profile(self.current_file)
+            self.processing = False
+            self.stop_button.config(state='disabled')
+            self.progress_label.config(text="Ready")
+            self.progress.config(value=0)
+    
+    def stop_processing(self):
+        """Stop text processing"""
+        self.processing = False
+    
+    def clean_text(self, text, language="turkish", debug_mode=False, options=None):
+        """Clean and process text based on selected options"""
+        if pd.isna(text):
+            return ""
+        
+        if options is None:
+            options = self.get_processing_options()
+        
+        text = str(text)
+        if language == AUTO_LANGUAGE:
+            language = self.detect_language(text)
+        
+        # Debug tracking
+        debug_steps = [] if debug_mode else None
+        
+        # Steps 1-8: character-level cleanup
+        with self.stage('preprocess'):
+            text = self.preprocess_text(text, language, options, debug_steps)
+        
+        # Step 9: Advanced tokenization and processing
+        if options['tokenize']:
+            # Advanced tokenization
+            with self.stage('tokenize'):
+                tokens = self.advanced_tokenize(text, language, options['tokenizer'])
+            if debug_mode:
+                debug_steps.append(("9. Tokenization", ' '.join(tokens)))
+                text = self.process_tokens_staged(tokens, language, options, debug_steps)
+            else:
+                text = self.finish_rows([tokens], language, options)[0]
+        
+        # Final cleanup
+        text = re.sub(r'\s+', ' ', text).strip()
+        if debug_mode:
+            debug_steps.append(("15. Final Result", text))
+            
+        # Return debug info if requested
+        if debug_mode:
+            return text, debug_steps
+        
+        return text
+    
+    def clean_texts(self, texts, language="turkish", options=None, languages=None, features=None):
+        """Batch version of clean_text: same result per row, one Stanza call per batch.
+
+        Repeated texts are processed once: results are memoized per options
+        fingerprint in the shared 'clean' cache. With language 'auto' every row
+        is routed to the pipeline of its detected language (or of `languages[i]`
+        when the caller already detected them), one batch per language.
+        With a `features` list, the ROW_FEATURES counts captured while cleaning
+        are stored in it for every row (memoized like the results).
+        """
+        if options is None:
+            options = self.get_processing_options()
+        
+        if language == AUTO_LANGUAGE:
+            if languages is None:
+                with self.stage('detect_language'):
+                    languages = [self.detect_language(text) for text in texts]
+            groups = defaultdict(list)
+            for i, row_language in enumerate(languages):
+                groups[row_language].append(i)
+            results = [""] * len(texts)
+            if features is not None:
+                features[:] = [None] * len(texts)
+            for row_language, indices in groups.items():
+                group_features = [] if features is not None else None
+                cleaned = self.clean_texts([texts[i] for i in indices], row_language, options,
+                                           features=group_features)
+                for i, text in zip(indices, cleaned):
+                    results[i] = text
+                if features is not None:
+                    for i, counts in zip(indices, group_features):
+                        features[i] = counts
+            return results
+        
+        results = [""] * len(texts)
+        fingerprint = self.options_fingerprint(options, language)
+        cache = self.get_cache('clean', fingerprint, self.stanza_ready)
+        feature_cache = self.get_cache('features', fingerprint, self.stanza_ready)
+        if len(cache) > self.CACHE_LIMIT:
+            # Only between batches: the features of this batch's hits are read from the cache at the end
+            cache.clear()
+            feature_cache.clear()
+        pending = {}  # distinct uncached text -> row indices
+        cached_rows = 0
+        for i, text in enumerate(texts):
+            if pd.isna(text):
+                continue
+            text = str(text)
+            cached = cache.get(text)
+            if cached is not None:
+                results[i] = cached
+                cached_rows += 1
+            else:
+                pending.setdefault(text, []).append(i)
+        self.skipped['cached'] += cached_rows
+        
+        if pending:
+            self.clean_pending(list(pending), pending, results, cache, feature_cache, language, options)
+        if features is not None:
+            features[:] = [self.NO_FEATURES if pd.isna(text) else feature_cache.get(str(text))
+                           for text in texts]
+        return results
+    
+    def clean_pending(self, token_texts, pending, results, cache, feature_cache, language, options):
+        """Clean the distinct uncached texts of clean_texts into the caches and result rows"""
+        removed = [array('i', [0, 0, 0]) for _ in token_texts]  # urls, mentions, emojis
+        if options['tokenize'] and self.pretokenized is not None:
+            # Vocabulary-first mode: rows were tokenized in pass 1
+            entries = [self.pretokenized.get((language, text)) for text in token_texts]
+            if None not in entries:
+                token_rows = [tokens for tokens, _, _ in entries]
+                removed = [array('i', counts) for _, counts, _ in entries]
+                exits = [exit_stage for _, _, exit_stage in entries]
+                return self.finish_cleaned(token_texts, token_rows, removed, pending, results, cache,
+                                           feature_cache, language, options, exits)
+        
+        with self.stage('preprocess'):
+            preprocessed = [self.preprocess_text(text, language, options, counts=counts)
+                            for text, counts in zip(token_texts, removed)]
+        if not options['tokenize']:
+            for text, cleaned, counts in zip(token_texts, preprocessed, removed):
+                cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+                cache[text] = cleaned
+                feature_cache[text] = (0, 0) + tuple(counts)
+                for i in pending[text]:
+                    results[i] = cleaned
+            return results
+        
+        # Rows left empty by the character cleanup (pure URLs, emojis...) aren't tokenized
+        exits = [None if cleaned else 'preprocess' for cleaned in preprocessed]
+        with self.stage('tokenize'):
+            token_rows = [self.advanced_tokenize(cleaned, language, options['tokenizer']) if cleaned else []
+                          for cleaned in preprocessed]
+        return self.finish_cleaned(token_texts, token_rows, removed, pending, results, cache, feature_cache,
+                                   language, options, exits)
+    
+    def finish_cleaned(self, token_texts, token_rows, removed, pending, results, cache, feature_cache,
+                       language, options, exits=None):
+        """Last step of clean_texts: token stages, then results into the caches and result rows"""
+        exits = exits or [None] * len(token_rows)
+        changes = []
+        finished = self.finish_rows(token_rows, language, options, exits, changes)
+        for text, cleaned, exit_stage, changed, counts in zip(token_texts, finished, exits, changes, removed):
+            cache[text] = cleaned
+            feature_cache[text] = changed + tuple(counts)
+            for i in pending[text]:
+                results[i] = cleaned
+            if exit_stage is not None:
+                self.skipped[exit_stage] += len(pending[text])
+        return results
+    
+    def process_columns(self, df, columns, language, options, chunk_size=None,
+                        progress_callback=None, should_stop=None, checkpoint=None,
+                        languages_out=None, stats_out=None, workers=None, two_pass=False, features_out=None):
+        """Clean several text columns in one run.
+
+        Columns share the session caches, so text repeated across columns (or
+        rows) is only processed once. With a RunCheckpoint, rows it already
+        holds are skipped and new rows are recorded as they complete. In 'auto'
+        language mode the detected language of every row is stored in
+        languages_out[column]. With stats_out, a StreamingStats per column is
+        updated as chunks complete (stats_out[column]).
+        Chunk size (rows per Stanza batch) and the number of worker processes
+        default to the machine's tuning profile (see autotune). With two_pass,
+        the remaining rows first go through vocabulary_first_pass (its report
+        is kept in self.vocabulary_report). With features_out, the ROW_FEATURES
+        counts of every row are stored in features_out[column].
+        Returns {column: processed texts}, or None if should_stop() became true.
+        """
+        total = len(df) * len(columns)
+        done = 0
+        results = {}
+        chunk_size = chunk_size or self.tuning['batch_rows']
+        workers = workers or self.tuning['workers']
+        if language == AUTO_LANGUAGE:
+            # Larger chunks give each language a reasonably sized batch
+            chunk_size *= 4
+        column_languages = {}
+        if language == AUTO_LANGUAGE:
+            # Detection is cheap and deterministic, so resumed runs redo it
+            for column in columns:
+                column_languages[column] = [self.detect_language(text) for text in df[column].tolist()]
+                if languages_out is not None:
+                    languages_out[column] = column_languages[column]
+        
+        self.vocabulary_report = None
+        if two_pass and options['tokenize']:
+            skip = {column: len(checkpoint.completed[column]) if checkpoint is not None else 0 for column in columns}
+            self.vocabulary_report = self.vocabulary_first_pass(
+                {column: df[column].tolist()[skip[column]:] for column in columns}, language, options,
+                {column: row_languages[skip[column]:] for column, row_languages in column_languages.items()},
+                workers)
+        
+        self.worker_memory = None
+        pool = self.start_worker_pool(workers, language, options)
+        try:
+            for column in columns:
+                texts = df[column].tolist()
+                languages = column_languages.get(column)
+                processed = list(checkpoint.completed[column]) if checkpoint is not None else []
+                row_features = list(checkpoint.features[column]) if checkpoint is not None else []
+                done += len(processed)
+                stats = None
+                if stats_out is not None:
+                    stats = stats_out[column] = StreamingStats()
+                    if processed:
+                        stats.add(texts[:len(processed)], processed, languages[:len(processed)] if languages else None)
+                starts = range(len(processed), len(texts), chunk_size)
+                skipped_before = Counter(self.skipped)
+                for start, chunk, chunk_features in self.clean_chunks(texts, starts, chunk_size, language,
+                                                                      options, languages, pool):
+                    processed.extend(chunk)
+                    row_features.extend(chunk_features)
+                    if stats is not None:
+                        stats.add(texts[start:start + chunk_size], chunk,
+                                  languages[start:start + chunk_size] if languages else None)
+                    if checkpoint is not None:
+                        checkpoint.add(column, start, chunk, chunk_features)
+                    done += len(chunk)
+                    if progress_callback is not None:
+                        progress_callback(done, total, column)
+                    # Only after the chunk is in the checkpoint, so that a resumed run doesn't redo it
+                    if should_stop is not None and should_stop():
+                        return None
+                if stats is not None:
+                    stats.skipped = self.skipped - skipped_before
+                results[column] = processed
+                if features_out is not None:
+                    features_out[column] = row_features
+        finally:
+            self.pretokenized = None
+            if pool is not None:
+                self.measure_worker_memory()
+                pool.terminate()
+                pool.join()
+            if checkpoint is not None:
+                checkpoint.flush()
+        return results
+    
+    def vocabulary_first_pass(self, column_texts, language, options, column_languages=None, workers=1):
+        """Pass 1 of the vocabulary-first (two-pass) mode.
+
+        Tokenizes every distinct text of the given columns, collects the unique
+        tokens per language and runs the context-free token stages once per
+        unique token (plan_token), both spread over worker processes. The token
+        lists are kept in self.pretokenized, so pass 2 (the regular chunk loop)
+        only looks tokens up in the plan before Stanza. Returns a report with
+        the unique-to-total token ratio.
+        """
+        start_time = time.perf_counter()
+        occurrences = Counter()  # (language, text) -> rows
+        for column, texts in column_texts.items():
+            languages = (column_languages or {}).get(column) or [language] * len(texts)
+            occurrences.update((row_language, str(text)) for text, row_language in zip(texts, languages)
+                               if not pd.isna(text))
+        distinct = list(occurrences)
+        run_stanza = options['lemmatize'] and self.stanza_ready
+        vocab = self.vocab
+        
+        pool = self.start_worker_pool(workers, language, options)
+        try:
+            step = max(256, -(-len(distinct) // (max(workers, 1) * 4)))
+            jobs = [(distinct[i:i + step], options) for i in range(0, len(distinct), step)]
+            with self.stage('tokenize'):
+                parts = pool.map(_worker_tokenize_texts, jobs) if pool is not None else \
+                    [self.tokenize_texts(*job) for job in jobs]
+            token_rows = [tokens for part in parts for tokens in part]
+            
+            unique = defaultdict(set)
+            total_tokens = 0
+            for key, (tokens, _, _) in zip(distinct, token_rows):
+                unique[key[0]].update(tokens)
+                total_tokens += len(tokens) * occurrences[key]
+            
+            plan_start = time.perf_counter()
+            planned = 0
+            with self.stage('token_stages'):
+                for row_language, tokens in unique.items():
+                    plan = self.token_plan(row_language, options, vocab, not run_stanza)
+                    tokens = [token for token in tokens if vocab.id(token) not in plan]
+                    planned += len(tokens)
+                    step = max(256, -(-len(tokens) // (max(workers, 1) * 4)))
+                    jobs = [(tokens[i:i + step], row_language, options, not run_stanza)
+                            for i in range(0, len(tokens), step)]
+                    outcomes = pool.map(_worker_plan_tokens, jobs) if pool is not None else \
+                        [self.plan_token_strings(*job) for job in jobs]
+                    for job, part in zip(jobs, outcomes):
+                        for token, outcome in zip(job[0], part):
+                            plan[vocab.id(token)] = vocab.id(outcome) if isinstance(outcome, str) else outcome
+            plan_seconds = time.perf_counter() - plan_start
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        
+        self.pretokenized = dict(zip(distinct, token_rows))
+        unique_tokens = sum(len(tokens) for tokens in unique.values())
+        return {
+            'rows': sum(occurrences.values()),
+            'distinct_texts': len(distinct),
+            'total_tokens': total_tokens,
+            'unique_tokens': unique_tokens,
+            'unique_ratio': unique_tokens / total_tokens if total_tokens else 0.0,
+            'planned_tokens': planned,
+            'plan_seconds': plan_seconds,
+            'seconds': time.perf_counter() - start_time,
+        }
+    
+    def log_vocabulary_report(self, report):
+        """Log the savings of the vocabulary-first pass"""
+        self.log_result(f"Vocabulary-first pass: {report['total_tokens']} tokens in {report['rows']} rows, "
+                        f"{report['unique_tokens']} unique ({report['unique_ratio']:.2%}); "
+                        f"token stages ran {report['planned_tokens']} times instead of {report['total_tokens']} "
+                        f"({report['plan_seconds']:.1f}s, pass 1 total {report['seconds']:.1f}s)")
+    
+    def tokenize_texts(self, keys, options):
+        """(tokens, removed URL/mention/emoji counts, early exit or None) of (language, text) pairs"""
+        rows = []
+        for row_language, text in keys:
+            removed = [0, 0, 0]
+            cleaned = self.preprocess_text(text, row_language, options, counts=removed)
+            if cleaned:
+                rows.append((self.advanced_tokenize(cleaned, row_language, options['tokenizer']), removed, None))
+            else:
+                rows.append(([], removed, 'preprocess'))
+        return rows
+    
+    def plan_token_strings(self, tokens, language, options, length_filter=True):
+        """plan_token outcomes as strings (resulting token) or the TOKEN_* codes, to pass between processes"""
+        vocab = Vocabulary()
+        outcomes = []
+        for token in tokens:
+            action = self.plan_token(token, language, options, vocab, length_filter)
+            outcomes.append(vocab.strings[action] if action >= 0 else action)
+        return outcomes
+    
+    def preload_stanza_models(self, language, options):
+        """Wait for Stanza and load every model a run with these settings may need"""
+        if not options['lemmatize']:
+            return
+        self.stanza_loaded.wait()
+        if self.stanza_ready:
+            for model_language in (LANGUAGES if language == AUTO_LANGUAGE else [language]):
+                self.get_stanza_pipeline(model_language)
+    
+    def clean_chunks(self, texts, starts, chunk_size, language, options, languages=None, pool=None):
+        """(start, cleaned chunk, row features) in order; chunks run in the worker pool when one is given"""
+        jobs = ((texts[start:start + chunk_size], language, options,
+                 languages[start:start + chunk_size] if languages else None) for start in starts)
+        if pool is None:
+            for start, job in zip(starts, jobs):
+                features = []
+                yield start, self.clean_texts(*job, features), features
+            return
+        for start, (chunk, skipped, features) in zip(starts, pool.imap(_worker_clean_texts, jobs)):
+            self.skipped.update(skipped)
+            yield start, chunk, features
+    
+    def start_worker_pool(self, workers, language, options, torch_threads=None):
+        """Fork worker processes sharing this engine's loaded models and resources.
+
+        Returns None (process in this process) for a single worker or where
+        fork is unavailable. Stanza models needed by the run are loaded before
+        forking so workers don't load their own copies.
+        """
+        global _WORKER_ENGINE
+        if workers <= 1 or not FORK_AVAILABLE:
+            return None
+        self.preload_stanza_models(language, options)
+        self.warm_up(language, options)
+        self.stanza_pool.share_memory()
+        
+        # Move everything allocated so far out of the GC's reach, so collections
+        # in the workers don't write to (and thereby copy) the inherited pages
+        gc.collect()
+        gc.freeze()
+        _WORKER_ENGINE = self
+        try:
+            return multiprocessing.get_context('fork').Pool(
+                workers, initializer=_init_worker, initargs=(torch_threads or self.tuning['torch_threads'],))
+        finally:
+            gc.unfreeze()
+    
+    def warm_up(self, language, options):
+        """Build lazily created resources (tokenizers, stopword sets, detector) before forking"""
+        languages = LANGUAGES if language == AUTO_LANGUAGE else [language]
+        if language == AUTO_LANGUAGE:
+            self.detect_language("")
+        for warm_language in languages:
+            self.get_stopword_set(warm_language)
+            self.clean_texts(["Bu bir deneme değil, this isn't a test."], warm_language, options)
+    
+    def measure_worker_memory(self):
+        """Memory of this process and its live worker processes (see process_memory)"""
+        self.worker_memory = {
+            'parent': process_memory(),
+            'workers': [process_memory(child.pid) for child in multiprocessing.active_children()],
+        }
+        return self.worker_memory
+    
+    def log_worker_memory(self):
+        """Per-worker unique memory of the last multi-process run"""
+        if not self.worker_memory or not self.worker_memory['workers']:
+            return
+        mb = 1024 * 1024
+        parent = self.worker_memory['parent']
+        workers = self.worker_memory['workers']
+        self.log_result(f"\nWorker memory ({len(workers)} workers, models shared copy-on-write):")
+        self.log_result(f"  parent     RSS {parent['rss'] / mb:7.0f} MB  PSS {parent['pss'] / mb:7.0f} MB  "
+                        f"unique {parent['uss'] / mb:7.0f} MB")
+        for i, memory in enumerate(workers, 1):
+            self.log_result(f"  worker {i:<3} RSS {memory['rss'] / mb:7.0f} MB  PSS {memory['pss'] / mb:7.0f} MB  "
+                            f"unique {memory['uss'] / mb:7.0f} MB")
+        total = sum(memory['pss'] for memory in [parent] + workers)
+        separate = parent['rss'] * (len(workers) + 1)
+        self.log_result(f"  Total (PSS): {total / mb:.0f} MB, vs ~{separate / mb:.0f} MB "
+                        f"if every process loaded its own copy")
+    
+    def add_processed_columns(self, columns, results, detected_languages=None, stats=None, features=None):
+        """Add processed texts and derived columns (id, lengths, counts, sentiment) to self.df.
+
+        features: {column: ROW_FEATURES tuples per row} from process_columns.
+        """
+        # Add processed columns to dataframe
+        for column_name, processed_texts in results.items():
+            self.df[f"{column_name}_processed"] = processed_texts
+        
+        # Detected language per row ('auto' language mode)
+        for column_name, languages in (detected_languages or {}).items():
+            self.df[f"{column_name}_language"] = languages
+        
+        # Add ID column based on total rows
+        self.add_id_column()
+        
+        # Add comment length columns for both original and processed text
+        # (prefixed by the column name when several columns were processed)
+        for column_name in columns:
+            prefix = 'comment' if len(columns) == 1 else column_name
+            self.add_comment_length_columns(column_name, f"{column_name}_processed", prefix,
+                                            (stats or {}).get(column_name))
+            self.add_feature_columns(column_name, f"{column_name}_processed", prefix,
+                                     (features or {}).get(column_name))
+        
+        # Add sentiment analysis columns if a rating column exists
+        self.add_sentiment_columns()
+    
+    @staticmethod
+    def stratified_sample(texts, sample_size, strata=5, seed=0):
+        """Sorted positions of a random sample of texts, stratified by text length.
+
+        Rows are split into `strata` length quantile buckets and every bucket
+        contributes in proportion to its size (at least one row).
+        """
+        if len(texts) <= sample_size:
+            return list(range(len(texts)))
+        lengths = texts.fillna('').astype(str).str.len()
+        buckets = pd.qcut(lengths.rank(method='first'), q=min(strata, len(texts)), labels=False)
+        members = defaultdict(list)
+        for position, bucket in enumerate(buckets.tolist()):
+            members[bucket].append(position)
+        rng = random.Random(seed)
+        fraction = sample_size / len(texts)
+        positions = []
+        for bucket in sorted(members):
+            rows = members[bucket]
+            positions.extend(rng.sample(rows, min(len(rows), max(1, round(len(rows) * fraction)))))
+        return sorted(positions)
+    
+    def estimate_run(self, df, columns, language, options, sample_size=500, strata=5, chunk_size=64, seed=0):
+        """Dry run on a length-stratified sample that projects the cost of the full run.
+
+        The sample goes through clean_texts with the given options and the
+        current Stanza state, on empty caches. Since repeated texts are served
+        from the memo cache, the measured time per text is projected onto the
+        distinct texts of each column. Peak memory is the current RSS plus the
+        traced Python peak of one batch and the projected results and caches.
+        """
+        n_rows = len(df)
+        run_stanza = bool(options['lemmatize'] and self.stanza_ready)
+        timer = StageTimer()
+        saved_caches, saved_vocab = self.caches, self.vocab
+        report = {'rows': n_rows, 'language': language, 'stanza': run_stanza, 'columns': {}}
+        sample_seconds = projected_seconds = 0.0
+        output_bytes = retained_bytes = batch_peak = 0
+        try:
+            original_positions = None
+            for column in columns:
+                texts = df[column]
+                positions = self.stratified_sample(texts, sample_size, strata, seed)
+                original_positions = original_positions or positions
+                sample = [texts.iat[i] for i in positions]
+                distinct_sample = len({str(text) for text in sample if not pd.isna(text)})
+                distinct_total = texts.dropna().astype(str).nunique()
+                
+                # Load the Stanza models first so loading is not counted as processing
+                if run_stanza:
+                    sample_languages = ({self.detect_language(text) for text in sample}
+                                        if language == AUTO_LANGUAGE else {language})
+                    for sample_language in sample_languages:
+                        self.get_stanza_pipeline(sample_language)
                 
-                # Update column combobox
-                self.column_combo['values'] = list(self.df.columns)
-                if 'comment' in self.df.columns:
-                    self.column_combo.set('comment')
-                elif len(self.df.columns) > 0:
-                    self.column_combo.set(self.df.columns[0])
+                self.reset_caches()
+                self.stage_timer = timer
+                start = time.perf_counter()
+                outputs = []
+                for offset in range(0, len(sample), chunk_size):
+                    outputs.extend(self.clean_texts(sample[offset:offset + chunk_size], language, options))
+                seconds = time.perf_counter() - start
+                self.stage_timer = None
                 
-                self.file_label.config(text=f"Loaded: {file_path.split('/')[-1]}")
+                # Python allocations of one batch on cold caches
+                if not tracemalloc.is_tracing():
+                    self.reset_caches()
+                    tracemalloc.start()
+                    self.clean_texts(sample[:chunk_size], language, options)
+                    batch_peak = max(batch_peak, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
                 
-                # Update info display
-                self.update_info_display()
+                per_text = seconds / max(distinct_sample, 1)
+                column_seconds = per_text * distinct_total
+                sample_seconds += seconds
+                projected_seconds += column_seconds
                 
-                self.log_result(f"CSV file loaded successfully! Encoding: {encoding}")
-                self.log_result(f"Shape: {self.df.shape}")
-                self.log_result(f"Columns: {list(self.df.columns)}")
+                # Processed column and its two length columns as they will be written
+                added = pd.DataFrame({'processed': outputs,
+                                      'length_original': [len(str(text)) for text in sample],
+                                      'length_processed': [len(text) for text in outputs]})
+                csv_bytes = len(added.to_csv(index=False, header=False).encode('utf-8'))
+                output_bytes += csv_bytes / max(len(outputs), 1) * n_rows
+                mean_out = sum(sys.getsizeof(text) for text in outputs) / max(len(outputs), 1)
+                mean_in = sum(sys.getsizeof(str(text)) for text in sample) / max(len(sample), 1)
+                # Result column (string + pointer per row) and 'clean' cache entries
+                retained_bytes += (mean_out + 8) * n_rows
+                retained_bytes += (mean_in + mean_out + 100) * min(distinct_total, self.CACHE_LIMIT)
                 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load CSV: {str(e)}")
-    
-    def update_info_display(self):
-        """Update data information display"""
-        if self.df is not None:
-            self.info_text.delete(1.0, tk.END)
-            
-            info = f"Shape: {self.df.shape}\n"
-            info += f"Columns: {', '.join(self.df.columns)}\n"
+                report['columns'][column] = {
+                    'sample_rows': len(sample),
+                    'distinct_rows': int(distinct_total),
+                    'sample_seconds': seconds,
+                    'rows_per_sec': len(sample) / seconds if seconds else 0.0,
+                    'projected_seconds': column_seconds,
+                    'examples': [(str(text), out) for text, out in zip(sample, outputs)
+                                 if not pd.isna(text)][:3],
+                }
             
-            # Show data types
-            info += "Data types:\n"
-            for col, dtype in self.df.dtypes.items():
-                info += f"  {col}: {dtype}\n"
-            
-            self.info_text.insert(1.0, info)
+            if original_positions:
+                original_csv = df.iloc[original_positions].to_csv(index=False).encode('utf-8')
+                output_bytes += len(original_csv) / len(original_positions) * n_rows
+                output_bytes += (len(str(n_rows)) + 1) * n_rows  # comment_id
+        finally:
+            self.caches, self.vocab = saved_caches, saved_vocab
+            self.stage_timer = None
+        
+        # Per-stage cost; time outside the timed stages (cache lookups, chunking) is 'other'
+        stage_seconds = dict(timer.seconds)
+        other = sample_seconds - timer.total()
+        if other > 0:
+            stage_seconds['other'] = other
+        report['stages'] = {
+            stage: {'sample_seconds': seconds,
+                    'share': seconds / sample_seconds if sample_seconds else 0.0,
+                    'projected_seconds': projected_seconds * seconds / sample_seconds if sample_seconds else 0.0}
+            for stage, seconds in sorted(stage_seconds.items(), key=lambda item: -item[1])
+        }
+        report['projected_seconds'] = projected_seconds
+        report['projected_output_bytes'] = int(output_bytes)
+        report['projected_peak_memory_bytes'] = int(current_rss_bytes() + batch_peak + retained_bytes)
+        return report
     
-    def process_text_threaded(self):
-        """Process text in a separate thread"""
+    def log_estimate(self, report):
+        """Write an estimate_run report to the results log"""
+        mb = 1024 * 1024
+        self.log_result(f"\nEstimate for {report['rows']} rows ({report['language']}, "
+                        f"Stanza {'on' if report['stanza'] else 'off'}):")
+        for column, stats in report['columns'].items():
+            self.log_result(f"  {column}: sample {stats['sample_rows']} rows in {stats['sample_seconds']:.2f}s "
+                            f"({stats['rows_per_sec']:.0f} rows/s), {stats['distinct_rows']} distinct texts, "
+                            f"projected {stats['projected_seconds']:.0f}s")
+            for original, processed in stats['examples']:
+                self.log_result(f"    {original[:60]!r} -> {processed[:60]!r}")
+        self.log_result(f"  Projected runtime: {report['projected_seconds'] / 60:.1f} min")
+        self.log_result(f"  Projected peak memory: {report['projected_peak_memory_bytes'] / mb:.0f} MB")
+        self.log_result(f"  Projected output size: {report['projected_output_bytes'] / mb:.1f} MB")
+        self.log_result("  Per-stage cost:")
+        for stage, stats in report['stages'].items():
+            self.log_result(f"    {stage:<16} {stats['share']:>6.1%}  ~{stats['projected_seconds']:.0f}s")
+    
+    def estimate_run_threaded(self):
+        """Run the dry-run estimator on the selected column(s) in the background"""
+        if self.df is None or not self.column_var.get() or self.column_var.get() not in self.df.columns:
+            messagebox.showwarning("Warning", "Please load a CSV file and select a text column first.")
+            return
         if self.processing:
             messagebox.showwarning("Warning", "Processing is already in progress.")
             return
         
-        thread = threading.Thread(target=self.process_text)
-        thread.daemon = True
-        thread.start()
-    
-    def process_text(self):
-        """Process the selected text column"""
-        if self.df is None:
-            messagebox.showwarning("Warning", "Please load a CSV file first.")
-            return
+        df = self.df
+        columns = [column for column in self.get_selected_columns() if column in df.columns]
+        language = self.language_var.get()
+        options = self.get_processing_options()
         
-        if not self.column_var.get():
-            messagebox.showwarning("Warning", "Please select a column to process.")
-            return
+        def run():
+            try:
+                self.log_estimate(self.estimate_run(df, columns, language, options))
+            except Exception as e:
+                self.log_result(f"Estimate failed: {e}")
         
-        column_name = self.column_var.get()
-        language = self.language_var.get()
+        threading.Thread(target=run, daemon=True).start()
+    
+    def tuning_candidates(self):
+        """(torch threads, worker processes) pairs that don't oversubscribe the CPUs"""
+        cpus = os.cpu_count() or 1
+        steps = sorted(n for n in {1, 2, 4, cpus // 2, cpus} if 0 < n <= cpus)
+        worker_steps = steps if FORK_AVAILABLE else [1]
+        return [(threads, workers) for threads in steps for workers in worker_steps if threads * workers <= cpus]
+    
+    def run_tuning_trial(self, texts, language, options, torch_threads, workers, batch_rows):
+        """Cold-cache throughput and memory (this process + workers) of one setting"""
+        set_torch_threads(torch_threads)
+        self.reset_caches()
+        chunk_size = batch_rows * 4 if language == AUTO_LANGUAGE else batch_rows
+        languages = [self.detect_language(text) for text in texts] if language == AUTO_LANGUAGE else None
+        pool = self.start_worker_pool(workers, language, options, torch_threads)
+        try:
+            start = time.perf_counter()
+            for _ in self.clean_chunks(texts, range(0, len(texts), chunk_size), chunk_size,
+                                       language, options, languages, pool):
+                pass
+            seconds = time.perf_counter() - start
+            rss = current_rss_bytes() + sum(process_rss_bytes(child.pid) for child in multiprocessing.active_children())
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return {'torch_threads': torch_threads, 'workers': workers, 'batch_rows': batch_rows,
+                'rows_per_sec': len(texts) / seconds if seconds else 0.0, 'rss_mb': rss / (1024 * 1024)}
+    
+    def autotune(self, texts, language, options, batch_choices=(16, 32, 64, 128)):
+        """Find the fastest torch threads / worker processes / Stanza batch rows on sample texts.
+
+        Thread and worker combinations are tried at the current batch size
+        first, then the batch sizes for the best combination. Every trial runs
+        on cold caches. Returns (best trial, all trials).
+        """
+        trials = []
         
-        if column_name not in self.df.columns:
-            messagebox.showerror("Error", f"Column '{column_name}' not found in the dataset.")
-            return
+        def trial(torch_threads, workers, batch_rows):
+            result = self.run_tuning_trial(texts, language, options, torch_threads, workers, batch_rows)
+            trials.append(result)
+            self.log_result(f"  threads {torch_threads:>2}  workers {workers:>2}  batch {batch_rows:>4}: "
+                            f"{result['rows_per_sec']:8.1f} rows/s  {result['rss_mb']:7.0f} MB")
+            return result
         
-        self.processing = True
-        self.stop_button.config(state='normal')
+        def rows_per_sec(result):
+            return result['rows_per_sec']
         
+        saved_caches, saved_vocab = self.caches, self.vocab
+        previous_threads = set_torch_threads(None)
         try:
-            # Create new column name for processed text
-            processed_column = f"{column_name}_processed"
-            
-            self.log_result(f"\nStarting processing of column '{column_name}' with language '{language}'...")
-            
-            processed_texts = []
-            total_rows = len(self.df)
-            
-            self.progress.config(maximum=total_rows)
-            
-            for idx, text in enumerate(self.df[column_name]):
-                if not self.processing:  # Check if stopped
-                    self.log_result("Processing stopped by user.")
-                    return
-                
-                processed_text = self.clean_text(text, language)
-                processed_texts.append(processed_text)
-                
-                # Update progress
-                self.progress.config(value=idx + 1)
-                self.progress_label.config(text=f"Processing {idx + 1}/{total_rows}")
-                self.root.update_idletasks()
-            
-            # Add processed column to dataframe
-            self.df[processed_column] = processed_texts
-            
-            # Add ID column based on total rows
-            self.add_id_column()
-            
-            # Add comment length columns for both original and processed text
-            self.add_comment_length_columns(column_name, processed_column)
+            # Load models and lazy resources before measuring anything
+            self.preload_stanza_models(language, options)
+            self.clean_texts(texts[:8], language, options)
             
-            # Add sentiment analysis columns if score exists
-            self.add_sentiment_columns()
-            
-            # Show results
-            self.show_processing_results(column_name, processed_column)
-            
-            self.log_result(f"Processing completed successfully!")
-            
-        except Exception as e:
-            self.log_result(f"Error during processing: {str(e)}")
-            messagebox.showerror("Error", f"Failed to process text: {str(e)}")
-        
+            batch_rows = self.tuning['batch_rows']
+            best = max((trial(torch_threads, workers, batch_rows)
+                        for torch_threads, workers in self.tuning_candidates()), key=rows_per_sec)
+            best = max([best] + [trial(best['torch_threads'], best['workers'], other)
+                                 for other in batch_choices if other != batch_rows], key=rows_per_sec)
         finally:
-            self.processing = False
-            self.stop_button.config(state='disabled')
-            self.progress_label.config(text="Ready")
-            self.progress.config(value=0)
+            self.caches, self.vocab = saved_caches, saved_vocab
+            set_torch_threads(previous_threads)
+        return best, trials
     
-    def stop_processing(self):
-        """Stop text processing"""
-        self.processing = False
+    def save_tuning(self, best, language, options):
+        """Persist an autotune result for this machine and start using it"""
+        settings = {key: best[key] for key in TuningProfile.DEFAULTS}
+        settings.update(rows_per_sec=round(best['rows_per_sec'], 1), rss_mb=round(best['rss_mb']),
+                        language=language, stanza=bool(options['lemmatize'] and self.stanza_ready),
+                        tuned_at=time.strftime('%Y-%m-%d %H:%M'))
+        self.tuning_profile.save(settings)
+        self.tuning = self.tuning_profile.load()
+        set_torch_threads(self.tuning['torch_threads'])
+        self.log_result(f"Saved tuning for {TuningProfile.machine_key()}: {self.tuning['torch_threads']} torch threads, "
+                        f"{self.tuning['workers']} workers, {self.tuning['batch_rows']} rows per batch "
+                        f"({self.tuning['rows_per_sec']} rows/s)")
+        if hasattr(self, 'tuning_label'):
+            self.tuning_label.config(text=self.tuning_summary())
     
-    def clean_text(self, text, language="turkish", debug_mode=False):
-        """Clean and process text based on selected options"""
-        if pd.isna(text):
-            return ""
+    def tuning_summary(self):
+        """One-line description of the tuning in use"""
+        if 'tuned_at' not in self.tuning:
+            return "Not tuned on this machine (1 process, default torch threads, 64 rows per batch)"
+        return (f"{self.tuning['torch_threads']} torch threads, {self.tuning['workers']} worker processes, "
+                f"{self.tuning['batch_rows']} rows per batch (tuned {self.tuning['tuned_at']})")
+    
+    def autotune_threaded(self):
+        """Autotune on a sample of the selected column in the background"""
+        if self.df is None or not self.column_var.get() or self.column_var.get() not in self.df.columns:
+            messagebox.showwarning("Warning", "Please load a CSV file and select a text column first.")
+            return
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing is already in progress.")
+            return
         
-        text = str(text)
-        original_text = text
+        texts = self.df[self.column_var.get()]
+        texts = [texts.iat[i] for i in self.stratified_sample(texts, 600)]
+        language = self.language_var.get()
+        options = self.get_processing_options()
         
-        # Debug tracking
-        debug_steps = []
-        if debug_mode:
-            debug_steps.append(("0. Original Text", original_text))
+        def run():
+            self.processing = True
+            try:
+                self.log_result(f"\nAutotuning on {len(texts)} sample rows ({language})...")
+                best, _ = self.autotune(texts, language, options)
+                self.save_tuning(best, language, options)
+            except Exception as e:
+                self.log_result(f"Autotune failed: {e}")
+            finally:
+                self.processing = False
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def prepare_texts(self, texts, language, options, languages=None, features=None):
+        """CPU part of clean_texts (everything before Stanza) for the staged pipeline.
+
+        Returns one entry per row: the final text, or (language, tokens) when
+        the row still needs Stanza lemmatization (see lemmatize_prepared).
+        Repeated texts within the call are prepared once. With a `features`
+        list, the ROW_FEATURES counts of every row are appended to it.
+        """
+        run_stanza = options['lemmatize'] and self.stanza_ready
+        if len(self.vocab) > self.CACHE_LIMIT:
+            self.vocab = Vocabulary()
+        if languages is None:
+            languages = ([self.detect_language(text) for text in texts] if language == AUTO_LANGUAGE
+                         else [language] * len(texts))
+        memo = {}  # (text, language) -> (row, early exit, row features)
+        prepared = []
+        for text, row_language in zip(texts, languages):
+            if pd.isna(text):
+                prepared.append("")
+                if features is not None:
+                    features.append(self.NO_FEATURES)
+                continue
+            key = (str(text), row_language)
+            entry = memo.get(key)
+            if entry is None:
+                entry = memo[key] = self.prepare_row(key[0], row_language, options, run_stanza)
+            row, exit_stage, row_features = entry
+            if exit_stage is not None:
+                self.skipped[exit_stage] += 1
+            prepared.append(row)
+            if features is not None:
+                features.append(row_features)
+        return prepared
+    
+    def prepare_row(self, text, language, options, run_stanza):
+        """One row of prepare_texts as (row, early exit or None, ROW_FEATURES counts)"""
+        removed = [0, 0, 0]
+        cleaned = self.preprocess_text(text, language, options, counts=removed)
+        if not options['tokenize']:
+            return re.sub(r'\s+', ' ', cleaned).strip(), None, (0, 0, *removed)
+        if not cleaned:
+            return "", 'preprocess', (0, 0, *removed)
+        tokens = self.advanced_tokenize(cleaned, language, options['tokenizer'])
+        if not tokens:
+            return "", 'tokenize', (0, 0, *removed)
+        changes = []
+        tokens = self.process_tokens_fused(tokens, language, options, length_filter=not run_stanza, changes=changes)
+        row_features = changes[0] + tuple(removed)
+        if not tokens:
+            return "", 'token_stages', row_features
+        if len(tokens) < options['min_tokens']:
+            return "", 'min_tokens', row_features
+        if run_stanza:
+            return (language, self.apply_token_budget(tokens, options)), None, row_features
+        return re.sub(r'\s+', ' ', ' '.join(tokens)).strip(), None, row_features
+    
+    def lemmatize_prepared(self, prepared, batch_rows=64):
+        """Finish prepare_texts rows: Stanza in full batches per language, length filter, join"""
+        results = list(prepared)
+        pending = defaultdict(list)
+        for i, row in enumerate(prepared):
+            if isinstance(row, tuple):
+                pending[row[0]].append(i)
+        for row_language, indices in pending.items():
+            for start in range(0, len(indices), batch_rows):
+                batch = indices[start:start + batch_rows]
+                lemma_rows = self.stanza_lemmatize_batch([' '.join(prepared[i][1]) for i in batch], row_language)
+                for i, lemmas in zip(batch, lemma_rows):
+                    tokens = [token for token in lemmas if len(token) > 1 or token in 'aioueıöü']
+                    results[i] = re.sub(r'\s+', ' ', ' '.join(tokens)).strip()
+        return results
+    
+    def finish_rows(self, token_rows, language, options, exits=None, changes=None):
+        """Token stages after tokenization for a batch of rows; returns the final texts.
+
+        Rows are interned into the shared vocabulary once and carried as ID
+        arrays until the output strings are joined. Rows without tokens skip
+        the token stages, and rows left empty or shorter than
+        options['min_tokens'] skip Stanza; with an `exits` list, the early
+        exit of every row is recorded in it (see EARLY_EXITS). With a
+        `changes` list, (negations, corrections) of every row are appended.
+        """
+        if len(self.vocab) > self.CACHE_LIMIT:
+            self.vocab = Vocabulary()
+        vocab = self.vocab  # one vocabulary for the whole batch
+        if exits is None:
+            exits = [None] * len(token_rows)
+        empty = array('i')
+        
+        # Fast path: negation, stopwords, spell check and (when no
+        # lemmatization follows) the length filter in one pass
+        run_stanza = options['lemmatize'] and self.stanza_ready
+        min_tokens = options['min_tokens']
+        with self.stage('token_stages'):
+            id_rows = []
+            for i, tokens in enumerate(token_rows):
+                if not tokens:
+                    exits[i] = exits[i] or 'tokenize'
+                    id_rows.append(empty)
+                    if changes is not None:
+                        changes.append((0, 0))
+                    continue
+                ids = self.process_ids_fused(vocab.encode(tokens), language, options, vocab,
+                                             length_filter=not run_stanza, changes=changes)
+                if not ids:
+                    exits[i] = 'token_stages'
+                elif len(ids) < min_tokens:
+                    exits[i] = 'min_tokens'
+                    ids = empty
+                id_rows.append(ids)
+        
+        if run_stanza:
+            live = [i for i, exit_stage in enumerate(exits) if exit_stage is None]
+            with self.stage('lemmatize'):
+                lemma_rows = self.stanza_lemmatize_ids([self.apply_token_budget(id_rows[i], options) for i in live],
+                                                       language, vocab)
+            with self.stage('finalize'):
+                keep = vocab.memo.setdefault('keep', {})
+                for token_id in {token_id for ids in lemma_rows for token_id in ids} - keep.keys():
+                    token = vocab.strings[token_id]
+                    keep[token_id] = len(token) > 1 or token in 'aioueıöü'
+                id_rows = [empty] * len(token_rows)
+                for i, ids in zip(live, lemma_rows):
+                    id_rows[i] = [token_id for token_id in ids if keep[token_id]]
+        
+        with self.stage('finalize'):
+            strings = vocab.strings
+            return [re.sub(r'\s+', ' ', ' '.join([strings[token_id] for token_id in ids])).strip()
+                    for ids in id_rows]
+    
+    def preprocess_text(self, text, language, options, debug_steps=None, counts=None):
+        """Character-level cleanup (steps 1-8) that runs before tokenization.
+
+        With a `counts` list, the numbers of URLs, mentions/hashtags and emojis
+        removed are added to counts[0..2].
+        """
+        if debug_steps is not None:
+            debug_steps.append(("0. Original Text", text))
+        typed = text
         
         # Step 1: Lowercase
-        if self.lowercase_var.get():
-            text = text.lower()
-            if debug_mode:
+        if options['lowercase']:
+            text = self.casefold(text, language)
+            if debug_steps is not None:
                 debug_steps.append(("1. Lowercase", text))
         
         # Step 2: Remove URLs and social media elements
-        if self.special_chars_var.get():
-            text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-            text = re.sub(r'@\w+|#\w+', '', text)  # Remove mentions and hashtags
-            if debug_mode:
+        if options['special_chars']:
+            text, urls = re.subn(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+            text, mentions = re.subn(r'@\w+|#\w+', '', text)  # Remove mentions and hashtags
+            if counts is not None:
+                counts[0] += urls
+                counts[1] += mentions
+            if debug_steps is not None:
                 debug_steps.append(("2. Remove URLs/Social", text))
         
         # Step 3: Remove emojis
-        if self.special_chars_var.get():
+        if options['special_chars']:
             text = emoji.demojize(text)
-            text = re.sub(r':[a-z_&+-]+:', '', text)  # Remove emoji text representations
-            if debug_mode:
+            text, emojis = re.subn(r':[a-z_&+-]+:', '', text)  # Remove emoji text representations
+            if counts is not None:
+                counts[2] += emojis
+            if debug_steps is not None:
                 debug_steps.append(("3. Remove Emojis", text))
+            if not text or text.isspace():
+                return ""  # nothing left for the remaining steps
         
         # Step 4: Normalize Turkish characters (optional)
-        if self.normalize_var.get() and language == "turkish":
-            text = self.normalize_turkish_text(text)
-            if debug_mode:
+        if options['normalize'] and language == "turkish":
+            text = self.normalize_turkish_text(text, typed if options['lowercase'] else None)
+            if debug_steps is not None:
                 debug_steps.append(("4. Normalize Turkish", text))
         
         # Step 5: Remove numbers
-        if self.numbers_var.get():
+        if options['numbers']:
             text = re.sub(r'\d+', '', text)
-            if debug_mode:
+            if debug_steps is not None:
                 debug_steps.append(("5. Remove Numbers", text))
         
         # Step 6: Remove punctuation
-        if self.punctuation_var.get():
+        if options['punctuation']:
             text = text.translate(str.maketrans('', '', string.punctuation))
-            if debug_mode:
+            if debug_steps is not None:
                 debug_steps.append(("6. Remove Punctuation", text))
         
         # Step 7: Remove extra special characters
-        if self.special_chars_var.get():
+        if options['special_chars']:
             text = re.sub(r'[^\w\s]', '', text)
-            if debug_mode:
+            if debug_steps is not None:
                 debug_steps.append(("7. Remove Special Chars", text))
         
         # Step 8: Remove extra whitespace
         text = re.sub(r'\s+', ' ', text).strip()
-        if debug_mode:
+        if debug_steps is not None:
             debug_steps.append(("8. Clean Whitespace", text))
         text = re.sub(r'\s+', ' ', text).strip()
+        return text
+    
+    def process_tokens_staged(self, tokens, language, options, debug_steps):
+        """Run the token stages one by one, recording each step (step-by-step analysis)"""
+        # Handle negations BEFORE removing stopwords
+        if options['negation']:
+            tokens = self.handle_negations_advanced(tokens, language)
+            debug_steps.append(("10. Handle Negations", ' '.join(tokens)))
+        
+        # Remove stopwords (but preserve negation markers)
+        if options['stopwords'] and language in self.stopwords:
+            stopword_set = self.get_stopword_set(language)
+            filtered_tokens = []
+            for token in tokens:
+                # Keep negation markers and important words
+                if '_NEG' in token or '_NOT' in token or self.casefold(token, language) not in stopword_set:
+                    filtered_tokens.append(token)
+            tokens = filtered_tokens
+            debug_steps.append(("11. Remove Stopwords", ' '.join(tokens)))
+        
+        # Spell checking BEFORE stemming
+        if options['spellcheck']:
+            tokens = self.spell_check_tokens(tokens, language, options['use_custom_corrections'])
+            debug_steps.append(("12. Spell Check", ' '.join(tokens)))
+        
+        # Advanced lemmatization/stemming
+        if options['lemmatize']:
+            if self.stanza_ready:
+                # Stanza ile profesyonel lemmatization
+                text_for_stanza = ' '.join(self.apply_token_budget(tokens, options))
+                tokens = self.stanza_lemmatize(text_for_stanza, language)
+                debug_steps.append(("13. Stanza Lemmatization", ' '.join(tokens)))
+            else:
+                # Fallback: Stanza yoksa uyarı ver
+                debug_steps.append(("13. Lemmatization (Stanza not ready)", ' '.join(tokens)))
         
-        # Step 9: Advanced tokenization and processing
-        if self.tokenize_var.get():
-            # Advanced tokenization
-            tokens = self.advanced_tokenize(text, language)
-            if debug_mode:
-                debug_steps.append(("9. Tokenization", ' '.join(tokens)))
-            
-            # Handle negations BEFORE removing stopwords
-            if self.negation_var.get():
-                tokens = self.handle_negations_advanced(tokens, language)
-                if debug_mode:
-                    debug_steps.append(("10. Handle Negations", ' '.join(tokens)))
-            
-            # Remove stopwords (but preserve negation markers)
-            if self.stopwords_var.get() and language in self.stopwords:
-                filtered_tokens = []
-                for token in tokens:
-                    # Keep negation markers and important words
-                    if '_NEG' in token or '_NOT' in token or token.lower() not in self.stopwords[language]:
-                        filtered_tokens.append(token)
-                tokens = filtered_tokens
-                if debug_mode:
-                    debug_steps.append(("11. Remove Stopwords", ' '.join(tokens)))
-            
-            # Spell checking BEFORE stemming
-            if self.spellcheck_var.get():
-                tokens = self.spell_check_tokens(tokens, language)
-                if debug_mode:
-                    debug_steps.append(("12. Spell Check", ' '.join(tokens)))
-            
-            # Advanced lemmatization/stemming
-            if self.lemmatize_var.get():
-                if self.stanza_ready:
-                    # Stanza ile profesyonel lemmatization
-                    text_for_stanza = ' '.join(tokens)
-                    lemmatized_tokens = self.stanza_lemmatize(text_for_stanza, language)
-                    tokens = lemmatized_tokens
-                    if debug_mode:
-                        debug_steps.append(("13. Stanza Lemmatization", ' '.join(tokens)))
-                else:
-                    # Fallback: Stanza yoksa uyarı ver
-                    if debug_mode:
-                        debug_steps.append(("13. Lemmatization (Stanza not ready)", ' '.join(tokens)))
-            
-            # Final token cleanup: remove single-character tokens
-            tokens = [token for token in tokens if len(token) > 1 or token in 'aioueıöü']
-            if debug_mode:
-                debug_steps.append(("14. Final Token Cleanup", ' '.join(tokens)))
-            
-            # Join tokens back to text
-            text = ' '.join(tokens)
+        # Final token cleanup: remove single-character tokens
+        tokens = [token for token in tokens if len(token) > 1 or token in 'aioueıöü']
+        debug_steps.append(("14. Final Token Cleanup", ' '.join(tokens)))
         
-        # Final cleanup
-        text = re.sub(r'\s+', ' ', text).strip()
-        if debug_mode:
-            debug_steps.append(("15. Final Result", text))
+        # Join tokens back to text
+        return ' '.join(tokens)
+    
+    def process_tokens_fused(self, tokens, language, options, length_filter=True, changes=None):
+        """Apply the context-free token stages in a single pass (string API of process_ids_fused)"""
+        vocab = self.vocab
+        return vocab.decode(self.process_ids_fused(vocab.encode(tokens), language, options, vocab, length_filter,
+                                                   changes))
+    
+    def token_plan(self, language, options, vocab, length_filter=True):
+        """Memo of the fused-stage outcome of every token ID for these options (see plan_token)"""
+        spellcheck = options['spellcheck'] and self.spell_available
+        key = ('plan', language, options['negation'], options['stopwords'], spellcheck,
+               options['use_custom_corrections'], length_filter)
+        plan = vocab.memo.get(key)
+        if plan is None:
+            plan = vocab.memo[key] = {}
+        return plan
+    
+    def plan_token(self, token, language, options, vocab, length_filter=True):
+        """Outcome of the fused token stages for one token, independent of its row.
+
+        Returns the ID of the resulting token, TOKEN_DROP when the token is
+        removed, or TOKEN_NEGATE_NEXT for negation words, which mark the
+        following token (or themselves at the end of a row) with _NEG.
+        """
+        turkish = language == "turkish"
+        token_lower = turkish_lower(token) if turkish else token.lower()
+        
+        # Negation marking
+        if options['negation']:
+            if token_lower in self.NEGATION_WORDS['turkish' if turkish else 'english']:
+                return self.TOKEN_NEGATE_NEXT
+            elif turkish and token_lower.endswith(self.TURKISH_NEGATION_SUFFIXES):
+                for suffix in self.TURKISH_NEGATION_SUFFIXES:
+                    if token.endswith(suffix):
+                        token = token[:-len(suffix)]
+                        break
+                token = f"{token}_NEG"
+            elif language == "english" and token_lower.endswith(self.ENGLISH_CONTRACTIONS):
+                if "n't" in token_lower:
+                    base_word = token_lower.replace("n't", "")
+                else:
+                    base_word = token_lower.replace("nt", "")
+                token = f"{base_word}_NOT"
+        
+        marked = '_NEG' in token or '_NOT' in token
+        if not marked:
+            # Stopword removal (negation markers are always kept)
+            if (options['stopwords'] and language in self.stopwords
+                    and token_lower in self.get_stopword_set(language)):
+                return self.TOKEN_DROP
             
-        # Return debug info if requested
-        if debug_mode:
-            return text, debug_steps
-        
-        return text
+            # Spell correction
+            if options['spellcheck'] and self.spell_available and len(token) >= 3:
+                use_custom = options['use_custom_corrections']
+                corrections = self.get_cache('correction', language, use_custom)
+                corrected = corrections.get(token)
+                if corrected is None:
+                    if len(corrections) > self.CACHE_LIMIT:
+                        corrections.clear()
+                    corrected = corrections[token] = self.correct_token(token, token_lower, language, use_custom)
+                token = corrected
+        
+        if length_filter and not (len(token) > 1 or token in 'aioueıöü'):
+            return self.TOKEN_DROP
+        return vocab.id(token)
+    
+    def process_ids_fused(self, ids, language, options, vocab, length_filter=True, changes=None):
+        """Apply the context-free token stages to an ID row in a single pass.
+
+        Equivalent to handle_negations_advanced -> stopword filter ->
+        spell_check_tokens -> single-character filter on the strings, but each
+        distinct token is planned once (plan_token) and a row only costs one
+        lookup per token. The length filter is left to the caller when Stanza
+        lemmatization runs in between. With a `changes` list, the number of
+        tokens marked as negated and of spelling corrections is appended.
+        """
+        plan = self.token_plan(language, options, vocab, length_filter)
+        for token_id in set(ids).difference(plan):
+            plan[token_id] = self.plan_token(vocab.strings[token_id], language, options, vocab, length_filter)
+        actions = [plan[token_id] for token_id in ids]
+        if self.TOKEN_NEGATE_NEXT not in actions:
+            if changes is not None:
+                changed = [action for token_id, action in zip(ids, actions) if action != token_id and action >= 0]
+                negations = sum(1 for action in changed if self.is_marked(vocab, action)) if changed else 0
+                changes.append((negations, len(changed) - negations))
+            return array('i', [action for action in actions if action >= 0])
+        
+        # Negation words mark the next token: the only stage that looks ahead
+        result = array('i')
+        negations = corrections = 0
+        i = 0
+        n_tokens = len(ids)
+        while i < n_tokens:
+            action = actions[i]
+            i += 1
+            if action >= 0:
+                result.append(action)
+                if action != ids[i - 1]:
+                    if self.is_marked(vocab, action):
+                        negations += 1
+                    else:
+                        corrections += 1
+            elif action == self.TOKEN_NEGATE_NEXT:
+                token_id = ids[i - 1]
+                if i < n_tokens:
+                    token_id = ids[i]
+                    i += 1
+                result.append(vocab.negated(token_id))
+                negations += 1
+        if changes is not None:
+            changes.append((negations, corrections))
+        return result
+    
+    @staticmethod
+    def is_marked(vocab, token_id):
+        """Whether a token ID is a negation-marked token (x_NEG, x_NOT)"""
+        return vocab.strings[token_id].endswith(('_NEG', '_NOT'))
     
+
     def handle_negations(self, text, language):
         """Handle negations in text"""
         if language == "turkish":
@@ -637,22 +3683,38 @@ class AdvancedTextProcessor:
         
         return text
     
-    def normalize_turkish_text(self, text):
-        """Normalize Turkish characters"""
-        # Keep original Turkish characters for now, just clean
-        return text
+    def normalize_turkish_text(self, text, typed=None):
+        """Restore the Turkish letters of ASCII-typed text (typed: the row before casefolding, if it was folded)"""
+        return self.get_deasciifier().deasciify(text, typed)
     
-    def advanced_tokenize(self, text, language="turkish"):
+    @staticmethod
+    def casefold(text, language):
+        """Lowercase with the casing rules of the language"""
+        return turkish_lower(text) if language == "turkish" else text.lower()
+    
+    def get_deasciifier(self):
+        """TurkishDeasciifier learned from the Turkish stopwords and lexicon (built on first use)"""
+        if self._deasciifier is None:
+            path = self.lexicon_file("turkish")
+            lexicon = SymSpellIndex.read_lexicon(path) if os.path.exists(path) else None
+            self._deasciifier = TurkishDeasciifier.from_lexicon(self.stopwords.get("turkish", []), lexicon,
+                                                                keep=self.get_stopword_set("english"))
+        return self._deasciifier
+    
+    def advanced_tokenize(self, text, language="turkish", backend="nltk"):
         """Advanced tokenization with proper sentence and word segmentation"""
         if not text or pd.isna(text):
             return []
         
         text = str(text).strip()
         
-        # Basic tokenization using NLTK
         try:
-            # Use word_tokenize for better tokenization
-            tokens = nltk.word_tokenize(text, language='turkish' if language == 'turkish' else 'english')
+            if backend == "regex":
+                # Precompiled Unicode tokenizer (no sentence splitting needed)
+                tokens = REGEX_TOKEN_PATTERN.findall(text)
+            else:
+                # NLTK: Punkt sentence splitting + Treebank-style word tokenizer
+                tokens = self.nltk_word_tokenize(text, language)
             
             # Clean tokens - remove empty and single character tokens (except meaningful ones)
             meaningful_single_chars = {'a', 'i', 'o', 'u', 'e'}  # Meaningful single character words
@@ -669,17 +3731,108 @@ class AdvancedTextProcessor:
             # Fallback to simple split
             return text.split()
     
+    def nltk_word_tokenize(self, text, language="turkish"):
+        """Same output as nltk.word_tokenize, with the Punkt model loaded once per language"""
+        nltk_language = 'turkish' if language == 'turkish' else 'english'
+        if not hasattr(self, '_nltk_tokenizers'):
+            self._nltk_tokenizers = {}
+        
+        if nltk_language not in self._nltk_tokenizers:
+            try:
+                try:
+                    sentence_tokenizer = nltk.tokenize.PunktTokenizer(nltk_language)  # nltk >= 3.8.2
+                except AttributeError:
+                    sentence_tokenizer = nltk.data.load(f'tokenizers/punkt/{nltk_language}.pickle')
+                word_tokenizer = nltk.tokenize.NLTKWordTokenizer()
+                self._nltk_tokenizers[nltk_language] = (sentence_tokenizer, word_tokenizer)
+            except Exception as e:
+                # Remember the failure so every row doesn't retry the model lookup
+                print(f"NLTK tokenizer could not be loaded ({nltk_language}): {e}")
+                self._nltk_tokenizers[nltk_language] = None
+        
+        tokenizers = self._nltk_tokenizers[nltk_language]
+        if tokenizers is None:
+            raise LookupError(f"NLTK punkt model for '{nltk_language}' is not available")
+        
+        sentence_tokenizer, word_tokenizer = tokenizers
+        return [token for sentence in sentence_tokenizer.tokenize(text)
+                for token in word_tokenizer.tokenize(sentence)]
+    
+    def benchmark_tokenizers(self, texts, language="turkish", options=None):
+        """Compare tokenizer backends on real texts: speed and agreement with NLTK.
+
+        Texts are run through the same character-level cleanup that precedes
+        tokenization in clean_text, so the comparison reflects the actual input.
+        """
+        if options is None:
+            options = self.get_processing_options()
+        prepared = [self.preprocess_text(str(t), language, options) for t in texts if not pd.isna(t)]
+        
+        outputs = {}
+        report = {'rows': len(prepared), 'backends': {}}
+        for backend in TOKENIZER_BACKENDS:
+            self.advanced_tokenize("warm up", language, backend)  # model load is not part of the timing
+            start = time.perf_counter()
+            outputs[backend] = [self.advanced_tokenize(t, language, backend) for t in prepared]
+            elapsed = time.perf_counter() - start
+            n_tokens = sum(len(tokens) for tokens in outputs[backend])
+            report['backends'][backend] = {
+                'seconds': elapsed,
+                'tokens': n_tokens,
+                'rows_per_sec': len(prepared) / elapsed if elapsed > 0 else 0.0,
+            }
+        
+        # Agreement of each backend with the NLTK reference
+        reference = outputs['nltk']
+        for backend in TOKENIZER_BACKENDS:
+            same_rows = 0
+            shared_tokens = 0
+            ref_tokens = 0
+            for ref, out in zip(reference, outputs[backend]):
+                if ref == out:
+                    same_rows += 1
+                shared_tokens += sum((Counter(ref) & Counter(out)).values())
+                ref_tokens += len(ref)
+            stats = report['backends'][backend]
+            stats['row_agreement'] = same_rows / len(prepared) if prepared else 1.0
+            stats['token_agreement'] = shared_tokens / ref_tokens if ref_tokens else 1.0
+        return report
+    
+    def benchmark_tokenizers_threaded(self):
+        """Run the tokenizer benchmark on the selected column in the background"""
+        if self.df is None or not self.column_var.get() or self.column_var.get() not in self.df.columns:
+            messagebox.showwarning("Warning", "Please load a CSV file and select a text column first.")
+            return
+        
+        column_name = self.column_var.get()
+        language = self.language_var.get()
+        texts = self.df[column_name].head(5000).tolist()
+        options = self.get_processing_options()
+        
+        def run():
+            try:
+                report = self.benchmark_tokenizers(texts, language, options)
+                self.log_result(f"\nTokenizer benchmark on '{column_name}' ({report['rows']} rows, {language}):")
+                for backend, stats in report['backends'].items():
+                    self.log_result(f"  {backend:<6} {stats['seconds']:.3f}s  {stats['rows_per_sec']:.0f} rows/s  "
+                                    f"{stats['tokens']} tokens  row agreement {stats['row_agreement']:.1%}  "
+                                    f"token agreement {stats['token_agreement']:.1%}")
+            except Exception as e:
+                self.log_result(f"Tokenizer benchmark failed: {e}")
+        
+        threading.Thread(target=run, daemon=True).start()
+    
     def handle_negations_advanced(self, tokens, language="turkish"):
         """Advanced negation handling that combines negation words with following words"""
         if not tokens:
             return []
         
         if language == "turkish":
-            negation_words = ['değil', 'yok', 'hiç', 'asla', 'hayır', 'olmaz', 'imkansız']
-            negation_suffixes = ['ma', 'me', 'maz', 'mez']
+            negation_words = self.NEGATION_WORDS['turkish']
+            negation_suffixes = self.TURKISH_NEGATION_SUFFIXES
         else:
-            negation_words = ['not', 'no', 'never', 'nothing', 'nobody', 'nowhere', 'neither']
-            contractions = ["n't", "nt"]
+            negation_words = self.NEGATION_WORDS['english']
+            contractions = self.ENGLISH_CONTRACTIONS
         
         result_tokens = []
         i = 0
@@ -779,11 +3932,14 @@ class AdvancedTextProcessor:
             
         return False
     
-    def spell_check_tokens(self, tokens, language="turkish"):
+    def spell_check_tokens(self, tokens, language="turkish", use_custom=None):
         """Apply spell checking to tokens"""
         if not self.spell_available or not tokens:
             return tokens
         
+        if use_custom is None:
+            use_custom = self.get_processing_options()['use_custom_corrections']
+        
         corrected_tokens = []
         
         for token in tokens:
@@ -791,35 +3947,43 @@ class AdvancedTextProcessor:
             if '_NEG' in token or '_NOT' in token or len(token) < 3:
                 corrected_tokens.append(token)
                 continue
-
-            # Apply custom corrections first (exact match on lowercase)
-            if self.use_custom_corrections_var.get():
-                t_low = token.lower()
-                if t_low in self.custom_corrections:
-                    corrected_tokens.append(self.custom_corrections[t_low])
-                    continue
-            
-            if language == "english" and self.spell_en:
-                # Use pyspellchecker for English
-                if token.lower() not in self.spell_en:
-                    # Get correction
-                    correction = self.spell_en.correction(token.lower())
-                    if correction and correction != token.lower():
-                        corrected_tokens.append(correction)
-                    else:
-                        corrected_tokens.append(token)
-                else:
-                    corrected_tokens.append(token)
             
-            elif language == "turkish":
-                # Basic Turkish spell checking using common patterns
-                corrected = self.basic_turkish_spell_check(token)
-                corrected_tokens.append(corrected)
-            
-            else:
-                corrected_tokens.append(token)
+            corrected_tokens.append(self.correct_token(token, self.casefold(token, language), language, use_custom))
         
         return corrected_tokens
+    
+    def correct_token(self, token, token_lower, language, use_custom=True):
+        """Correct a single (non-marker) token; token_lower is its lowercase form"""
+        # Apply custom corrections first (exact match on lowercase)
+        if use_custom and token_lower in self.custom_corrections:
+            return self.custom_corrections[token_lower]
+        
+        index = self.get_spell_index(language)
+        if language == "english" and self.spell_en:
+            # Closest word of the symmetric-delete index (pyspellchecker's
+            # lexicon); pyspellchecker itself only when the index is missing
+            if index is not None:
+                match = index.lookup(token_lower)
+                if match is not None and match[1] > 0:
+                    return match[0]
+            elif token_lower not in self.spell_en:
+                # Get correction
+                correction = self.spell_en.correction(token_lower)
+                if correction and correction != token_lower:
+                    return correction
+            return token
+        
+        if language == "turkish":
+            # Basic Turkish spell checking using common patterns; words the
+            # rules leave alone go to the index of the learned lexicon
+            corrected = self.basic_turkish_spell_check(token)
+            if corrected == token and index is not None:
+                match = index.lookup(token_lower)
+                if match is not None and match[1] > 0:
+                    return match[0]
+            return corrected
+        
+        return token
 
     def load_custom_corrections_json(self, silent=False):
         """Load custom corrections from a JSON file."""
@@ -845,6 +4009,7 @@ class AdvancedTextProcessor:
                 data = json.load(f)
                 # Normalize keys to lowercase strings
                 self.custom_corrections = {str(k).lower(): str(v) for k, v in data.items()}
+            self.reset_caches()
             if hasattr(self, 'cc_status_label'):
                 self.cc_status_label.config(text=f"Loaded {len(self.custom_corrections)} corrections from {os.path.basename(file_path)}")
             if not silent:
@@ -875,9 +4040,23 @@ class AdvancedTextProcessor:
     def clear_custom_corrections(self):
         """Clear in-memory custom corrections."""
         self.custom_corrections = {}
+        self.reset_caches()
         if hasattr(self, 'cc_status_label'):
             self.cc_status_label.config(text="Loaded 0 corrections.")
 
+    def learn_lexicon_from_files(self):
+        """Pick processed CSVs and learn the Turkish spelling lexicon from them (see learn_lexicon)"""
+        files = filedialog.askopenfilenames(title="Select processed CSV files",
+                                            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not files:
+            return
+        try:
+            words = self.learn_lexicon(files, "turkish")
+            messagebox.showinfo("Success", f"Turkish lexicon has {words} words "
+                                           f"({self.lexicon_file('turkish')}).")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to learn lexicon: {e}")
+
     def build_corrections_from_input_dir(self):
         """Auto-build corrections from CSVs under ./input (speel.csv, speelbygemini.csv)."""
         try:
@@ -894,6 +4073,7 @@ class AdvancedTextProcessor:
             learned = self.build_corrections_from_csvs(files)
             # Merge into existing
             self.custom_corrections.update(learned)
+            self.reset_caches()
             if hasattr(self, 'cc_status_label'):
                 self.cc_status_label.config(text=f"Loaded {len(self.custom_corrections)} corrections (learned {len(learned)}).")
             messagebox.showinfo("Success", f"Learned {len(learned)} corrections from corpus.")
@@ -974,7 +4154,7 @@ class AdvancedTextProcessor:
     
     def basic_turkish_spell_check(self, word):
         """Basic Turkish spell checking with common fixes and abbreviation expansion"""
-        word_lower = word.lower()
+        word_lower = turkish_lower(word)
         
         # Turkish abbreviations and expansions
         abbreviations = {
@@ -1133,21 +4313,9 @@ class AdvancedTextProcessor:
         if word_lower in common_fixes:
             return common_fixes[word_lower]
         
-        # Check for common character replacements
-        corrected = word_lower
-        
-        # Common Turkish character corrections
-        char_fixes = {
-            'i̇': 'i',  # Dotted i
-            'ı': 'ı',   # Dotless i
-            'I': 'ı',   # Capital I to dotless i (in lowercase context)
-        }
-        
-        for wrong, correct in char_fixes.items():
-            corrected = corrected.replace(wrong, correct)
-        
-        # Advanced pattern-based corrections
-        corrected = self.advanced_pattern_correction(corrected)
+        # Advanced pattern-based corrections (Turkish letters of ASCII-typed
+        # words are restored by normalize_turkish_text)
+        corrected = self.advanced_pattern_correction(word_lower)
         
         # If word was modified, return corrected version
         if corrected != word_lower:
@@ -1191,11 +4359,6 @@ class AdvancedTextProcessor:
             (r'porgram', 'program'),
             (r'proğram', 'program'),
             (r'comupter', 'computer'),
-            
-            # ğ/g confusions
-            (r'dogru', 'doğru'),
-            (r'saglik', 'sağlık'),
-            (r'ogrenci', 'öğrenci'),
         ]
         
         corrected = word
@@ -1204,35 +4367,224 @@ class AdvancedTextProcessor:
         
         return corrected
     
-    def stanza_lemmatize(self, text, language="turkish"):
-        """Stanza ile profesyonel lemmatization ve n-gram oluşturma"""
-        if not self.stanza_ready or not text.strip():
-            return text.split()
-        
-        try:
-            doc = self.stanza_nlp(text)
-            lemmas = []
-            
-            # Unigram'ları (tekli kelimeler) topla
-            for sentence in doc.sentences:
-                for word in sentence.words:
-                    # Sadece anlamlı kelimeleri al (NOUN, VERB, ADJ, ADV, PROPN)
-                    if word.upos in ['NOUN', 'VERB', 'ADJ', 'ADV', 'PROPN']:
-                        # Negasyon ekini koru
-                        if '_NEG' in word.text or '_NOT' in word.text:
-                            lemmas.append(f"{word.lemma}_NEG")
-                        else:
-                            lemmas.append(word.lemma.lower())
-            
-            # Bigram'ları (ikili kelime grupları) oluştur
-            bigrams = ['_'.join(gram) for gram in nltk.bigrams(lemmas)]
-            
-            # Unigram ve Bigram'ları birleştir
-            return lemmas + bigrams
-            
-        except Exception as e:
-            print(f"Stanza lemmatization hatası: {e}")
-            return text.split()
+    def stanza_lemmatize(self, text, language="turkish"):
+        """Stanza ile profesyonel lemmatization ve n-gram oluşturma"""
+        return self.stanza_lemmatize_batch([text], language)[0]
+    
+    @property
+    def stanza_nlp(self):
+        """Turkish Stanza pipeline (reloaded through the pool if it was evicted)"""
+        return self.stanza_pool.get('turkish') if self.stanza_ready else None
+    
+    def get_stanza_pipeline(self, language="turkish"):
+        """Stanza pipeline of a language from the model pool (lazy loaded)"""
+        return self.stanza_pool.get(language)
+    
+    def on_stanza_budget_change(self, *args):
+        """Apply the Stanza memory budget from the settings tab"""
+        try:
+            budget = self.stanza_budget_var.get()
+        except tk.TclError:
+            return
+        self.stanza_pool.memory_budget_mb = budget or None
+        self.stanza_pool.evict()
+    
+    def log_stanza_models(self):
+        """Log loaded Stanza models with their load times and sizes"""
+        budget = self.stanza_pool.memory_budget_mb
+        self.log_result(f"\nStanza models (memory budget: {f'{budget} MB' if budget else 'unlimited'}, "
+                        f"evictions: {self.stanza_pool.evictions}):")
+        for entry in self.stanza_pool.report():
+            if entry['error']:
+                self.log_result(f"  {entry['language']:<8} failed: {entry['error']}")
+            else:
+                state = "loaded" if entry['loaded'] else "evicted"
+                self.log_result(f"  {entry['language']:<8} {state:<8} {entry['size_mb']:>8.1f} MB  "
+                                f"load {entry['load_seconds']:.1f}s")
+    
+    def stanza_lemmatize_batch(self, texts, language="turkish"):
+        """stanza_lemmatize for many texts with bulk Stanza calls.
+
+        Lemma lists are memoized per language in the shared 'lemma' cache and
+        each distinct text is sent to Stanza once. Texts longer than
+        STANZA_SEGMENT_TOKENS are split into segments (see split_segments); all
+        segments are sorted by length and sent in batches of about
+        STANZA_BATCH_TOKENS tokens, so one huge row neither stalls nor pads a
+        batch of short ones. Results are reassembled in the original order.
+        """
+        results = [text.split() for text in texts]
+        if not self.stanza_ready:
+            return results
+        pipeline = self.get_stanza_pipeline(language)
+        if pipeline is None:
+            return results
+        
+        cache = self.get_cache('lemma', language)
+        missing = {}  # distinct uncached text -> row indices
+        for i, text in enumerate(texts):
+            if not text.strip():
+                continue
+            cached = cache.get(text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+        if not missing:
+            return results
+        
+        # (text number, segment number, segment text, tokens), shortest first
+        unique_texts = list(missing)
+        units = []
+        for number, text in enumerate(unique_texts):
+            for segment_number, segment in enumerate(self.split_segments(text.split())):
+                units.append((number, segment_number, ' '.join(segment), len(segment)))
+        units.sort(key=lambda unit: unit[3])
+        
+        segment_lemmas = {}  # (text number, segment number) -> content lemmas, None if Stanza failed
+        batch = []
+        batch_tokens = 0
+        for unit in units + [None]:
+            if batch and (unit is None or batch_tokens + unit[3] > self.STANZA_BATCH_TOKENS):
+                segment_lemmas.update(self.lemmatize_segments(pipeline, batch))
+                batch = []
+                batch_tokens = 0
+            if unit is not None:
+                batch.append(unit)
+                batch_tokens += unit[3]
+        
+        if len(cache) > self.CACHE_LIMIT:
+            cache.clear()
+        segment_counts = Counter(unit[0] for unit in units)
+        for number, text in enumerate(unique_texts):
+            parts = [segment_lemmas[(number, segment_number)] for segment_number in range(segment_counts[number])]
+            if any(part is None for part in parts):
+                lemmas = text.split()  # not cached, so the text is retried next time
+            else:
+                lemmas = cache[text] = self.with_bigrams([lemma for part in parts for lemma in part])
+            for i in missing[text]:
+                results[i] = lemmas
+        return results
+    
+    def lemmatize_segments(self, pipeline, units):
+        """Content lemmas of a batch of segment units; one by one if the bulk call fails"""
+        texts = [unit[2] for unit in units]
+        try:
+            docs = [pipeline(texts[0])] if len(texts) == 1 else pipeline.bulk_process(texts)
+        except Exception as e:
+            print(f"Stanza toplu lemmatization hatası, tek tek deneniyor: {e}")
+            docs = []
+            for text in texts:
+                try:
+                    docs.append(pipeline(text))
+                except Exception as e:
+                    print(f"Stanza lemmatization hatası: {e}")
+                    docs.append(None)
+        
+        lemmas = {}
+        for unit, doc in zip(units, docs):
+            try:
+                lemmas[unit[:2]] = self.content_lemmas(doc) if doc is not None else None
+            except Exception as e:
+                print(f"Stanza lemmatization hatası: {e}")
+                lemmas[unit[:2]] = None
+        return lemmas
+    
+    def split_segments(self, tokens, max_tokens=None):
+        """Split a token list into segments of at most max_tokens.
+
+        Cuts go after the last sentence-ending token ('.', '!'...) of a
+        segment when there is one. Those tokens only survive with the
+        punctuation and special-character options off; with either on (the
+        default) punctuation is gone before tokenization and rows are cut
+        every max_tokens tokens.
+        """
+        max_tokens = max_tokens or self.STANZA_SEGMENT_TOKENS
+        if len(tokens) <= max_tokens:
+            return [tokens]
+        segments = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + max_tokens, len(tokens))
+            if end < len(tokens):
+                for i in range(end - 1, start, -1):
+                    if tokens[i][-1:] in self.SENTENCE_END_CHARS:
+                        end = i + 1
+                        break
+            segments.append(tokens[start:end])
+            start = end
+        return segments
+    
+    def apply_token_budget(self, tokens, options):
+        """Limit a row to options['max_tokens'] tokens before the model stage (0: no limit).
+
+        'head' keeps the first tokens, 'head_tail' the first and last halves.
+        """
+        budget = options['max_tokens']
+        if not budget or len(tokens) <= budget:
+            return tokens
+        if options['truncation'] == 'head_tail':
+            head = (budget + 1) // 2
+            return tokens[:head] + tokens[len(tokens) - (budget - head):]
+        return tokens[:budget]
+    
+    def stanza_lemmatize_ids(self, id_rows, language, vocab):
+        """stanza_lemmatize_batch for ID rows; returns lemma ID arrays.
+
+        Results are memoized in the vocabulary by the bytes of the ID row, so
+        only rows not seen before are turned back into text for Stanza.
+        """
+        cache = vocab.memo.setdefault(('lemma', language), {})
+        results = [None] * len(id_rows)
+        missing = {}  # ID row bytes -> row indices
+        for i, ids in enumerate(id_rows):
+            key = ids.tobytes()
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(key, []).append(i)
+        if not missing:
+            return results
+        
+        keys = list(missing)
+        texts = [' '.join(vocab.decode(id_rows[missing[key][0]])) for key in keys]
+        text_cache = self.get_cache('lemma', language)
+        for key, text, lemmas in zip(keys, texts, self.stanza_lemmatize_batch(texts, language)):
+            lemma_ids = vocab.encode(lemmas)
+            if text in text_cache:  # failed rows are retried next time, like in the text cache
+                cache[key] = lemma_ids
+            for i in missing[key]:
+                results[i] = lemma_ids
+        return results
+    
+    def lemmas_from_doc(self, doc):
+        """Content-word lemmas of a Stanza document followed by their bigrams"""
+        return self.with_bigrams(self.content_lemmas(doc))
+    
+    def content_lemmas(self, doc):
+        """Lemmas of the content words (NOUN, VERB, ADJ, ADV, PROPN) of a Stanza document"""
+        lemmas = []
+        
+        # Unigram'ları (tekli kelimeler) topla
+        for sentence in doc.sentences:
+            for word in sentence.words:
+                # Sadece anlamlı kelimeleri al (NOUN, VERB, ADJ, ADV, PROPN)
+                if word.upos in ['NOUN', 'VERB', 'ADJ', 'ADV', 'PROPN']:
+                    # Negasyon ekini koru
+                    if '_NEG' in word.text or '_NOT' in word.text:
+                        lemmas.append(f"{word.lemma}_NEG")
+                    else:
+                        lemmas.append(word.lemma.lower())
+        return lemmas
+    
+    @staticmethod
+    def with_bigrams(lemmas):
+        """Lemmas followed by their bigrams (lemma_lemma)"""
+        # Bigram'ları (ikili kelime grupları) oluştur
+        bigrams = ['_'.join(gram) for gram in nltk.bigrams(lemmas)]
+        
+        # Unigram ve Bigram'ları birleştir
+        return lemmas + bigrams
     
     def test_hybrid_nlp(self):
         """Hibrit NLP sistemini test et"""
@@ -1338,7 +4690,7 @@ class AdvancedTextProcessor:
                     # File label'ı sıfırla
                     self.file_label.config(text="❌ Dosya okunamadı", foreground="red")
                     # Column combobox'ı temizle
-                    self.column_combo['values'] = []
+                    self.set_column_choices([])
                     self.column_var.set("")
     
     def update_file_info_and_columns(self, df, filename):
@@ -1365,12 +4717,12 @@ class AdvancedTextProcessor:
         
         # Column combobox'ı güncelle
         if text_columns:
-            self.column_combo['values'] = text_columns
+            self.set_column_choices(text_columns)
             self.column_var.set(text_columns[0])  # İlk text sütununu seç
             self.info_text.insert('end', f"Text sütunları: {text_columns}\n")
             self.info_text.insert('end', f"Seçilen sütun: {text_columns[0]}\n")
         else:
-            self.column_combo['values'] = list(df.columns)
+            self.set_column_choices(list(df.columns))
             self.column_var.set("")
             self.info_text.insert('end', "⚠️  Text sütunu bulunamadı. Tüm sütunlar gösteriliyor.\n")
         
@@ -1388,62 +4740,74 @@ class AdvancedTextProcessor:
             messagebox.showwarning("Uyarı", "Önce bir CSV dosyası seçin.")
             return
         
+        if self.memory_report_var.get():
+            self.start_memory_profile()
+        if self.profile_var.get():
+            self.start_profile()
         try:
             # Dosyayı oku
-            df = self.detect_and_read_csv(self.current_file)
+            with self.phase('load'):
+                df = self.detect_and_read_csv(self.current_file)
             if df is None:
                 return
             
-            # Seçilen sütunu kontrol et
-            selected_column = self.column_var.get()
-            if not selected_column:
+            # Seçilen sütunları kontrol et
+            if not self.column_var.get():
                 messagebox.showerror("Hata", "Lütfen işlenecek sütunu seçin.")
                 return
             
-            if selected_column not in df.columns:
-                messagebox.showerror("Hata", f"Seçilen sütun '{selected_column}' dosyada bulunamadı.")
-                return
+            columns = self.get_selected_columns()
+            for column in columns:
+                if column not in df.columns:
+                    messagebox.showerror("Hata", f"Seçilen sütun '{column}' dosyada bulunamadı.")
+                    return
             
-            # Seçilen sütunu işle
-            column = selected_column
-            self.progress_label.config(text=f"İşleniyor: {column}")
+            self.progress_label.config(text=f"İşleniyor: {', '.join(columns)}")
             
             # İşleme başla
-            self.current_data = df.copy()
-            self.original_data = df.copy()
+            with self.phase('copy'):
+                self.current_data = df.copy()
+                self.original_data = df.copy()
             
-            processed_texts = []
             total_rows = len(df)
-            self.progress.config(maximum=total_rows)
+            self.progress.config(maximum=total_rows * len(columns))
+            options = self.get_processing_options()
             
-            for idx, text in enumerate(df[column]):
-                if pd.isna(text):
-                    processed_texts.append("")
-                else:
-                    processed = self.clean_text(str(text))
-                    processed_texts.append(processed)
-                
+            def update_progress(done, total, column):
                 # Progress güncellemesi
-                self.progress.config(value=idx + 1)
-                self.progress_label.config(text=f"İşleniyor: {idx + 1}/{total_rows}")
+                self.progress.config(value=done)
+                self.progress_label.config(text=f"İşleniyor ({column}): {done}/{total}")
                 self.root.update_idletasks()
             
+            # Tüm sütunlar tek okuma ile, ortak önbellekler kullanılarak işlenir
+            detected_languages = {}
+            with self.phase('process'):
+                results = self.process_columns(df, columns, self.language_var.get(), options,
+                                               progress_callback=update_progress,
+                                               languages_out=detected_languages,
+                                               workers=1 if self.run_profiler is not None else None)
+            
             # Sonuçları kaydet
-            self.current_data[f'{column}_processed'] = processed_texts
+            with self.phase('save'):
+                for column, processed_texts in results.items():
+                    self.current_data[f'{column}_processed'] = processed_texts
+                for column, languages in detected_languages.items():
+                    self.current_data[f'{column}_language'] = languages
             
             # Sonuçları göster
             self.results_text.delete('1.0', 'end')
             self.results_text.insert('end', f"İşlem tamamlandı!\n\n")
-            self.results_text.insert('end', f"İşlenen sütun: {column}\n")
+            self.results_text.insert('end', f"İşlenen sütun(lar): {', '.join(columns)}\n")
             self.results_text.insert('end', f"Toplam satır: {total_rows}\n\n")
             
             # İlk 5 örneği göster
-            for i in range(min(5, len(df))):
-                original = str(df.iloc[i][column])[:100]
-                processed = processed_texts[i][:100]
-                self.results_text.insert('end', f"Örnek {i+1}:\n")
-                self.results_text.insert('end', f"  Orijinal: {original}...\n")
-                self.results_text.insert('end', f"  İşlenmiş: {processed}...\n\n")
+            for column, processed_texts in results.items():
+                for i in range(min(5, len(df))):
+                    original = str(df.iloc[i][column])[:100]
+                    processed = processed_texts[i][:100]
+                    self.results_text.insert('end', f"Örnek {i+1} ({column}):\n")
+                    self.results_text.insert('end', f"  Orijinal: {original}...\n")
+                    self.results_text.insert('end', f"  İşlenmiş: {processed}...\n\n")
             
             self.progress_label.config(text="Tamamlandı ✅")
             messagebox.showinfo("Başarılı", "Dosya işleme tamamlandı!")
@@ -1451,6 +4815,9 @@ class AdvancedTextProcessor:
         except Exception as e:
             messagebox.showerror("Hata", f"Dosya işleme hatası: {e}")
             self.progress_label.config(text="Hata ❌")
+        finally:
+            self.finish_memory_profile(self.memory_report_path(self.current_file))
+            self.finish_profile(self.current_file)
     
     def save_results(self):
         """İşlenmiş sonuçları kaydet"""
@@ -1471,16 +4838,32 @@ class AdvancedTextProcessor:
             except Exception as e:
                 messagebox.showerror("Hata", f"Kaydetme hatası: {e}")
     
-    def detect_and_read_csv(self, filename):
-        """CSV dosyasını encoding tespit ederek oku"""
+    def read_csv_file(self, filename, encoding, workers=None, keep_index=False):
+        """pd.read_csv; large files are parsed as byte ranges by the worker processes (see CsvRowIndex).
+
+        With keep_index, the row index built for the split is saved next to
+        the file for later runs and previews.
+        """
+        workers = workers or self.tuning['workers']
+        if workers > 1 and FORK_AVAILABLE and os.path.getsize(filename) >= self.PARALLEL_READ_BYTES:
+            index = CsvRowIndex.open(filename, persist=keep_index)
+            return index.read_csv_parallel(filename, encoding, workers)
+        if keep_index:
+            CsvRowIndex.open(filename, persist=True)
+        return pd.read_csv(filename, encoding=encoding)
+    
+    def detect_and_read_csv(self, filename, workers=None, keep_index=False):
+        """CSV dosyasını encoding tespit ederek oku (büyük dosyalar paralel okunur)"""
         try:
             # Önce utf-8 dene
-            return pd.read_csv(filename, encoding='utf-8')
+            return self.read_csv_file(filename, 'utf-8', workers, keep_index)
         except UnicodeDecodeError:
             try:
                 # Latin-1 dene
-                return pd.read_csv(filename, encoding='latin-1')
+                return self.read_csv_file(filename, 'latin-1', workers, keep_index)
             except Exception as e:
+                if self.headless:
+                    raise
                 messagebox.showerror("Hata", f"Dosya okunamadı: {e}")
                 return None
     
@@ -1524,25 +4907,93 @@ class AdvancedTextProcessor:
         
         return word
     
-    def add_sentiment_columns(self):
-        """Add sentiment analysis columns based on score"""
-        if 'score' in self.df.columns:
-            def categorize_sentiment(score):
-                try:
-                    score = float(score)
-                    if score in [1, 2]:
-                        return 'negative'
-                    elif score == 3:
-                        return 'neutral'
-                    elif score in [4, 5]:
-                        return 'positive'
-                    else:
-                        return 'unknown'
-                except:
-                    return 'unknown'
-            
-            self.df['sentiment'] = self.df['score'].apply(categorize_sentiment)
-            self.log_result("Added sentiment categorization based on score.")
+    @staticmethod
+    def sentiment_of_score(score):
+        """Sentiment category of a 1-5 score"""
+        try:
+            score = float(score)
+            if score in [1, 2]:
+                return 'negative'
+            elif score == 3:
+                return 'neutral'
+            elif score in [4, 5]:
+                return 'positive'
+            else:
+                return 'unknown'
+        except:
+            return 'unknown'
+    
+    @classmethod
+    def rating_column_of(cls, columns, rating_column=None):
+        """Column the sentiment is derived from: rating_column, else the first of RATING_COLUMNS present"""
+        if rating_column:
+            return rating_column if rating_column in columns else None
+        return next((column for column in cls.RATING_COLUMNS if column in columns), None)
+    
+    @classmethod
+    def sentiment_of_ratings(cls, ratings):
+        """Vectorized sentiment_of_score of a rating Series (converted once per distinct value)"""
+        codes, values = pd.factorize(ratings)
+        sentiments = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').map(cls.SENTIMENT_OF_RATING)
+        sentiments = pd.concat([sentiments.fillna('unknown'), pd.Series(['unknown'])], ignore_index=True)
+        return pd.Series(sentiments.to_numpy()[codes], index=ratings.index)
+    
+    @staticmethod
+    def comment_ids(first_id, count, digits):
+        """Zero-padded comment_id values first_id, first_id + 1, ..."""
+        return pd.RangeIndex(first_id, first_id + count).astype(str).str.zfill(digits)
+    
+    @classmethod
+    def feature_columns(cls, processed, features=None, prefix='comment'):
+        """{prefix}_tokens and the ROW_FEATURES columns of one processed column as Int64.
+
+        Token counts come from the processed texts; the other counts were
+        captured while cleaning (rows without them, e.g. resumed from an
+        older checkpoint, are NA).
+        """
+        processed = pd.Series(processed).fillna('').astype(str)
+        columns = {f'{prefix}_tokens': (processed.str.count(' ') + processed.ne('')).astype('Int64')}
+        if features is not None:
+            if None in features:
+                missing = (pd.NA,) * len(cls.ROW_FEATURES)
+                counts = pd.DataFrame([missing if row is None else row for row in features],
+                                      columns=cls.ROW_FEATURES, index=processed.index, dtype='Int64')
+            else:
+                values = np.array(features, dtype=np.int64).reshape(len(features), len(cls.ROW_FEATURES))
+                counts = pd.DataFrame(values, columns=cls.ROW_FEATURES, index=processed.index).astype('Int64')
+            for name in cls.ROW_FEATURES:
+                columns[f'{prefix}_{name}'] = counts[name]
+        return columns
+    
+    def output_frame(self, frame, columns, results, languages=None, first_id=1, id_digits=None, features=None):
+        """Frame (or chunk of a file) with the columns add_processed_columns adds, without logging.
+
+        Used where self.df must not be touched: streamed chunks and batch jobs.
+        """
+        for column, processed in results.items():
+            frame[f"{column}_processed"] = processed
+        for column, row_languages in (languages or {}).items():
+            frame[f"{column}_language"] = row_languages
+        id_digits = id_digits or len(str(len(frame)))
+        frame.insert(0, 'comment_id', self.comment_ids(first_id, len(frame), id_digits).values)
+        for column in columns:
+            prefix = 'comment' if len(columns) == 1 else column
+            frame[f'{prefix}_length_original'] = frame[column].astype(str).str.len().astype('Int64')
+            frame[f'{prefix}_length_processed'] = frame[f"{column}_processed"].astype(str).str.len().astype('Int64')
+            for name, values in self.feature_columns(frame[f"{column}_processed"],
+                                                     (features or {}).get(column), prefix).items():
+                frame[name] = values
+        rating_column = self.rating_column_of(frame.columns, self.rating_column)
+        if rating_column is not None:
+            frame['sentiment'] = self.sentiment_of_ratings(frame[rating_column])
+        return frame
+    
+    def add_sentiment_columns(self, rating_column=None):
+        """Add sentiment analysis columns based on the rating column (score/rating)"""
+        rating_column = self.rating_column_of(self.df.columns, rating_column or self.rating_column)
+        if rating_column is not None:
+            self.df['sentiment'] = self.sentiment_of_ratings(self.df[rating_column])
+            self.log_result(f"Added sentiment categorization based on {rating_column}.")
     
     def add_id_column(self):
         """Add ID column with dynamic format based on total rows"""
@@ -1551,35 +5002,42 @@ class AdvancedTextProcessor:
         # Determine number of digits needed
         digits = len(str(total_rows))
         
-        # Generate IDs with proper padding
-        ids = []
-        for i in range(1, total_rows + 1):
-            id_str = str(i).zfill(digits)
-            ids.append(id_str)
-        
         # Add ID column at the beginning
+        ids = self.comment_ids(1, total_rows, digits)
         self.df.insert(0, 'comment_id', ids)
-        self.log_result(f"Added comment_id column with {digits}-digit format (e.g., {ids[0]}, {ids[-1]})")
+        if total_rows:
+            self.log_result(f"Added comment_id column with {digits}-digit format (e.g., {ids[0]}, {ids[-1]})")
+    
+    def add_feature_columns(self, column_name, processed_column, prefix='comment', features=None):
+        """Add token count and cleaning count columns of a processed column"""
+        for name, values in self.feature_columns(self.df[processed_column], features, prefix).items():
+            self.df[name] = values.values
+        self.log_result(f"Added {prefix}_tokens" + (f" and {prefix}_{{{','.join(self.ROW_FEATURES)}}} columns"
+                                                     if features is not None else " column"))
     
-    def add_comment_length_columns(self, original_column, processed_column):
+    def add_comment_length_columns(self, original_column, processed_column, prefix='comment', stats=None):
         """Add comment length columns for both original and processed text"""
         # Calculate length of original text
-        self.df['comment_length_original'] = self.df[original_column].astype(str).str.len()
+        self.df[f'{prefix}_length_original'] = self.df[original_column].astype(str).str.len()
         
         # Calculate length of processed text
-        self.df['comment_length_processed'] = self.df[processed_column].astype(str).str.len()
+        self.df[f'{prefix}_length_processed'] = self.df[processed_column].astype(str).str.len()
         
-        # Show statistics
-        original_avg = self.df['comment_length_original'].mean()
-        processed_avg = self.df['comment_length_processed'].mean()
+        # Show statistics (from the run's streaming stats when available)
+        if stats is not None:
+            original_avg = stats.original_length.mean
+            processed_avg = stats.processed_length.mean
+        else:
+            original_avg = self.df[f'{prefix}_length_original'].mean()
+            processed_avg = self.df[f'{prefix}_length_processed'].mean()
         reduction = ((original_avg - processed_avg) / original_avg * 100) if original_avg > 0 else 0
         
         self.log_result(f"Added comment length columns:")
-        self.log_result(f"  - comment_length_original (avg: {original_avg:.1f} chars)")
-        self.log_result(f"  - comment_length_processed (avg: {processed_avg:.1f} chars)")
+        self.log_result(f"  - {prefix}_length_original (avg: {original_avg:.1f} chars)")
+        self.log_result(f"  - {prefix}_length_processed (avg: {processed_avg:.1f} chars)")
         self.log_result(f"  - Length reduction: {reduction:.1f}%")
     
-    def show_processing_results(self, original_column, processed_column):
+    def show_processing_results(self, original_column, processed_column, prefix='comment', stats=None):
         """Show processing results"""
         self.log_result("\n" + "="*60)
         self.log_result("PROCESSING RESULTS")
@@ -1596,35 +5054,32 @@ class AdvancedTextProcessor:
             self.log_result("-" * 40)
         
         # Show statistics
-        self.show_statistics(original_column, processed_column)
+        self.show_statistics(original_column, processed_column, prefix, stats)
     
-    def show_statistics(self, original_column, processed_column):
-        """Show processing statistics"""
+    def show_statistics(self, original_column, processed_column, prefix='comment', stats=None):
+        """Show processing statistics.
+
+        Uses the StreamingStats collected while the column was processed; without
+        them the statistics are gathered from the dataframe in a single pass.
+        """
         self.log_result("\nProcessing Statistics:")
         self.log_result("-" * 30)
         
-        # Count non-empty texts
-        original_non_empty = self.df[original_column].notna().sum()
-        processed_non_empty = self.df[processed_column].str.len().gt(0).sum()
-        
-        self.log_result(f"Total rows: {len(self.df)}")
-        self.log_result(f"Original non-empty: {original_non_empty}")
-        self.log_result(f"Processed non-empty: {processed_non_empty}")
-        
-        # Average text length
-        original_avg_len = self.df[original_column].str.len().mean()
-        processed_avg_len = self.df[processed_column].str.len().mean()
-        
-        self.log_result(f"Average original length: {original_avg_len:.1f} chars")
-        self.log_result(f"Average processed length: {processed_avg_len:.1f} chars")
-        self.log_result(f"Length reduction: {((original_avg_len - processed_avg_len) / original_avg_len * 100):.1f}%")
+        language_column = f"{original_column}_language"
+        if stats is None:
+            stats = StreamingStats()
+            stats.add(self.df[original_column].tolist(), self.df[processed_column].fillna('').astype(str).tolist(),
+                      self.df[language_column].tolist() if language_column in self.df.columns else None)
+        self.log_stats(stats)
         
         # Show column info
         self.log_result(f"\nNew columns added:")
         self.log_result(f"- comment_id")
         self.log_result(f"- {processed_column}")
-        self.log_result(f"- comment_length_original")
-        self.log_result(f"- comment_length_processed")
+        self.log_result(f"- {prefix}_length_original")
+        self.log_result(f"- {prefix}_length_processed")
+        if language_column in self.df.columns:
+            self.log_result(f"- {language_column}")
         
         if 'sentiment' in self.df.columns:
             self.log_result("- sentiment")
@@ -1636,8 +5091,41 @@ class AdvancedTextProcessor:
         
         self.log_result(f"\nFinal dataframe shape: {self.df.shape}")
     
+    def log_stats(self, stats):
+        """Log the counts, lengths and top tokens of a StreamingStats"""
+        # Count non-empty texts
+        self.log_result(f"Total rows: {stats.rows}")
+        self.log_result(f"Original non-empty: {stats.original_non_empty}")
+        self.log_result(f"Processed non-empty: {stats.rows - stats.processed_empty}")
+        
+        if stats.languages:
+            self.log_result("Rows per detected language:")
+            for row_language, count in stats.languages.most_common():
+                self.log_result(f"  {row_language}: {count} ({count / max(stats.rows, 1) * 100:.1f}%)")
+        
+        # Average text length
+        original_avg_len = stats.original_length.mean
+        processed_avg_len = stats.processed_length.mean
+        self.log_result(f"Average original length: {original_avg_len:.1f} chars (std {stats.original_length.std:.1f})")
+        self.log_result(f"Average processed length: {processed_avg_len:.1f} chars (std {stats.processed_length.std:.1f})")
+        if original_avg_len:
+            self.log_result(f"Length reduction: {((original_avg_len - processed_avg_len) / original_avg_len * 100):.1f}%")
+        self.log_result(f"Tokens per row: {stats.tokens.mean:.1f} (std {stats.tokens.std:.1f})")
+        if stats.skipped:
+            self.log_result("Rows that skipped the remaining stages:")
+            for name, description in self.EARLY_EXITS.items():
+                if stats.skipped[name]:
+                    self.log_result(f"  {description}: {stats.skipped[name]}")
+        
+        # Approximate most frequent tokens and bigrams
+        self.log_result("Top tokens: " + ", ".join(f"{token} ({count})" for token, count in stats.top_tokens.top(10)))
+        self.log_result("Top bigrams: " + ", ".join(f"{a} {b} ({count})" for (a, b), count in stats.top_bigrams.top(10)))
+    
     def log_result(self, message):
         """Log message to results"""
+        if self.headless:
+            print(message)
+            return
         self.results_text.insert(tk.END, message + "\n")
         self.results_text.see(tk.END)
         self.root.update_idletasks()
@@ -1682,6 +5170,10 @@ class AdvancedTextProcessor:
         if file_path:
             try:
                 self.df.to_csv(file_path, index=False, encoding='utf-8')
+                if self.run_checkpoint is not None and not self.processing:
+                    # Results are on disk now; the checkpoint is no longer needed
+                    self.run_checkpoint.discard()
+                    self.run_checkpoint = None
                 messagebox.showinfo("Success", f"File saved successfully!")
                 self.log_result(f"File saved to: {file_path}")
             except Exception as e:
@@ -1719,7 +5211,7 @@ class AdvancedTextProcessor:
         ttk.Label(lang_frame, text="Dil:").pack(side='left', padx=(0, 10))
         analysis_lang_var = tk.StringVar(value="turkish")
         ttk.Combobox(lang_frame, textvariable=analysis_lang_var, 
-                    values=["turkish", "english"], state="readonly", width=15).pack(side='left')
+                    values=LANGUAGES + [AUTO_LANGUAGE], state="readonly", width=15).pack(side='left')
         
         # Analyze button
         ttk.Button(input_frame, text="🔍 Adım Adım Analiz Et", 
@@ -1833,7 +5325,1493 @@ class AdvancedTextProcessor:
             except Exception as e:
                 messagebox.showerror("Hata", f"Kaydetme hatası: {str(e)}")
 
-def main():
+class StagedPipeline:
+    """File-to-file processing as four concurrent stages joined by bounded queues.
+
+    reader (CSV chunks) -> cleaning (CPU stages, fanned out to worker
+    processes) -> lemmatization (Stanza, full batches) -> writer (appends the
+    output CSV in input order). A full queue blocks its producer, so at most
+    `queue_size` chunks wait between two stages, and disk I/O overlaps compute.
+    """
+
+    STOP = object()  # end-of-stream marker passed down the queues
+
+    def __init__(self, engine, input_path, output_path, columns, language, options,
+                 chunk_rows=2000, batch_rows=None, workers=None, queue_size=4):
+        self.engine = engine
+        self.input_path = input_path
+        self.output_path = output_path
+        self.columns = columns
+        self.language = language
+        self.options = options
+        self.chunk_rows = chunk_rows
+        self.batch_rows = batch_rows or engine.tuning['batch_rows']
+        self.workers = workers or engine.tuning['workers']
+        self.queue_size = queue_size
+        self.failed = threading.Event()
+        self.error = None
+        self.stats = {column: StreamingStats() for column in columns}
+
+    def count_rows(self):
+        """Total rows (for comment_id width and progress) and the encoding that reads the file.
+
+        A saved row index that is still current gives the count without
+        parsing the file.
+        """
+        index = CsvRowIndex.load(CsvRowIndex.path_for(self.input_path), RunCheckpoint.file_identity(self.input_path))
+        if index is not None:
+            return index.rows, ('utf-8' if CsvRowIndex.decodes(self.input_path, 'utf-8') else 'latin-1')
+        for encoding in ('utf-8', 'latin-1'):
+            try:
+                chunks = pd.read_csv(self.input_path, encoding=encoding, dtype=str,
+                                     usecols=[0], chunksize=100000)
+                return sum(len(chunk) for chunk in chunks), encoding
+            except UnicodeDecodeError:
+                continue
+        raise ValueError(f"Cannot decode {self.input_path}")
+
+    def put(self, queue_, item):
+        """queue.put that gives up once another stage failed"""
+        while not self.failed.is_set():
+            try:
+                queue_.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, queue_):
+        while not self.failed.is_set():
+            try:
+                return queue_.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return self.STOP
+
+    def stage(self, target, *args):
+        """Run a stage function in a thread, turning its exception into a pipeline failure"""
+        def run():
+            try:
+                target(*args)
+            except BaseException as e:
+                if self.error is None:
+                    self.error = e
+                self.failed.set()
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def read(self, encoding, out):
+        for chunk in pd.read_csv(self.input_path, encoding=encoding, dtype=str, chunksize=self.chunk_rows):
+            missing = [column for column in self.columns if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"Column(s) not found in {self.input_path}: {missing}")
+            if not self.put(out, chunk):
+                return
+        self.put(out, self.STOP)
+
+    def clean(self, pool, source, out):
+        engine = self.engine
+        in_flight = deque()  # (chunk, languages, {column: [async results or prepared parts]})
+
+        def flush_oldest():
+            chunk, languages, parts = in_flight.popleft()
+            prepared = {}
+            features = {}
+            for column, column_parts in parts.items():
+                prepared[column] = []
+                features[column] = []
+                for part in column_parts:
+                    rows, skipped, row_features = part.get() if pool is not None else part
+                    prepared[column].extend(rows)
+                    features[column].extend(row_features)
+                    self.stats[column].skipped.update(skipped)
+            return self.put(out, (chunk, languages, prepared, features))
+
+        while True:
+            chunk = self.get(source)
+            if chunk is self.STOP:
+                break
+            languages = {}
+            parts = {}
+            for column in self.columns:
+                texts = chunk[column].tolist()
+                if self.language == AUTO_LANGUAGE:
+                    languages[column] = [engine.detect_language(text) for text in texts]
+                row_languages = languages.get(column)
+                # Split the chunk so every worker gets a share
+                step = max(self.batch_rows, -(-len(texts) // max(self.workers, 1)))
+                parts[column] = []
+                for start in range(0, len(texts), step):
+                    job = (texts[start:start + step], self.language, self.options,
+                           row_languages[start:start + step] if row_languages else None)
+                    if pool is not None:
+                        parts[column].append(pool.apply_async(_worker_prepare_texts, (job,)))
+                    else:
+                        with engine.stage('clean'):
+                            skipped_before = Counter(engine.skipped)
+                            row_features = []
+                            rows = engine.prepare_texts(*job, row_features)
+                            parts[column].append((rows, engine.skipped - skipped_before, row_features))
+            in_flight.append((chunk, languages, parts))
+            # Keep a bounded number of chunks in the workers
+            if len(in_flight) >= self.queue_size and not flush_oldest():
+                return
+        while in_flight:
+            if not flush_oldest():
+                return
+        self.put(out, self.STOP)
+
+    def lemmatize(self, source, out):
+        while True:
+            item = self.get(source)
+            if item is self.STOP:
+                break
+            chunk, languages, prepared, features = item
+            with self.engine.stage('lemmatize'):
+                results = {column: self.engine.lemmatize_prepared(rows, self.batch_rows)
+                           for column, rows in prepared.items()}
+            if not self.put(out, (chunk, languages, results, features)):
+                return
+        self.put(out, self.STOP)
+
+    def output_frame(self, chunk, languages, results, first_id, id_digits, features=None):
+        """Chunk with the columns add_processed_columns adds to a whole frame"""
+        return self.engine.output_frame(chunk, self.columns, results, languages, first_id, id_digits, features)
+
+    def write(self, source, total_rows, progress_callback):
+        id_digits = len(str(total_rows))
+        written = 0
+        while True:
+            item = self.get(source)
+            if item is self.STOP:
+                break
+            chunk, languages, results, features = item
+            for column, processed in results.items():
+                self.stats[column].add(chunk[column].tolist(), processed, languages.get(column))
+            frame = self.output_frame(chunk, languages, results, written + 1, id_digits, features)
+            frame.to_csv(self.output_path, mode='w' if written == 0 else 'a', header=written == 0,
+                         index=False, encoding='utf-8')
+            written += len(frame)
+            if progress_callback is not None:
+                progress_callback(written, total_rows, ', '.join(self.columns))
+        self.written = written
+
+    def run(self, progress_callback=None):
+        """Process the whole file; returns the number of rows written"""
+        total_rows, encoding = self.count_rows()
+        self.written = 0
+        self.engine.preload_stanza_models(self.language, self.options)
+        pool = self.engine.start_worker_pool(self.workers, self.language, self.options)
+        read_queue, clean_queue, lemma_queue = (queue.Queue(self.queue_size) for _ in range(3))
+        try:
+            threads = [
+                self.stage(self.read, encoding, read_queue),
+                self.stage(self.clean, pool, read_queue, clean_queue),
+                self.stage(self.lemmatize, clean_queue, lemma_queue),
+                self.stage(self.write, lemma_queue, total_rows, progress_callback),
+            ]
+            for thread in threads:
+                thread.join()
+        finally:
+            if pool is not None:
+                self.engine.measure_worker_memory()
+                pool.terminate()
+                pool.join()
+        if self.error is not None:
+            raise self.error
+        return self.written
+
+
+class BatchJob:
+    """One input file of a BatchQueue run and its status"""
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.state = 'queued'
+        self.rows = 0
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class BatchQueue:
+    """Process many CSV files with one warm engine.
+
+    Inputs are directories, glob patterns or files (see expand_inputs). Up
+    to `concurrency` jobs are in flight: reading and writing of different
+    files overlap, while cleaning runs one job at a time on the engine's
+    worker processes, since the engine's caches and vocabulary are shared
+    but not thread-safe (like MicroBatcher). Outputs are named from
+    `name_pattern` ({stem}, {ext}, {name}, {date}); an input whose output
+    is newer than itself is skipped unless overwrite is set. With watch,
+    the inputs are polled for new files until should_stop() becomes true.
+    """
+
+    def __init__(self, engine, columns, language, options, output_dir=None, name_pattern="{stem}_processed{ext}",
+                 concurrency=2, workers=None, overwrite=False, status_callback=None):
+        self.engine = engine
+        self.columns = columns
+        self.language = language
+        self.options = options
+        self.output_dir = output_dir
+        self.name_pattern = name_pattern
+        self.concurrency = max(1, concurrency)
+        self.workers = workers
+        self.overwrite = overwrite
+        self.status_callback = status_callback
+        self.jobs = []
+        self.seen = set()
+        self.outputs = set()
+        self.engine_lock = threading.Lock()
+        self.started = None
+        self.should_stop = None
+
+    @staticmethod
+    def expand_inputs(sources, pattern="*.csv"):
+        """Sorted files of the given directories (matching pattern), glob patterns and file paths"""
+        paths = []
+        for source in sources:
+            if os.path.isdir(source):
+                paths.extend(glob.glob(os.path.join(source, pattern)))
+            elif glob.has_magic(source):
+                paths.extend(glob.glob(source))
+            elif os.path.isfile(source):
+                paths.append(source)
+        return sorted({os.path.abspath(path) for path in paths if os.path.isfile(path)})
+
+    def output_path(self, input_path):
+        stem, ext = os.path.splitext(os.path.basename(input_path))
+        name = self.name_pattern.format(stem=stem, ext=ext or '.csv', name=os.path.basename(input_path),
+                                        date=time.strftime('%Y%m%d'))
+        return os.path.abspath(os.path.join(self.output_dir or os.path.dirname(input_path), name))
+
+    def is_output(self, path):
+        """Whether a file is (or looks like) the output of another input"""
+        if path in self.outputs:
+            return True
+        if self.output_dir and os.path.abspath(self.output_dir) != os.path.dirname(path):
+            return False
+        ext = os.path.splitext(path)[1]
+        pattern = self.name_pattern.format(stem='*', ext=ext or '.csv', name='*', date='*')
+        # A pattern without fixed text ('{name}') would match every input
+        return pattern.replace('*', '') not in ('', ext) and fnmatch.fnmatch(os.path.basename(path), pattern)
+
+    def add(self, input_path):
+        """Queue a file once; returns its BatchJob, or None for known files and outputs"""
+        input_path = os.path.abspath(input_path)
+        if input_path in self.seen or self.is_output(input_path):
+            return None
+        self.seen.add(input_path)
+        job = BatchJob(input_path, self.output_path(input_path))
+        if job.output_path == input_path:
+            raise ValueError(f"Output name pattern {self.name_pattern!r} would overwrite {input_path}")
+        self.outputs.add(job.output_path)
+        if (not self.overwrite and os.path.exists(job.output_path)
+                and os.path.getmtime(job.output_path) >= os.path.getmtime(input_path)):
+            job.state = 'skipped'
+        self.jobs.append(job)
+        return job
+
+    def set_state(self, job, state):
+        job.state = state
+        if self.status_callback is not None:
+            self.status_callback(job)
+
+    def run_job(self, job):
+        engine = self.engine
+        if self.stopped():
+            self.set_state(job, 'stopped')
+            return
+        job.started = time.perf_counter()
+        try:
+            self.set_state(job, 'reading')
+            df = engine.detect_and_read_csv(job.input_path, self.workers)
+            missing = [column for column in self.columns if column not in df.columns]
+            if missing:
+                raise ValueError(f"column(s) not found: {missing}")
+            if any(f"{column}_processed" in df.columns for column in self.columns):
+                job.error = "already processed"
+                job.finished = time.perf_counter()
+                self.set_state(job, 'skipped')
+                return
+            self.set_state(job, 'waiting')
+            with self.engine_lock:
+                self.set_state(job, 'cleaning')
+                languages, features = {}, {}
+                results = engine.process_columns(df, self.columns, self.language, self.options,
+                                                 should_stop=self.stopped, languages_out=languages,
+                                                 workers=self.workers, features_out=features)
+            if results is None:
+                job.finished = time.perf_counter()
+                self.set_state(job, 'stopped')
+                return
+            self.set_state(job, 'writing')
+            engine.output_frame(df, self.columns, results, languages, features=features)
+            os.makedirs(os.path.dirname(job.output_path), exist_ok=True)
+            df.to_csv(job.output_path, index=False, encoding='utf-8')
+            job.rows = len(df)
+            job.finished = time.perf_counter()
+            self.set_state(job, 'done')
+        except Exception as e:
+            job.error = str(e)
+            job.finished = time.perf_counter()
+            self.set_state(job, 'failed')
+
+    def run(self, sources, pattern="*.csv", watch=False, interval=5.0, should_stop=None):
+        """Process all files of sources (and, with watch, files appearing later); returns the jobs"""
+        self.started = time.perf_counter()
+        self.should_stop = should_stop
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            try:
+                self.poll(sources, pattern, watch, interval, executor, futures)
+            except KeyboardInterrupt:
+                # Queued jobs are marked stopped, running ones stop at their next chunk
+                self.should_stop = lambda: True
+                raise
+            for future in futures:
+                future.result()
+        return self.jobs
+
+    def poll(self, sources, pattern, watch, interval, executor, futures):
+        """Submit the new files of sources, once or (with watch) until stopped"""
+        sizes = {}  # watched file -> size at the last poll; a file is taken once its size is stable
+        first = True
+        while True:
+            for path in self.expand_inputs(sources, pattern):
+                if path in self.seen:
+                    continue
+                if not first:
+                    size = os.path.getsize(path)
+                    if sizes.get(path) != size:
+                        sizes[path] = size
+                        continue
+                job = self.add(path)
+                if job is None:
+                    continue
+                if job.state == 'skipped':
+                    self.set_state(job, 'skipped')
+                else:
+                    futures.append(executor.submit(self.run_job, job))
+            first = False
+            if not watch:
+                break
+            deadline = time.monotonic() + interval
+            while time.monotonic() < deadline and not self.stopped():
+                time.sleep(min(0.2, interval))
+            if self.stopped():
+                break
+
+    def stopped(self):
+        return self.should_stop is not None and self.should_stop()
+
+    def throughput(self):
+        """(rows done, wall seconds, rows per second) of the run so far"""
+        rows = sum(job.rows for job in self.jobs if job.state == 'done')
+        seconds = time.perf_counter() - self.started if self.started else 0.0
+        return rows, seconds, rows / seconds if seconds else 0.0
+
+    def status_table(self):
+        """Per-job status lines and the total throughput"""
+        width = max([len(os.path.basename(job.input_path)) for job in self.jobs] + [4])
+        lines = [f"{'file':<{width}}  {'state':<8} {'rows':>9} {'time':>8} {'rows/s':>9}  output / error"]
+        for job in self.jobs:
+            detail = job.error or os.path.basename(job.output_path)
+            lines.append(f"{os.path.basename(job.input_path):<{width}}  {job.state:<8} {job.rows:>9} "
+                         f"{job.seconds:>7.1f}s {job.rows_per_second:>9.0f}  {detail}")
+        rows, seconds, rate = self.throughput()
+        counts = Counter(job.state for job in self.jobs)
+        lines.append(f"{len(self.jobs)} files ({', '.join(f'{n} {state}' for state, n in sorted(counts.items()))}); "
+                     f"{rows} rows in {seconds:.1f}s = {rate:.0f} rows/s")
+        return "\n".join(lines)
+
+
+class ShardPlan:
+    """One input split into shards for processing on several machines (plan / run-shard / merge).
+
+    The plan directory is the only thing the machines share: manifest.json
+    (input identity, shard files and row ranges, options and their
+    fingerprint, resource versions), the shard inputs, and per shard an
+    output written by run-shard with a .done.json marker (a run-shard without
+    a shard number claims the next free one by creating its .claim file
+    exclusively; a failed run removes its claim, and a claim older than
+    claim_timeout seconds or left by a dead process on the same host is
+    taken over). Shards are byte
+    ranges of the input cut at record boundaries ('range') or the rows whose
+    key column hashes (crc32) to the shard ('hash'; duplicate texts land in
+    the same shard and share its caches). merge checks every shard against
+    the manifest and writes the rows back in input order with comment_id
+    numbered over the whole file.
+    """
+
+    VERSION = 1
+    MANIFEST = "manifest.json"
+    RANGE_EVERY = 16  # rows between candidate cut points of range shards
+    CLAIM_TIMEOUT = 6 * 3600  # seconds after which another machine may take a claimed, unfinished shard over
+    # Shard inputs/outputs are read as written so that other columns pass through unchanged
+    READ_OPTIONS = {'dtype': str, 'keep_default_na': False, 'na_values': ['']}
+
+    def __init__(self, directory, manifest, claim_timeout=None):
+        self.directory = directory
+        self.manifest = manifest
+        self.claim_timeout = self.CLAIM_TIMEOUT if claim_timeout is None else claim_timeout
+
+    @property
+    def shards(self):
+        return self.manifest['shards']
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def shard_names(index):
+        stem = f"shard-{index:04d}"
+        return {'input': f"{stem}.csv", 'rows': f"{stem}.rows", 'output': f"{stem}.out.csv",
+                'done': f"{stem}.done.json", 'claim': f"{stem}.claim"}
+
+    @staticmethod
+    def file_sha1(path, block_bytes=1 << 24):
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_bytes), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, directory, claim_timeout=None):
+        try:
+            with open(os.path.join(directory, cls.MANIFEST), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"No readable {cls.MANIFEST} in {directory}: {e}")
+        if manifest.get('version') != cls.VERSION:
+            raise ValueError(f"{cls.MANIFEST} in {directory} has an unsupported version")
+        return cls(directory, manifest, claim_timeout)
+
+    @classmethod
+    def create(cls, engine, input_path, directory, columns, language, options, shards, by='range', key=None):
+        """Split input_path into `shards` shard files under directory and write the manifest"""
+        encoding = 'utf-8' if CsvRowIndex.decodes(input_path, 'utf-8') else 'latin-1'
+        header = pd.read_csv(input_path, nrows=0, encoding=encoding).columns.tolist()
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"Column(s) not found in {input_path}: {missing}")
+        os.makedirs(directory, exist_ok=True)
+        if by == 'range':
+            entries, total = cls.split_ranges(input_path, directory, shards), None
+            key = None
+        else:
+            key = key or columns[0]
+            if key not in header:
+                raise ValueError(f"Key column '{key}' not found in {input_path}")
+            entries, total = cls.split_hash(input_path, directory, shards, key, encoding)
+            encoding = 'utf-8'
+        for entry in entries:
+            entry['sha1'] = cls.file_sha1(os.path.join(directory, entry['input']))
+        total = sum(entry['rows'] for entry in entries) if total is None else total
+        manifest = {
+            'version': cls.VERSION,
+            'input': RunCheckpoint.file_identity(input_path),
+            'encoding': encoding,
+            'header': header,
+            'rows': total,
+            'by': by,
+            'key': key,
+            'columns': list(columns),
+            'language': language,
+            'options': options,
+            'fingerprint': engine.options_fingerprint(options, language),
+            'resources': engine.resource_versions(),
+            'rating_column': engine.rating_column,
+            'shards': entries,
+        }
+        with open(os.path.join(directory, cls.MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return cls(directory, manifest)
+
+    @classmethod
+    def split_ranges(cls, input_path, directory, shards):
+        """Shard entries of byte ranges of about equal size (a copy of the header plus the range)"""
+        index = CsvRowIndex.build(input_path, every=cls.RANGE_EVERY)
+        ranges = index.ranges(shards)
+        entries = []
+        with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for number, (start, end) in enumerate(ranges):
+                # Cuts are indexed offsets, so the first row of a range is a multiple of index.every
+                first_row = bisect.bisect_left(index.offsets, start) * index.every
+                names = cls.shard_names(number)
+                with open(os.path.join(directory, names['input']), 'wb') as out:
+                    out.write(data[:index.header_end])
+                    out.write(data[start:end])
+                entries.append({'index': number, 'input': names['input'], 'output': names['output'],
+                                'first_row': first_row, 'bytes': [start, end]})
+        for entry, following in zip(entries, entries[1:] + [None]):
+            entry['rows'] = (following['first_row'] if following else index.rows) - entry['first_row']
+        return entries
+
+    @classmethod
+    def split_hash(cls, input_path, directory, shards, key, encoding):
+        """Shard entries of the rows whose key hashes to each shard; their input row numbers go to .rows files"""
+        frame = pd.read_csv(input_path, encoding=encoding, **cls.READ_OPTIONS)
+        keys = frame[key].fillna('').tolist()
+        assignment = np.fromiter((zlib.crc32(value.encode('utf-8')) % shards for value in keys),
+                                 dtype=np.int64, count=len(keys))
+        entries = []
+        for number in range(shards):
+            rows = np.flatnonzero(assignment == number)
+            names = cls.shard_names(number)
+            frame.iloc[rows].to_csv(os.path.join(directory, names['input']), index=False, encoding='utf-8')
+            with open(os.path.join(directory, names['rows']), 'wb') as f:
+                array('Q', rows.tolist()).tofile(f)
+            entries.append({'index': number, 'input': names['input'], 'output': names['output'],
+                            'row_numbers': names['rows'], 'rows': len(rows)})
+        return entries, len(frame)
+
+    def check_engine(self, engine):
+        """Differences between the engine's resources and the manifest (empty when they match)"""
+        versions = engine.resource_versions()
+        return [f"{name}: manifest {expected}, here {versions.get(name)}"
+                for name, expected in self.manifest['resources'].items() if versions.get(name) != expected]
+
+    def is_done(self, number):
+        return os.path.exists(self.path(self.shard_names(number)['done']))
+
+    @staticmethod
+    def claim_owner():
+        return f"{platform.node()} {os.getpid()}"
+
+    def claim(self, number):
+        """Take a shard for this process (an exclusively created .claim file); False if another has it"""
+        path = self.path(self.shard_names(number)['claim'])
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not self.take_over(path):
+                return False
+            return self.claim(number)
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.claim_owner() + "\n")
+        return True
+
+    def claim_is_stale(self, path):
+        """Whether a claim file is older than claim_timeout or was left by a dead process on this host"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                host, _, pid = f.read().strip().rpartition(' ')
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return False
+        if age > self.claim_timeout:
+            return True
+        if host != platform.node() or not pid.isdigit():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # alive, owned by another user
+        return False
+
+    def take_over(self, path):
+        """Remove a stale claim; True when this process removed it and may claim the shard"""
+        if not self.claim_is_stale(path):
+            return False
+        stale = f"{path}.{platform.node()}.{os.getpid()}.stale"
+        try:
+            # Atomic: of several processes taking the claim over, one moves it away
+            os.rename(path, stale)
+        except OSError:
+            return False
+        if not self.claim_is_stale(stale):
+            # A fresh claim made between the check and the rename; put it back
+            try:
+                os.rename(stale, path)
+            except OSError:
+                pass
+            return False
+        os.remove(stale)
+        return True
+
+    def release(self, number):
+        """Remove this process's claim of a shard (after a failed run)"""
+        path = self.path(self.shard_names(number)['claim'])
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read().strip() == self.claim_owner():
+                    os.remove(path)
+        except OSError:
+            pass
+
+    def next_shard(self):
+        """Number of the first unfinished shard this process could claim, or None"""
+        for entry in self.shards:
+            if not self.is_done(entry['index']) and self.claim(entry['index']):
+                return entry['index']
+        return None
+
+    def run_shard(self, engine, number, workers=None, batch_rows=None, progress_callback=None, stats_out=None):
+        """Process one shard into its output and marker; returns the marker.
+
+        When the run fails, a claim of the shard by this process is released so
+        that another run can take the shard.
+        """
+        try:
+            return self.process_shard(engine, number, workers, batch_rows, progress_callback, stats_out)
+        except BaseException:
+            self.release(number)
+            raise
+
+    def process_shard(self, engine, number, workers, batch_rows, progress_callback, stats_out):
+        """run_shard without the claim handling"""
+        manifest = self.manifest
+        entry = self.shards[number]
+        input_path = self.path(entry['input'])
+        if self.file_sha1(input_path) != entry['sha1']:
+            raise ValueError(f"{entry['input']} does not match the manifest")
+        options = dict(manifest['options'])
+        if engine.options_fingerprint(options, manifest['language']) != manifest['fingerprint']:
+            raise ValueError("Options fingerprint differs from the manifest (different program version?)")
+        mismatches = self.check_engine(engine)
+        if mismatches:
+            raise ValueError("Resources differ from the planning machine: " + "; ".join(mismatches))
+        engine.rating_column = manifest['rating_column']
+        start = time.perf_counter()
+        frame = pd.read_csv(input_path, encoding=manifest['encoding'], **self.READ_OPTIONS)
+        if len(frame) != entry['rows']:
+            raise ValueError(f"{entry['input']} has {len(frame)} rows, the manifest {entry['rows']}")
+        columns = manifest['columns']
+        languages, features = {}, {}
+        results = engine.process_columns(frame, columns, manifest['language'], options, chunk_size=batch_rows,
+                                         progress_callback=progress_callback, languages_out=languages,
+                                         stats_out=stats_out, workers=workers, features_out=features)
+        # Placeholder ids; merge numbers the rows over the whole input
+        engine.output_frame(frame, columns, results, languages, features=features)
+        output_path = self.path(entry['output'])
+        frame.to_csv(output_path + ".tmp", index=False, encoding='utf-8')
+        os.replace(output_path + ".tmp", output_path)
+        done = {'index': number, 'rows': len(frame), 'sha1': self.file_sha1(output_path),
+                'fingerprint': manifest['fingerprint'], 'resources': manifest['resources'],
+                'host': platform.node(), 'seconds': round(time.perf_counter() - start, 3)}
+        with open(self.path(self.shard_names(number)['done']), 'w', encoding='utf-8') as f:
+            json.dump(done, f, indent=2)
+        return done
+
+    def problems(self):
+        """What keeps merge from running: missing, unfinished or inconsistent shards"""
+        found = []
+        for entry in self.shards:
+            name = entry['input']
+            try:
+                with open(self.path(self.shard_names(entry['index'])['done']), 'r', encoding='utf-8') as f:
+                    done = json.load(f)
+            except (OSError, ValueError):
+                found.append(f"{name}: not processed")
+                continue
+            if done.get('fingerprint') != self.manifest['fingerprint'] or done.get('resources') != self.manifest['resources']:
+                found.append(f"{name}: processed with other options or resources")
+            elif done.get('rows') != entry['rows']:
+                found.append(f"{name}: {done.get('rows')} rows processed, {entry['rows']} planned")
+            elif not os.path.exists(self.path(entry['output'])) or self.file_sha1(self.path(entry['output'])) != done.get('sha1'):
+                found.append(f"{name}: output missing or changed after the run")
+        return found
+
+    def merge(self, output_path):
+        """Write the shard outputs in input order with global comment_ids; returns the row count"""
+        problems = self.problems()
+        if problems:
+            raise ValueError("Shards not ready:\n  " + "\n  ".join(problems))
+        parts = [pd.read_csv(self.path(entry['output']), encoding='utf-8', **self.READ_OPTIONS)
+                 for entry in self.shards]
+        frame = pd.concat(parts, ignore_index=True)
+        if self.manifest['by'] == 'hash':
+            row_numbers = array('Q')
+            for entry in self.shards:
+                with open(self.path(entry['row_numbers']), 'rb') as f:
+                    row_numbers.fromfile(f, entry['rows'])
+            order = np.empty(len(frame), dtype=np.int64)
+            order[np.frombuffer(row_numbers, dtype=np.uint64).astype(np.int64)] = np.arange(len(frame))
+            frame = frame.iloc[order].reset_index(drop=True)
+        if len(frame) != self.manifest['rows']:
+            raise ValueError(f"Shards hold {len(frame)} rows, the input {self.manifest['rows']}")
+        frame['comment_id'] = AdvancedTextProcessor.comment_ids(1, len(frame), len(str(len(frame)))).values
+        frame.to_csv(output_path, index=False, encoding='utf-8')
+        return len(frame)
+
+
+class MicroBatcher:
+    """Coalesces concurrently submitted texts into batches for clean_texts.
+
+    A batch is closed when it reaches max_batch rows or when the oldest row has
+    waited max_latency seconds. The engine runs on a single worker thread, since
+    the Stanza pipeline is not meant to be called concurrently.
+    """
+
+    def __init__(self, engine, max_batch=64, max_latency=0.01):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, texts, language, options):
+        """Queue texts and wait for their cleaned versions (in order)"""
+        loop = asyncio.get_running_loop()
+        key = (language, tuple(sorted(options.items())))
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self.queue.put_nowait((key, text, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def run(self):
+        """Batching loop; runs for the lifetime of the service"""
+        self.queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # One engine call per (language, options) group in the batch
+            groups = defaultdict(list)
+            for key, text, future in batch:
+                groups[key].append((text, future))
+            for (language, option_items), items in groups.items():
+                try:
+                    results = await loop.run_in_executor(
+                        self.executor, self.engine.clean_texts,
+                        [text for text, _ in items], language, dict(option_items))
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.batches += 1
+            self.rows += len(batch)
+
+
+class TextCleaningService:
+    """Local HTTP/JSON service that keeps a headless engine (and Stanza) warm.
+
+    Endpoints:
+        GET  /health  -> engine status and batching counters
+        POST /clean   -> {"text": "..."} or {"texts": [...]}, optional
+                         "language" and "options" overrides;
+                         answers {"result": "..."} or {"results": [...]}
+    """
+
+    def __init__(self, engine, language="turkish", max_batch=64, max_latency=0.01):
+        self.engine = engine
+        self.language = language
+        self.batcher = MicroBatcher(engine, max_batch, max_latency)
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 handling with keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path = request_line.decode('latin-1').split()[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length') or 0))
+
+                status, payload = await self.dispatch(method, path, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                writer.write((f"HTTP/1.1 {status} {reason}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        """Route a request; returns (status, JSON payload)"""
+        if method == 'GET' and path == '/health':
+            return 200, {
+                'status': 'ok',
+                'stanza_ready': self.engine.stanza_ready,
+                'batches': self.batcher.batches,
+                'rows': self.batcher.rows,
+                'avg_batch_size': self.batcher.rows / self.batcher.batches if self.batcher.batches else 0.0,
+                'stanza_models': self.engine.stanza_pool.report(),
+            }
+        if method != 'POST' or path != '/clean':
+            return 404, {'error': f"Unknown endpoint: {method} {path}"}
+
+        try:
+            request = json.loads(body or b'{}')
+            language = request.get('language', self.language)
+            if language not in LANGUAGES + [AUTO_LANGUAGE]:
+                return 400, {'error': f"Unknown language: {language!r}"}
+            overrides = request.get('options', {})
+            if not isinstance(overrides, dict):
+                return 400, {'error': "'options' must be an object"}
+            error = self.option_error(overrides)
+            if error:
+                return 400, {'error': error}
+            options = self.engine.get_processing_options()
+            options.update(overrides)
+            if 'texts' in request:
+                texts = request['texts']
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    return 400, {'error': "'texts' must be a list of strings"}
+                return 200, {'results': await self.batcher.submit(texts, language, options)}
+            if 'text' in request:
+                if not isinstance(request['text'], str):
+                    return 400, {'error': "'text' must be a string"}
+                return 200, {'result': (await self.batcher.submit([request['text']], language, options))[0]}
+            return 400, {'error': "Request needs 'text' or 'texts'"}
+        except (ValueError, AttributeError) as e:
+            return 400, {'error': f"Invalid request: {e}"}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    @staticmethod
+    def option_error(overrides):
+        """Why option overrides of a request are invalid, or None"""
+        unknown = set(overrides) - set(DEFAULT_OPTIONS)
+        if unknown:
+            return f"Unknown options: {sorted(unknown)}"
+        for name, value in overrides.items():
+            expected = type(DEFAULT_OPTIONS[name])
+            if type(value) is not expected:
+                return f"Option '{name}' must be {expected.__name__}, not {type(value).__name__}"
+        choices = {'tokenizer': TOKENIZER_BACKENDS, 'truncation': TRUNCATION_POLICIES}
+        for name, allowed in choices.items():
+            if name in overrides and overrides[name] not in allowed:
+                return f"Option '{name}' must be one of {allowed}"
+        for name in ('max_tokens', 'min_tokens'):
+            if overrides.get(name, 0) < 0:
+                return f"Option '{name}' must not be negative"
+        return None
+
+    async def serve_forever(self, host="127.0.0.1", port=8765, unix_socket=None):
+        """Start the batching loop and listen on TCP or a Unix socket"""
+        batch_task = asyncio.ensure_future(self.batcher.run())
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            print(f"CleanText service listening on unix:{unix_socket}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"CleanText service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+
+def add_option_arguments(parser):
+    """CLI flags mirroring the processing checkboxes"""
+    option_names = [name for name, value in DEFAULT_OPTIONS.items() if isinstance(value, bool)]
+    parser.add_argument('--language', default="turkish", choices=LANGUAGES + [AUTO_LANGUAGE],
+                        help="'auto' detects the language of every row")
+    parser.add_argument('--enable', action='append', default=[], choices=option_names, metavar='OPTION',
+                        help=f"turn a processing option on ({', '.join(option_names)})")
+    parser.add_argument('--disable', action='append', default=[], choices=option_names, metavar='OPTION',
+                        help="turn a processing option off")
+    parser.add_argument('--tokenizer', default=DEFAULT_OPTIONS['tokenizer'], choices=TOKENIZER_BACKENDS)
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_OPTIONS['max_tokens'],
+                        help="per-row token budget for Stanza (0: no limit)")
+    parser.add_argument('--truncation', default=DEFAULT_OPTIONS['truncation'], choices=TRUNCATION_POLICIES,
+                        help="what to keep of rows over the token budget")
+    parser.add_argument('--min-tokens', type=int, default=DEFAULT_OPTIONS['min_tokens'],
+                        help="drop rows with fewer tokens before Stanza (0: keep all)")
+    parser.add_argument('--stanza-memory-mb', type=int, default=0,
+                        help="memory budget for loaded Stanza models; least recently used ones are dropped (0: unlimited)")
+
+
+def options_from_args(args):
+    """Processing options dict from the flags added by add_option_arguments"""
+    options = dict(DEFAULT_OPTIONS, tokenizer=args.tokenizer, max_tokens=args.max_tokens,
+                   truncation=args.truncation, min_tokens=args.min_tokens)
+    for name in args.enable:
+        options[name] = True
+    for name in args.disable:
+        options[name] = False
+    return options
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="CleanText - Advanced Text Processor (no command: start the GUI)")
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help="run the local HTTP/JSON cleaning service")
+    add_option_arguments(serve_parser)
+    serve_parser.add_argument('--host', default="127.0.0.1")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--unix-socket', help="listen on this Unix socket instead of TCP")
+    serve_parser.add_argument('--max-batch', type=int, default=64, help="rows per Stanza micro-batch")
+    serve_parser.add_argument('--max-latency-ms', type=float, default=10.0,
+                              help="how long a request may wait for its batch to fill")
+
+    process_parser = commands.add_parser('process', help="clean columns of a CSV file without the GUI")
+    add_option_arguments(process_parser)
+    process_parser.add_argument('input', help="input CSV file")
+    process_parser.add_argument('-o', '--output', help="output CSV (default: <input>_processed.csv)")
+    process_parser.add_argument('--column', action='append', required=True,
+                                help="text column to clean (repeat for several columns)")
+    process_parser.add_argument('--resume', action='store_true',
+                                help="continue from the checkpoint of an interrupted run")
+    process_parser.add_argument('--checkpoint-every', type=int, default=1000,
+                                help="rows between checkpoint flushes")
+    process_parser.add_argument('--workers', type=int, help="worker processes (default: tuning profile)")
+    process_parser.add_argument('--batch-rows', type=int, help="rows per Stanza batch (default: tuning profile)")
+    process_parser.add_argument('--staged', action='store_true',
+                                help="stream the file through concurrent read/clean/lemmatize/write stages")
+    process_parser.add_argument('--chunk-rows', type=int, default=2000,
+                                help="rows read per chunk in --staged mode")
+    process_parser.add_argument('--two-pass', action='store_true',
+                                help="tokenize first and run the token stages once per unique token")
+    process_parser.add_argument('--rating-column',
+                                help="column the sentiment is derived from (default: score, else rating)")
+    process_parser.add_argument('--row-index', action='store_true',
+                                help="save the row offset index of the input next to it (<input>.rowindex)")
+    process_parser.add_argument('--append', action='store_true',
+                                help="process only rows past the watermark of the last run and append them "
+                                     "to the output (<output>.watermark.json)")
+    process_parser.add_argument('--memory-report', metavar='JSON',
+                                help="trace allocations per stage and step (load/process/save), sample the RSS "
+                                     "and write the report to this file (slows the run down)")
+    process_parser.add_argument('--profile', action='store_true',
+                                help="sample the run's stacks and write <output>_profile.folded (collapsed stacks) "
+                                     "and <output>_profile.svg (flame graph); cleans in-process")
+    process_parser.add_argument('--profile-sample', type=int, metavar='ROWS',
+                                help="profile a stratified sample of ROWS rows instead of the whole run "
+                                     "(no output is written)")
+    process_parser.add_argument('--profile-interval', type=float, default=5.0,
+                                help="milliseconds between profiler samples")
+    process_parser.add_argument('--watermark-column', default='auto',
+                                help="column whose maximum marks processed rows: auto (id, else date), "
+                                     "a column name, or none (row count and checksum only)")
+
+    estimate_parser = commands.add_parser('estimate', help="dry-run a sample and project the cost of a full run")
+    add_option_arguments(estimate_parser)
+    estimate_parser.add_argument('input', help="input CSV file")
+    estimate_parser.add_argument('--column', action='append', required=True,
+                                 help="text column to clean (repeat for several columns)")
+    estimate_parser.add_argument('--sample-size', type=int, default=500, help="rows sampled per column")
+    estimate_parser.add_argument('--json', action='store_true', help="print the report as JSON")
+
+    tune_parser = commands.add_parser('tune', help="find the fastest threads/workers/batch size for this machine")
+    add_option_arguments(tune_parser)
+    tune_parser.add_argument('input', help="input CSV file to take the sample from")
+    tune_parser.add_argument('--column', required=True, help="text column to sample")
+    tune_parser.add_argument('--sample-size', type=int, default=600, help="rows used for every trial")
+    tune_parser.add_argument('--dry-run', action='store_true', help="only report, don't save the result")
+
+    lexicon_parser = commands.add_parser('lexicon', help="learn a spelling lexicon from processed CSVs "
+                                                         "and build its symmetric-delete index")
+    lexicon_parser.add_argument('input', nargs='*', help="processed CSV files (none: only rebuild the index)")
+    lexicon_parser.add_argument('--language', choices=LANGUAGES, default="turkish")
+    lexicon_parser.add_argument('--min-count', type=int, default=3,
+                                help="occurrences a word needs to enter the lexicon")
+
+    batch_parser = commands.add_parser('batch', help="process many CSV files (directories, globs or files) "
+                                                     "with one warm engine")
+    add_option_arguments(batch_parser)
+    batch_parser.add_argument('inputs', nargs='+', help="input directories, glob patterns or CSV files")
+    batch_parser.add_argument('--column', action='append', required=True,
+                              help="text column to clean (repeat for several columns)")
+    batch_parser.add_argument('--pattern', default="*.csv", help="files taken from input directories")
+    batch_parser.add_argument('-o', '--output-dir', help="directory for the outputs (default: next to each input)")
+    batch_parser.add_argument('--name', default="{stem}_processed{ext}",
+                              help="output file name pattern: {stem}, {ext}, {name}, {date}")
+    batch_parser.add_argument('--concurrency', type=int, default=2, help="files in flight at the same time")
+    batch_parser.add_argument('--workers', type=int, help="worker processes (default: tuning profile)")
+    batch_parser.add_argument('--overwrite', action='store_true', help="also process files whose output is up to date")
+    batch_parser.add_argument('--watch', action='store_true', help="keep polling the inputs for new files (Ctrl+C stops)")
+    batch_parser.add_argument('--interval', type=float, default=5.0, help="seconds between polls with --watch")
+    batch_parser.add_argument('--rating-column',
+                              help="column the sentiment is derived from (default: score, else rating)")
+
+    index_parser = commands.add_parser('index', help="build the row offset index of a CSV file (<input>.rowindex)")
+    index_parser.add_argument('input', help="input CSV file")
+    index_parser.add_argument('--every', type=int, default=1000, help="rows between indexed offsets")
+    index_parser.add_argument('--show', type=int, nargs=2, metavar=('START', 'COUNT'),
+                              help="print COUNT rows from row START, read through the index")
+
+    plan_parser = commands.add_parser('plan', help="split a CSV file into shards for several machines "
+                                                   "(see run-shard and merge)")
+    add_option_arguments(plan_parser)
+    plan_parser.add_argument('input', help="input CSV file")
+    plan_parser.add_argument('-o', '--directory', required=True, help="shared plan directory")
+    plan_parser.add_argument('--column', action='append', required=True,
+                             help="text column to clean (repeat for several columns)")
+    plan_parser.add_argument('--shards', type=int, required=True, help="number of shards")
+    plan_parser.add_argument('--by', default='range', choices=['range', 'hash'],
+                             help="byte ranges of the file, or a crc32 hash of the key column")
+    plan_parser.add_argument('--key', help="column hashed with --by hash (default: the first text column)")
+    plan_parser.add_argument('--rating-column',
+                             help="column the sentiment is derived from (default: score, else rating)")
+
+    shard_parser = commands.add_parser('run-shard', help="process shards of a plan directory")
+    shard_parser.add_argument('directory', help="plan directory written by 'plan'")
+    shard_parser.add_argument('--shard', type=int,
+                              help="shard number (default: claim and process free shards until none is left)")
+    shard_parser.add_argument('--workers', type=int, help="worker processes (default: tuning profile)")
+    shard_parser.add_argument('--batch-rows', type=int, help="rows per Stanza batch (default: tuning profile)")
+    shard_parser.add_argument('--stanza-memory-mb', type=int, default=0,
+                              help="memory budget for loaded Stanza models (0: unlimited)")
+    shard_parser.add_argument('--claim-timeout', type=float, default=ShardPlan.CLAIM_TIMEOUT / 3600,
+                              help="hours after which an unfinished claimed shard is taken over")
+
+    merge_parser = commands.add_parser('merge', help="check the shards of a plan and write the output in input order")
+    merge_parser.add_argument('directory', help="plan directory written by 'plan'")
+    merge_parser.add_argument('-o', '--output', help="output CSV (default: <input>_processed.csv)")
+    return parser
+
+
+def print_progress(done, total, column):
+    """Progress line for CLI runs"""
+    print(f"\r{column}: {done}/{total} ({done / max(total, 1):.0%})", end='', flush=True)
+    if done >= total:
+        print()
+
+
+def create_engine(args):
+    """Headless processor configured from the common CLI flags"""
+    engine = AdvancedTextProcessor(headless=True, options=options_from_args(args))
+    engine.stanza_pool.memory_budget_mb = args.stanza_memory_mb or None
+    return engine
+
+
+def run_staged_process(args, engine):
+    """'process --staged': stream the file through the StagedPipeline"""
+    if args.resume:
+        raise SystemExit("--resume is not supported with --staged")
+    output = args.output or f"{os.path.splitext(args.input)[0]}_processed.csv"
+    pipeline = StagedPipeline(engine, args.input, output, args.column, args.language,
+                              engine.get_processing_options(), chunk_rows=args.chunk_rows,
+                              batch_rows=args.batch_rows, workers=args.workers)
+    start = time.perf_counter()
+    try:
+        written = pipeline.run(progress_callback=print_progress)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    for column in args.column:
+        print(f"\n{column}:")
+        engine.log_stats(pipeline.stats[column])
+    engine.log_worker_memory()
+    print(f"Saved {written} rows to {output} in {time.perf_counter() - start:.1f}s")
+    if engine.options['lemmatize']:
+        engine.log_stanza_models()
+
+
+def run_process_command(args):
+    """Entry point of the 'process' command"""
+    engine = create_engine(args)
+    engine.rating_column = args.rating_column
+    if args.memory_report and (args.staged or args.append):
+        raise SystemExit("--memory-report is not supported with --staged or --append")
+    args.profile = args.profile or bool(args.profile_sample)
+    if args.profile:
+        if args.staged or args.append:
+            raise SystemExit("--profile is not supported with --staged or --append")
+        if args.workers and args.workers > 1:
+            print("Profiling cleans in this process: --workers is ignored")
+        # The sampler sees this process only
+        args.workers = 1
+    if args.append:
+        if args.staged or args.resume:
+            raise SystemExit("--append is not supported with --staged or --resume")
+        run_append_process(args, engine)
+        return
+    if args.staged:
+        if args.two_pass:
+            raise SystemExit("--two-pass is not supported with --staged")
+        if args.row_index:
+            CsvRowIndex.open(args.input, persist=True)
+        run_staged_process(args, engine)
+        return
+    if args.memory_report:
+        engine.start_memory_profile()
+    if args.profile and not args.profile_sample:
+        engine.start_profile(args.profile_interval / 1000)
+    with engine.phase('load'):
+        df = engine.detect_and_read_csv(args.input, args.workers, args.row_index)
+    missing = [column for column in args.column if column not in df.columns]
+    if missing:
+        raise SystemExit(f"Column(s) not found in {args.input}: {missing}")
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+    if args.profile_sample:
+        run_profile_sample(args, engine, df)
+        return
+
+    options = engine.get_processing_options()
+    checkpoint = RunCheckpoint.start(args.input, engine.options_fingerprint(options, args.language),
+                                     args.language, args.column, args.resume,
+                                     resources=engine.resource_fingerprint(),
+                                     every_rows=args.checkpoint_every)
+    if args.resume:
+        print(f"Resuming: {checkpoint.completed_rows()} rows restored from {checkpoint.path}")
+
+    start = time.perf_counter()
+    detected_languages = {}
+    stats = {}
+    features = {}
+    with engine.phase('process'):
+        results = engine.process_columns(df, args.column, args.language, options,
+                                         chunk_size=args.batch_rows, progress_callback=print_progress,
+                                         checkpoint=checkpoint, languages_out=detected_languages,
+                                         stats_out=stats, workers=args.workers, two_pass=args.two_pass,
+                                         features_out=features)
+    engine.df = df
+    with engine.phase('add_columns'):
+        engine.add_processed_columns(args.column, results, detected_languages, stats, features)
+    for column in args.column:
+        prefix = 'comment' if len(args.column) == 1 else column
+        engine.show_statistics(column, f"{column}_processed", prefix, stats[column])
+    if engine.vocabulary_report is not None:
+        engine.log_vocabulary_report(engine.vocabulary_report)
+    engine.log_worker_memory()
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_processed.csv"
+    with engine.phase('save'):
+        engine.df.to_csv(output, index=False, encoding='utf-8')
+    checkpoint.discard()
+    print(f"Saved {len(engine.df)} rows to {output} in {time.perf_counter() - start:.1f}s")
+    engine.finish_memory_profile(args.memory_report)
+    engine.finish_profile(output, f"process {os.path.basename(args.input)}")
+    if engine.options['lemmatize']:
+        engine.log_stanza_models()
+
+
+def run_profile_sample(args, engine, df):
+    """'process --profile-sample N': profile the cleaning of a stratified sample; writes only the profile"""
+    output = args.output or f"{os.path.splitext(args.input)[0]}_processed.csv"
+    sample = df.iloc[engine.stratified_sample(df[args.column[0]], args.profile_sample)].reset_index(drop=True)
+    print(f"Profiling {len(sample)} sample rows...")
+    engine.start_profile(args.profile_interval / 1000)
+    engine.process_columns(sample, args.column, args.language, engine.get_processing_options(),
+                           chunk_size=args.batch_rows, progress_callback=print_progress, workers=1,
+                           two_pass=args.two_pass)
+    engine.finish_profile(output, f"{len(sample)} sample rows of {os.path.basename(args.input)}")
+    engine.finish_memory_profile(args.memory_report)
+
+
+def run_append_process(args, engine):
+    """'process --append': clean the rows added to the input since the last run and append them"""
+    output = args.output or f"{os.path.splitext(args.input)[0]}_processed.csv"
+    watermark_path = AppendWatermark.path_for(output)
+    options = engine.get_processing_options()
+    fingerprint = engine.options_fingerprint(options, args.language)
+    previous = AppendWatermark.load(watermark_path) if os.path.exists(output) else None
+    if previous is not None:
+        if previous.fingerprint != fingerprint or previous.columns != list(args.column):
+            raise SystemExit(f"Options or columns differ from the run that wrote {output}; "
+                             f"process the whole file again without --append")
+        output_bytes = os.path.getsize(output)
+        if output_bytes < previous.output_bytes:
+            raise SystemExit(f"{output} is shorter than its watermark; process the whole file again")
+        if output_bytes > previous.output_bytes:
+            # Rows of an append run that stopped before its watermark was saved
+            with open(output, 'r+b') as f:
+                f.truncate(previous.output_bytes)
+            print(f"Removed {output_bytes - previous.output_bytes} bytes of an unfinished append from {output}")
+    elif os.path.exists(output):
+        print(f"{output} has no watermark; it will be replaced by a full run")
+
+    try:
+        df, mark, how = AppendWatermark.read_new_rows(args.input, previous, fingerprint, args.column,
+                                                      args.watermark_column)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    missing = [column for column in args.column if column not in df.columns]
+    if missing:
+        raise SystemExit(f"Column(s) not found in {args.input}: {missing}")
+    watermark = f"{mark.column} > {previous.value}" if previous is not None and mark.column else "row count/checksum"
+    if previous is None:
+        print(f"No watermark yet: processing all {len(df)} rows")
+    else:
+        print(f"{len(df)} new rows past the watermark ({watermark}; "
+              f"{'read after the processed prefix' if how == 'tail' else 'prefix changed, whole file scanned'})")
+    if df.empty:
+        mark.save(watermark_path)
+        return
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+
+    start = time.perf_counter()
+    detected_languages, stats, features = {}, {}, {}
+    results = engine.process_columns(df, args.column, args.language, options,
+                                     chunk_size=args.batch_rows, progress_callback=print_progress,
+                                     languages_out=detected_languages, stats_out=stats,
+                                     workers=args.workers, two_pass=args.two_pass, features_out=features)
+    # comment_id continues the sequence (and keeps the width) of the existing output
+    id_digits = mark.id_digits or len(str(len(df)))
+    engine.output_frame(df, args.column, results, detected_languages, mark.last_id + 1, id_digits, features)
+    if previous is not None:
+        header = pd.read_csv(output, nrows=0, encoding='utf-8').columns.tolist()
+        if sorted(header) != sorted(df.columns):
+            raise SystemExit(f"Columns of the new rows differ from {output}: {sorted(set(header) ^ set(df.columns))}")
+        df[header].to_csv(output, mode='a', header=False, index=False, encoding='utf-8')
+    else:
+        df.to_csv(output, index=False, encoding='utf-8')
+    for column in args.column:
+        print(f"\n{column}:")
+        engine.log_stats(stats[column])
+    mark.last_id += len(df)
+    mark.id_digits = id_digits
+    mark.output_bytes = os.path.getsize(output)
+    mark.save(watermark_path)
+    print(f"{'Appended' if previous is not None else 'Saved'} {len(df)} rows to {output} "
+          f"(comment_id {mark.last_id - len(df) + 1}..{mark.last_id}) in {time.perf_counter() - start:.1f}s")
+
+
+def run_estimate_command(args):
+    """Entry point of the 'estimate' command"""
+    engine = create_engine(args)
+    df = engine.detect_and_read_csv(args.input)
+    missing = [column for column in args.column if column not in df.columns]
+    if missing:
+        raise SystemExit(f"Column(s) not found in {args.input}: {missing}")
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+    report = engine.estimate_run(df, args.column, args.language, engine.get_processing_options(),
+                                 sample_size=args.sample_size)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        engine.log_estimate(report)
+
+
+def run_tune_command(args):
+    """Entry point of the 'tune' command"""
+    engine = create_engine(args)
+    df = engine.detect_and_read_csv(args.input)
+    if args.column not in df.columns:
+        raise SystemExit(f"Column not found in {args.input}: {args.column}")
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+    texts = [df[args.column].iat[i] for i in engine.stratified_sample(df[args.column], args.sample_size)]
+    options = engine.get_processing_options()
+    print(f"Autotuning on {len(texts)} sample rows of '{args.column}' ({os.cpu_count()} CPUs)...")
+    best, _ = engine.autotune(texts, args.language, options)
+    if args.dry_run:
+        print(f"Best: {best}")
+    else:
+        engine.save_tuning(best, args.language, options)
+
+
+def run_lexicon_command(args):
+    """Entry point of the 'lexicon' command"""
+    engine = AdvancedTextProcessor(headless=True)
+    if args.input:
+        words = engine.learn_lexicon(args.input, args.language, args.min_count)
+        print(f"{engine.lexicon_file(args.language)}: {words} words")
+    start = time.perf_counter()
+    index = engine.get_spell_index(args.language)
+    if index is None:
+        raise SystemExit(f"No lexicon for {args.language} ({engine.lexicon_file(args.language)} not found)")
+    print(f"{args.language} spelling index: {len(index)} words, {len(index.keys)} deletes, "
+          f"ready in {time.perf_counter() - start:.1f}s")
+
+
+def run_batch_command(args):
+    """Entry point of the 'batch' command"""
+    engine = create_engine(args)
+    engine.rating_column = args.rating_column
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+
+    def report(job):
+        detail = f" ({job.error})" if job.error else (f", {job.rows} rows in {job.seconds:.1f}s"
+                                                      if job.state == 'done' else "")
+        print(f"{os.path.basename(job.input_path)}: {job.state}{detail}", flush=True)
+
+    batch = BatchQueue(engine, args.column, args.language, engine.get_processing_options(),
+                       output_dir=args.output_dir, name_pattern=args.name, concurrency=args.concurrency,
+                       workers=args.workers, overwrite=args.overwrite, status_callback=report)
+    stop = threading.Event()
+    try:
+        batch.run(args.inputs, args.pattern, args.watch, args.interval, should_stop=stop.is_set)
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nStopped; files in progress were finished or marked stopped.")
+    print(batch.status_table())
+    if any(job.state == 'failed' for job in batch.jobs):
+        raise SystemExit(1)
+
+
+def run_index_command(args):
+    """Entry point of the 'index' command"""
+    path = CsvRowIndex.path_for(args.input)
+    index = CsvRowIndex.load(path, RunCheckpoint.file_identity(args.input))
+    if index is None or index.every != args.every:
+        start = time.perf_counter()
+        index = CsvRowIndex.build(args.input, args.every)
+        index.save(path)
+        print(f"Indexed {index.rows} rows of {args.input} in {time.perf_counter() - start:.1f}s: {path}")
+    else:
+        print(f"{path} is current ({index.rows} rows)")
+    if args.show:
+        encoding = 'utf-8' if CsvRowIndex.decodes(args.input, 'utf-8') else 'latin-1'
+        print(index.read_rows(args.input, *args.show, encoding).to_string())
+
+
+def run_plan_command(args):
+    """Entry point of the 'plan' command"""
+    if args.shards < 1:
+        raise SystemExit("--shards must be at least 1")
+    engine = create_engine(args)
+    engine.rating_column = args.rating_column
+    start = time.perf_counter()
+    try:
+        plan = ShardPlan.create(engine, args.input, args.directory, args.column, args.language,
+                                engine.get_processing_options(), args.shards, args.by, args.key)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    for entry in plan.shards:
+        print(f"{entry['input']}: {entry['rows']} rows")
+    if len(plan.shards) < args.shards:
+        print(f"Only {len(plan.shards)} shards: the file is too small for {args.shards} byte ranges")
+    print(f"Planned {plan.manifest['rows']} rows in {len(plan.shards)} shards ({args.by}) in "
+          f"{time.perf_counter() - start:.1f}s: {os.path.join(args.directory, ShardPlan.MANIFEST)}")
+
+
+def run_shard_command(args):
+    """Entry point of the 'run-shard' command"""
+    try:
+        plan = ShardPlan.load(args.directory, args.claim_timeout * 3600)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.shard is not None and not 0 <= args.shard < len(plan.shards):
+        raise SystemExit(f"No shard {args.shard} (the plan has {len(plan.shards)})")
+    # Options come from the manifest, so every machine cleans the same way
+    engine = AdvancedTextProcessor(headless=True, options=plan.manifest['options'])
+    engine.stanza_pool.memory_budget_mb = args.stanza_memory_mb or None
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+    number = args.shard if args.shard is not None else plan.next_shard()
+    if number is None:
+        print("No unclaimed shards left")
+    while number is not None:
+        entry = plan.shards[number]
+        stats = {}
+        try:
+            done = plan.run_shard(engine, number, args.workers, args.batch_rows, print_progress, stats)
+        except ValueError as e:
+            raise SystemExit(f"{entry['input']}: {e}")
+        for column in plan.manifest['columns']:
+            print(f"\n{column}:")
+            engine.log_stats(stats[column])
+        print(f"{entry['input']}: {done['rows']} rows -> {entry['output']} in {done['seconds']:.1f}s")
+        number = plan.next_shard() if args.shard is None else None
+
+
+def run_merge_command(args):
+    """Entry point of the 'merge' command"""
+    try:
+        plan = ShardPlan.load(args.directory)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    output = args.output or f"{os.path.splitext(plan.manifest['input']['path'])[0]}_processed.csv"
+    start = time.perf_counter()
+    try:
+        rows = plan.merge(output)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    hosts = Counter()
+    for entry in plan.shards:
+        with open(plan.path(plan.shard_names(entry['index'])['done']), 'r', encoding='utf-8') as f:
+            hosts[json.load(f)['host']] += 1
+    print(f"Merged {len(plan.shards)} shards ({', '.join(f'{n} on {host}' for host, n in hosts.items())}): "
+          f"{rows} rows to {output} in {time.perf_counter() - start:.1f}s")
+
+
+def run_service(args):
+    """Entry point of the 'serve' command"""
+    engine = create_engine(args)
+    if engine.options['lemmatize']:
+        print("Waiting for Stanza to load...")
+        engine.stanza_loaded.wait()
+    service = TextCleaningService(engine, args.language, args.max_batch, args.max_latency_ms / 1000.0)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.command == 'serve':
+        run_service(args)
+        return
+    if args.command == 'process':
+        run_process_command(args)
+        return
+    if args.command == 'estimate':
+        run_estimate_command(args)
+        return
+    if args.command == 'tune':
+        run_tune_command(args)
+        return
+    if args.command == 'lexicon':
+        run_lexicon_command(args)
+        return
+    if args.command == 'index':
+        run_index_command(args)
+        return
+    if args.command == 'batch':
+        run_batch_command(args)
+        return
+    if args.command == 'plan':
+        run_plan_command(args)
+        return
+    if args.command == 'run-shard':
+        run_shard_command(args)
+        return
+    if args.command == 'merge':
+        run_merge_command(args)
+        return
     app = AdvancedTextProcessor()
     app.run()
 
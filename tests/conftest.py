@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def atp():
+    """The advanced_text_processor module (tests are skipped where its dependencies are missing)"""
+    pytest.importorskip("stanza")
+    pytest.importorskip("tkinter")
+    import advanced_text_processor
+    return advanced_text_processor
+
+
+@pytest.fixture(scope='session')
+def engine(atp):
+    """Headless engine without Stanza lemmatization"""
+    engine = atp.AdvancedTextProcessor(headless=True, options={'lemmatize': False})
+    engine.tuning = dict(engine.tuning, workers=1)
+    engine.stanza_loaded.wait()
+    return engine
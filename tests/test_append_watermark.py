@@ -0,0 +1,84 @@
+HEADER = "id,review_text,date\n"
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def append(path, text):
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def first_run(atp, path, choice='auto'):
+    frame, mark, how = atp.AppendWatermark.read_new_rows(str(path), None, 'fp', ['review_text'], choice)
+    assert how == 'full'
+    mark.last_id, mark.id_digits = len(frame), 1
+    return frame, mark
+
+
+def test_tail_takes_rows_dated_on_the_last_day(atp, tmp_path):
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "1,iyi,2023-01-15\n2,kötü,2023-01-16\n")
+    frame, mark = first_run(atp, path, 'date')
+    assert mark.column == 'date' and len(frame) == 2
+
+    append(path, "3,aynı gün,2023-01-16\n4,daha eski,2023-01-10\n")
+    frame, mark2, how = atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+    assert how == 'tail'
+    assert frame['id'].tolist() == [3, 4]
+    assert mark2.value.startswith('2023-01-16')
+    assert mark2.rows == 4
+
+
+def test_tail_takes_unordered_ids(atp, tmp_path):
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "10,a,2023-01-01\n20,b,2023-01-02\n")
+    _, mark = first_run(atp, path)
+    append(path, "15,c,2023-01-03\n")
+    frame, mark2, how = atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+    assert how == 'tail' and frame['id'].tolist() == [15]
+    assert mark2.value == 20
+
+
+def test_rewritten_export_uses_the_column_maximum(atp, tmp_path):
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "1,a,2023-01-01\n2,b,2023-01-02\n")
+    _, mark = first_run(atp, path)
+    write(path, HEADER + "1,A (edited),2023-01-01\n2,b,2023-01-02\n3,c,2023-01-03\n")
+    frame, mark2, how = atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+    assert how == 'column' and frame['id'].tolist() == [3]
+    assert mark2.value == 3 and mark2.rows == 3
+
+
+def test_rewritten_export_without_column_is_an_error(atp, tmp_path):
+    import pytest
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "1,a,2023-01-01\n")
+    _, mark = first_run(atp, path, 'none')
+    write(path, HEADER + "9,z,2023-01-01\n")
+    with pytest.raises(ValueError):
+        atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+
+
+def test_partial_last_line_waits_for_the_next_run(atp, tmp_path):
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "1,a,2023-01-01\n")
+    _, mark = first_run(atp, path)
+    append(path, '2,"multi\nline",2023-01-02\n3,half')
+    frame, mark, how = atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+    assert frame['id'].tolist() == [2] and frame['review_text'][0] == "multi\nline"
+    append(path, ' written,2023-01-03\n')
+    frame, mark, how = atp.AppendWatermark.read_new_rows(str(path), mark, 'fp', ['review_text'])
+    assert how == 'tail' and frame['review_text'].tolist() == ["half written"]
+
+
+def test_save_and_load(atp, tmp_path):
+    path = tmp_path / "in.csv"
+    write(path, HEADER + "1,a,2023-01-01\n")
+    _, mark = first_run(atp, path)
+    saved = str(tmp_path / "out.csv.watermark.json")
+    mark.save(saved)
+    assert atp.AppendWatermark.load(saved).__dict__ == mark.__dict__
+    assert atp.AppendWatermark.load(str(tmp_path / "missing.json")) is None
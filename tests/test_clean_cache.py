@@ -0,0 +1,19 @@
+def test_features_survive_the_cache_limit(atp, engine, monkeypatch):
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    monkeypatch.setattr(engine, 'CACHE_LIMIT', 2)
+    engine.reset_caches()
+    first = ["hiç güzel değil", "http://x.co kargo geldi", "@ali çok iyi 😀"]
+    expected_features = []
+    expected = engine.clean_texts(first, 'turkish', options, features=expected_features)
+    assert None not in expected_features
+
+    # The cache now holds more than CACHE_LIMIT entries; this batch hits it for every row
+    features = []
+    results = engine.clean_texts(first + ["yeni bir yorum"], 'turkish', options, features=features)
+    assert results[:3] == expected
+    assert None not in features
+    assert features[:3] == expected_features
+    # Cleared before the next batch, not during it
+    engine.clean_texts(["başka"], 'turkish', options)
+    assert len(engine.get_cache('clean', engine.options_fingerprint(options, 'turkish'), engine.stanza_ready)) == 1
+    engine.reset_caches()
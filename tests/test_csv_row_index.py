@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+# Multi-line quoted fields, escaped quotes, blank lines and CRLF endings
+CSV = ('id,review_text\r\n'
+       '0,"ilk satır\nikinci satır"\r\n'
+       '1,"tırnak "" içinde\n, virgül"\r\n'
+       '\r\n'
+       '2,düz\n'
+       '\n'
+       '3,"son\n\n""satır"""\n'
+       '4,sonuncu\n')
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_bytes(CSV.encode('utf-8'))
+    return str(path)
+
+
+def test_records_follow_quote_parity(atp, csv_path):
+    expected = pd.read_csv(csv_path)
+    index = atp.CsvRowIndex.build(csv_path, every=1)
+    assert index.rows == len(expected) == 5
+    assert index.header_end == atp.CsvRowIndex.header_length(csv_path) == len(b'id,review_text\r\n')
+    for row in range(index.rows):
+        frame = index.read_rows(csv_path, row, 1)
+        assert frame.index.tolist() == [row]
+        assert frame['review_text'].tolist() == expected['review_text'][row:row + 1].tolist()
+
+
+def test_sparse_index_reads_any_rows(atp, csv_path):
+    expected = pd.read_csv(csv_path)
+    index = atp.CsvRowIndex.build(csv_path, every=2)
+    assert len(index.offsets) == 3
+    assert index.seek(3) == (index.offsets[1], 1)
+    assert index.seek(5) == (index.size, 0)
+    frame = index.read_rows(csv_path, 1, 3)
+    assert frame['id'].tolist() == [1, 2, 3]
+    assert frame['review_text'].tolist() == expected['review_text'][1:4].tolist()
+
+
+def test_ranges_cover_every_row_once(atp, csv_path):
+    expected = pd.read_csv(csv_path)
+    index = atp.CsvRowIndex.build(csv_path, every=1)
+    for parts in (1, 2, 3, 10):
+        ranges = index.ranges(parts)
+        assert ranges[0][0] == index.offsets[0] and ranges[-1][1] == index.size
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        frames = [index.read_range(csv_path, 'utf-8', index.header_end, start, end) for start, end in ranges]
+        pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), expected)
+    pd.testing.assert_frame_equal(index.read_csv_parallel(csv_path, 'utf-8', 3), expected)
+
+
+def test_saved_index_is_reused_until_the_file_changes(atp, csv_path):
+    index = atp.CsvRowIndex.open(csv_path, every=2, persist=True)
+    identity = atp.RunCheckpoint.file_identity(csv_path)
+    loaded = atp.CsvRowIndex.load(atp.CsvRowIndex.path_for(csv_path), identity)
+    assert loaded is not None
+    assert (loaded.rows, loaded.header_end, loaded.every, list(loaded.offsets)) == \
+        (index.rows, index.header_end, index.every, list(index.offsets))
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write('5,yeni\n')
+    assert atp.CsvRowIndex.load(atp.CsvRowIndex.path_for(csv_path),
+                                atp.RunCheckpoint.file_identity(csv_path)) is None
+    assert atp.CsvRowIndex.open(csv_path, every=2).rows == 6
+
+
+def test_empty_and_header_only_files(atp, tmp_path):
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b'')
+    assert atp.CsvRowIndex.build(str(empty)).rows == 0
+    header_only = tmp_path / "header.csv"
+    header_only.write_bytes(b'id,review_text\n')
+    index = atp.CsvRowIndex.build(str(header_only))
+    assert (index.rows, index.header_end, index.ranges(4)) == (0, 15, [])
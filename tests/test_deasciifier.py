@@ -0,0 +1,56 @@
+import pytest
+
+
+@pytest.fixture(scope='module')
+def deasciifier(atp):
+    return atp.TurkishDeasciifier.from_lexicon()
+
+
+def test_lowercase_words(deasciifier):
+    assert deasciifier.deasciify("kargo hizli geldi") == "kargo hızlı geldi"
+
+
+def test_capitalised_and_upper_words_keep_their_case(deasciifier):
+    assert deasciifier.deasciify("Dogru urun") == "Doğru ürün"
+    assert deasciifier.deasciify("Hizli ve Guzel") == "Hızlı ve Güzel"
+    assert deasciifier.deasciify("DOGRU") == "DOĞRU"
+
+
+def test_mixed_case_words_are_deasciified_whole(deasciifier):
+    assert deasciifier.deasciify("iPhone dogru") == "iPhone doğru"
+    assert deasciifier.deasciify("DoGRu") == "DoĞRu"
+
+
+def test_words_with_other_letters_or_digits_are_not_split(deasciifier):
+    assert deasciifier.deasciify("café dogru") == "café doğru"
+    assert deasciifier.deasciify("cafédogru ab1dogru") == "cafédogru ab1dogru"
+
+
+def test_unknown_loanwords_keep_their_letters(engine):
+    # The engine's table also knows the Turkish stopwords (şu, şunu, şuna, ...)
+    deasciifier = engine.get_deasciifier()
+    assert deasciifier.deasciify("super 208 support success sushi") == "super 208 support success sushi"
+    assert deasciifier.deasciify("Super urun") == "Super ürün"
+
+
+def test_rows_with_turkish_letters_are_left_alone(deasciifier):
+    assert deasciifier.deasciify("çok dogru") == "çok dogru"
+
+
+def test_folded_rows_are_judged_as_typed(deasciifier):
+    # Turkish casefolding made ı of the I of an ASCII-typed row
+    assert deasciifier.deasciify("ıade ettim urun cok guzel", "Iade ettim urun cok guzel") == \
+        "iade ettim ürün çok güzel"
+    assert deasciifier.deasciify("ılık çok guzel", "Ilık çok guzel") == "ılık çok guzel"
+
+
+@pytest.mark.parametrize('lowercase, text, expected', [
+    (True, "Iade ettim urun cok guzel kargo hizli", "iade ettim ürün çok güzel kargo hızlı"),
+    (True, "IPHONE Kılıfı ILE", "ıphone kılıfı ıle"),
+    (False, "Iade ettim urun cok guzel kargo hizli", "Iade ettim ürün çok güzel kargo hızlı"),
+    (False, "KITAP GUZEL IPHONE", "KITAP GÜZEL IPHONE"),
+    (False, "IPHONE Kılıfı ILE", "IPHONE Kılıfı ILE"),
+])
+def test_preprocessing_keeps_capitalised_rows_deasciifiable(atp, engine, lowercase, text, expected):
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False, lowercase=lowercase)
+    assert engine.preprocess_text(text, 'turkish', options) == expected
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+TEXTS = ["http://x.co/a", "@ali #kargo", "😀😀", "ve", "bu ve şu", "ürün güzel geldi", "kargo hızlı", "", None,
+         "http://x.co/a", "ürün güzel geldi"]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_two_pass_counts_the_same_early_exits(atp, engine, workers):
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    frame = pd.DataFrame({'review_text': TEXTS})
+    outcomes = []
+    for two_pass in (False, True):
+        engine.reset_caches()
+        stats = {}
+        results = engine.process_columns(frame, ['review_text'], 'turkish', options, stats_out=stats,
+                                         workers=workers, two_pass=two_pass)
+        outcomes.append((results, stats['review_text'].skipped))
+    assert outcomes[0] == outcomes[1]
+    assert outcomes[0][1]['preprocess'] == 5  # repeated rows count every time
+    engine.reset_caches()
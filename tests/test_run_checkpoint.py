@@ -0,0 +1,74 @@
+import json
+
+import pandas as pd
+
+
+def write_input(path):
+    path.write_text("review_text\nbir\niki\nüç\n", encoding='utf-8')
+    return str(path)
+
+
+def start(atp, input_path, resume=False, **kwargs):
+    return atp.RunCheckpoint.start(input_path, 'fp', 'turkish', ['review_text'], resume=resume,
+                                   resources={'stopwords': 'v1'}, **kwargs)
+
+
+def test_flushed_chunks_are_resumed(atp, tmp_path):
+    input_path = write_input(tmp_path / "in.csv")
+    checkpoint = start(atp, input_path, every_rows=2)
+    checkpoint.add('review_text', 0, ["bir"], features=[(1, 0)])
+    checkpoint.add('review_text', 1, ["iki"])  # reaches every_rows
+    checkpoint.add('review_text', 2, ["üç"])  # still buffered
+
+    resumed = start(atp, input_path, resume=True)
+    assert resumed.completed == {'review_text': ["bir", "iki"]}
+    assert resumed.features == {'review_text': [(1, 0), None]}
+    assert resumed.completed_rows() == 2
+
+
+def test_partial_and_out_of_order_lines_end_the_resume(atp, tmp_path):
+    input_path = write_input(tmp_path / "in.csv")
+    checkpoint = start(atp, input_path, every_rows=1)
+    checkpoint.add('review_text', 0, ["bir"])
+    with open(checkpoint.path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'column': 'review_text', 'start': 5, 'rows': ["x"]}) + "\n")
+        f.write('{"column": "review_text", "start": 1, "ro')
+    completed, _ = atp.RunCheckpoint.load(checkpoint.path, checkpoint.header)
+    assert completed == {'review_text': ["bir"]}
+
+
+def test_other_runs_start_over(atp, tmp_path):
+    input_path = write_input(tmp_path / "in.csv")
+    checkpoint = start(atp, input_path, every_rows=1)
+    checkpoint.add('review_text', 0, ["bir"])
+    other = atp.RunCheckpoint.make_header(input_path, 'other-fp', 'turkish', ['review_text'], {'stopwords': 'v1'})
+    assert atp.RunCheckpoint.load(checkpoint.path, other) is None
+    # A changed input changes the identity in the header
+    (tmp_path / "in.csv").write_text("review_text\nbaşka\n", encoding='utf-8')
+    assert start(atp, input_path, resume=True).completed == {'review_text': []}
+
+
+def test_resume_off_truncates_and_discard_removes(atp, tmp_path):
+    input_path = write_input(tmp_path / "in.csv")
+    checkpoint = start(atp, input_path, every_rows=1)
+    checkpoint.add('review_text', 0, ["bir"])
+    fresh = start(atp, input_path)
+    assert fresh.completed == {'review_text': []}
+    with open(fresh.path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 1
+    fresh.discard()
+    assert not (tmp_path / "in.csv.checkpoint.jsonl").exists()
+
+
+def test_stopping_keeps_the_finished_chunk(atp, engine, tmp_path):
+    texts = [f"ürün {i} güzel" for i in range(6)]
+    input_path = tmp_path / "in.csv"
+    pd.DataFrame({'review_text': texts}).to_csv(input_path, index=False)
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    checkpoint = start(atp, str(input_path))
+    stops = iter([False, True])
+    results = engine.process_columns(pd.read_csv(input_path), ['review_text'], 'turkish', options, chunk_size=2,
+                                     should_stop=lambda: next(stops), checkpoint=checkpoint, workers=1)
+    assert results is None
+    resumed = start(atp, str(input_path), resume=True)
+    assert resumed.completed == {'review_text': engine.clean_texts(texts[:4], 'turkish', options)}
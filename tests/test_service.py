@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def service(atp, engine):
+    return atp.TextCleaningService(engine)
+
+
+def dispatch(service, request):
+    async def run():
+        batch_task = asyncio.ensure_future(service.batcher.run())
+        await asyncio.sleep(0)
+        try:
+            return await service.dispatch('POST', '/clean', json.dumps(request).encode('utf-8'))
+        finally:
+            batch_task.cancel()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('request_body', [
+    {'text': "x", 'language': "klingon"},
+    {'text': "x", 'options': {'lowercase': "no"}},
+    {'text': "x", 'options': {'lowercase': 1}},
+    {'text': "x", 'options': {'max_tokens': True}},
+    {'text': "x", 'options': {'max_tokens': -1}},
+    {'text': "x", 'options': {'tokenizer': "spacy"}},
+    {'text': "x", 'options': {'colour': True}},
+    {'text': "x", 'options': ["lowercase"]},
+    {'texts': [1, None]},
+    {'texts': "x"},
+    {'text': 5},
+    {},
+])
+def test_invalid_requests_are_rejected(service, request_body):
+    status, payload = dispatch(service, request_body)
+    assert status == 400 and 'error' in payload
+
+
+def test_valid_requests_are_cleaned(service):
+    options = {'lemmatize': False, 'tokenizer': "regex", 'min_tokens': 0}
+    status, payload = dispatch(service, {'texts': ["Ürün GÜZEL geldi", ""], 'options': options})
+    assert (status, payload) == (200, {'results': ["ürün güzel geldi", ""]})
+    status, payload = dispatch(service, {'text': "good product", 'language': "auto", 'options': options})
+    assert status == 200 and payload['result'] == "good product"
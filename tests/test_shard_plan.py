@@ -0,0 +1,118 @@
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+TEXTS = ["Ürün çok güzel geldi", "kargo hiç hızlı değil", "Harika!\nTekrar alırım", "idare eder",
+         "kargo hiç hızlı değil", "berbat bir ürün, \"asla\" almayın"]
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    frame = pd.DataFrame({'id': [f"r{i}" for i in range(60)],
+                          'review_text': [TEXTS[i % len(TEXTS)] + f" {i}" * (i % 2) for i in range(60)]})
+    path = tmp_path / "reviews.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def run_all(plan, engine):
+    for entry in plan.shards:
+        assert plan.claim(entry['index'])
+        plan.run_shard(engine, entry['index'])
+    assert plan.next_shard() is None
+    assert plan.problems() == []
+
+
+@pytest.mark.parametrize('by', ['range', 'hash'])
+def test_merge_restores_input_order(atp, engine, input_path, tmp_path, monkeypatch, by):
+    monkeypatch.setattr(engine, 'rating_column', engine.rating_column)
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    plan = atp.ShardPlan.create(engine, input_path, str(tmp_path / "plan"), ['review_text'], 'turkish',
+                                options, 3, by=by)
+    assert sum(entry['rows'] for entry in plan.shards) == plan.manifest['rows'] == 60
+    if by == 'hash':
+        # Equal keys share a shard
+        shard_of = {}
+        for entry in plan.shards:
+            for text in pd.read_csv(plan.path(entry['input']))['review_text']:
+                assert shard_of.setdefault(text, entry['index']) == entry['index']
+    plan = atp.ShardPlan.load(plan.directory)
+    run_all(plan, engine)
+
+    output = tmp_path / "merged.csv"
+    assert plan.merge(str(output)) == 60
+    merged = pd.read_csv(output, dtype=str, keep_default_na=False)
+    original = pd.read_csv(input_path, dtype=str, keep_default_na=False)
+    assert merged['id'].tolist() == original['id'].tolist()
+    assert merged['comment_id'].tolist() == [f"{i:02d}" for i in range(1, 61)]
+    expected = engine.clean_texts(original['review_text'].tolist(), 'turkish', options)
+    assert merged['review_text_processed'].tolist() == expected
+
+
+def test_merge_refuses_unfinished_or_changed_shards(atp, engine, input_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(engine, 'rating_column', engine.rating_column)
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    plan = atp.ShardPlan.create(engine, input_path, str(tmp_path / "plan"), ['review_text'], 'turkish',
+                                options, 2)
+    plan.run_shard(engine, 0)
+    assert plan.problems() == ["shard-0001.csv: not processed"]
+    with pytest.raises(ValueError, match="not processed"):
+        plan.merge(str(tmp_path / "merged.csv"))
+
+    plan.run_shard(engine, 1)
+    with open(plan.path(plan.shards[0]['output']), 'a', encoding='utf-8') as f:
+        f.write("tampered\n")
+    assert plan.problems() == ["shard-0000.csv: output missing or changed after the run"]
+
+    with open(plan.path(plan.shards[1]['input']), 'a', encoding='utf-8') as f:
+        f.write("r99,yeni\n")
+    with pytest.raises(ValueError, match="does not match the manifest"):
+        plan.run_shard(engine, 1)
+
+
+def test_claims_are_exclusive(atp, engine, input_path, tmp_path):
+    plan = atp.ShardPlan.create(engine, input_path, str(tmp_path / "plan"), ['review_text'], 'turkish',
+                                dict(atp.DEFAULT_OPTIONS, lemmatize=False), 2)
+    assert plan.next_shard() == 0
+    assert plan.next_shard() == 1
+    assert plan.next_shard() is None
+    assert not plan.claim(0)
+
+
+def test_failed_runs_release_their_claim(atp, engine, input_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(engine, 'rating_column', engine.rating_column)
+    plan = atp.ShardPlan.create(engine, input_path, str(tmp_path / "plan"), ['review_text'], 'turkish',
+                                dict(atp.DEFAULT_OPTIONS, lemmatize=False), 2)
+    number = plan.next_shard()
+    with open(plan.path(plan.shards[number]['input']), 'a', encoding='utf-8') as f:
+        f.write("r99,yeni\n")
+    with pytest.raises(ValueError):
+        plan.run_shard(engine, number)
+    assert not os.path.exists(plan.path(plan.shard_names(number)['claim']))
+    assert plan.next_shard() == number
+
+
+def test_stale_claims_are_taken_over(atp, engine, input_path, tmp_path):
+    plan = atp.ShardPlan.create(engine, input_path, str(tmp_path / "plan"), ['review_text'], 'turkish',
+                                dict(atp.DEFAULT_OPTIONS, lemmatize=False), 3)
+    names = [plan.path(plan.shard_names(number)['claim']) for number in range(3)]
+    # A dead process on this host, a live one elsewhere, and a live one elsewhere that timed out
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    for path, owner in zip(names, [f"{platform.node()} {dead.pid}", "other-host 1", "other-host 2"]):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(owner + "\n")
+    old = time.time() - plan.claim_timeout - 60
+    os.utime(names[2], (old, old))
+
+    assert plan.next_shard() == 0
+    assert plan.next_shard() == 2
+    assert plan.next_shard() is None
+    with open(names[0], encoding='utf-8') as f:
+        assert f.read().strip() == plan.claim_owner()
+    assert not [name for name in os.listdir(plan.directory) if name.endswith('.stale')]
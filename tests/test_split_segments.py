@@ -0,0 +1,28 @@
+def test_long_rows_are_cut_after_sentence_ends(engine):
+    tokens = ["a"] * 5 + ["."] + ["b"] * 5 + ["!"] + ["c"] * 3
+    segments = engine.split_segments(tokens, max_tokens=8)
+    assert segments == [["a"] * 5 + ["."], ["b"] * 5 + ["!"], ["c"] * 3]
+
+
+def test_rows_without_sentence_ends_are_cut_at_max_tokens(engine):
+    tokens = [f"w{i}" for i in range(20)]
+    segments = engine.split_segments(tokens, max_tokens=8)
+    assert [len(segment) for segment in segments] == [8, 8, 4]
+    assert sum(segments, []) == tokens
+
+
+def test_short_rows_stay_whole(engine):
+    assert engine.split_segments(["bir", "iki"], max_tokens=8) == [["bir", "iki"]]
+
+
+def test_sentence_ends_reach_the_token_stages_only_when_punctuation_is_kept(atp, engine):
+    text = "Ürün güzel geldi. Kargo çok hızlıydı! Tekrar alırım."
+    for kept, expect_ends in ((False, False), (True, True)):
+        options = dict(atp.DEFAULT_OPTIONS, lemmatize=False, punctuation=not kept, special_chars=not kept)
+        tokens = engine.advanced_tokenize(engine.preprocess_text(text, 'turkish', options), 'turkish',
+                                          options['tokenizer'])
+        ends = [token for token in tokens if token[-1:] in engine.SENTENCE_END_CHARS]
+        assert bool(ends) == expect_ends
+        if kept:
+            assert [segment[-1] for segment in engine.split_segments(tokens, max_tokens=4)] == \
+                ["geldi.", "hızlıydı!", "alırım."]
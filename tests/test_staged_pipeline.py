@@ -0,0 +1,10 @@
+def test_prepare_texts_keeps_the_vocabulary_bounded(atp, engine, monkeypatch):
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False)
+    monkeypatch.setattr(engine, 'CACHE_LIMIT', 50)
+    for batch in range(20):
+        texts = [f"yorum{batch}x{i} kargo{i} ürün{batch}y{i} güzel" for i in range(10)]
+        prepared = engine.prepare_texts(texts, 'turkish', options)
+        assert len(prepared) == 10 and all(prepared)
+        # One batch can go over the limit; the next one starts a new vocabulary
+        assert len(engine.vocab) <= 50 + 3 * len(texts) + 1
+        assert len(engine.vocab.memo) <= len(engine.vocab)
@@ -0,0 +1,33 @@
+from collections import Counter
+
+
+def test_heavy_hitters_keep_the_top_items_with_bounded_over_counts(atp):
+    hitters = atp.HeavyHitters(capacity=3)
+    exact = Counter()
+    for chunk in ([("a", 50), ("b", 30), ("c", 20)], [(f"rare{i}", 1) for i in range(10)],
+                  [("a", 5), ("d", 25), ("e", 2)], [(f"tail{i}", 2) for i in range(8)]):
+        counter = Counter(dict(chunk))
+        exact.update(counter)
+        hitters.update(counter)
+        assert len(hitters.counts) <= 2 * hitters.capacity
+    assert [item for item, _ in hitters.top(3)] == ["a", "b", "d"]
+    for item, count in hitters.counts.items():
+        assert exact[item] <= count <= exact[item] + hitters.floor
+
+
+def test_streaming_stats_add_up_over_chunks(atp):
+    originals = ["Ürün güzel", None, "kargo kargo geldi", "!!!"]
+    processed = ["ürün güzel", "", "kargo kargo gel", ""]
+    languages = ["turkish", "unknown", "turkish", "unknown"]
+    stats = atp.StreamingStats()
+    stats.add(originals[:2], processed[:2], languages[:2])
+    stats.add(originals[2:], processed[2:], languages[2:])
+    assert stats.rows == 4
+    assert stats.original_non_empty == 3
+    assert stats.processed_empty == 2
+    assert (stats.original_length.count, stats.original_length.mean) == (3, 10.0)
+    assert (stats.tokens.count, stats.tokens.mean) == (4, 1.25)
+    assert stats.top_tokens.top(1) == [("kargo", 2)]
+    assert stats.top_tokens.counts == {"ürün": 1, "güzel": 1, "kargo": 2, "gel": 1}
+    assert stats.top_bigrams.counts == {("ürün", "güzel"): 1, ("kargo", "kargo"): 1, ("kargo", "gel"): 1}
+    assert stats.languages == Counter({"turkish": 2, "unknown": 2})
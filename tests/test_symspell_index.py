@@ -0,0 +1,58 @@
+import pytest
+
+LEXICON = {'güzel': 50, 'gözel': 100, 'hiç': 40, 'hic': 1, 'kargo': 30, 'kargocu': 5, 'teslimat': 20,
+           'değil': 60, 'iade': 10, 'ide': 12}
+
+
+@pytest.fixture(scope='module')
+def index(atp):
+    return atp.SymSpellIndex.build(LEXICON, max_distance=2, prefix_length=7, fingerprint='lex-v1')
+
+
+def test_lookup_ranks_by_distance_diacritics_and_count(index):
+    assert index.lookup('güzel') == ('güzel', 0)
+    # As close and more frequent, but 'gözel' differs in more than its diacritics
+    assert index.lookup('guzel') == ('güzel', 1)
+    assert index.lookup('gzel') == ('gözel', 1)
+    assert index.lookup('hıç') == ('hiç', 1)
+    assert index.lookup('kargp') == ('kargo', 1)
+    assert index.lookup('tselimat') == ('teslimat', 1)  # transposition
+    assert index.lookup('iadee') == ('iade', 1)
+    assert index.lookup('ide') == ('ide', 0)
+    assert index.lookup('teslimatlarımız') is None
+    assert index.lookup('12.5') is None
+    assert index.lookup('kargocuyla', max_distance=1) is None
+
+
+def test_lookup_matches_a_brute_force_search(atp, index):
+    words = sorted(LEXICON)
+    for word in ['gzel', 'hiçç', 'krgo', 'degil', 'teslmt', 'iadde', 'xyz', 'kargocuu']:
+        found = index.lookup(word)
+        distances = {candidate: atp.SymSpellIndex.edit_distance(word, candidate, 2) for candidate in words}
+        best = min(distances.values())
+        if best > 2:
+            assert found is None
+        else:
+            assert found is not None and found[1] == best and distances[found[0]] == best
+
+
+def test_saved_index_loads_only_for_its_lexicon(atp, index, tmp_path):
+    path = str(tmp_path / "symspell.idx")
+    index.save(path)
+    loaded = atp.SymSpellIndex.load(path, 'lex-v1')
+    assert loaded.words == index.words
+    assert list(loaded.counts) == list(index.counts) and list(loaded.keys) == list(index.keys)
+    assert loaded.lookup('guzel') == ('güzel', 1)
+    assert atp.SymSpellIndex.load(path, 'lex-v2') is None
+    assert atp.SymSpellIndex.load(str(tmp_path / "missing.idx"), 'lex-v1') is None
+    with open(path, 'r+b') as f:
+        f.truncate(40)
+    assert atp.SymSpellIndex.load(path, 'lex-v1') is None
+
+
+def test_lexicon_files_round_trip(atp, tmp_path):
+    path = str(tmp_path / "lexicon.txt")
+    atp.SymSpellIndex.write_lexicon(path, LEXICON)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("kargo 5\nyeni\n\n")
+    assert atp.SymSpellIndex.read_lexicon(path) == dict(LEXICON, kargo=35, yeni=1)
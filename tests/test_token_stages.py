@@ -0,0 +1,48 @@
+import itertools
+
+import pytest
+
+TOKEN_ROWS = {
+    'turkish': [
+        ["bu", "ürün", "hiç", "güzel", "değil", "ve", "a", "x", "ı", "beğenmedim"],
+        ["değil"],
+        ["yok", "yok", "kargo", "hızlı", "ama", "gelmedi", "b"],
+        ["Ürün", "GÜZEL", "İyi", "ki", "almışım", "mi", "ve", "değil"],
+        ["kaliteli", "ürn", "tavsiye", "ederim", ",", "!", "o"],
+        [],
+    ],
+    'english': [
+        ["this", "is", "not", "good", "and", "i", "a", "x", "don't", "like", "it"],
+        ["not"],
+        ["Never", "never", "buy", "cant", "won't", "work", "b"],
+        ["The", "product", "wasn't", "bad", "at", "all", "!", "u"],
+        ["graet", "prodcut", "reccomend", "it"],
+        [],
+    ],
+}
+OPTION_NAMES = ('negation', 'stopwords', 'spellcheck', 'use_custom_corrections')
+
+
+def option_sets(atp):
+    for values in itertools.product([False, True], repeat=len(OPTION_NAMES)):
+        yield dict(atp.DEFAULT_OPTIONS, lemmatize=False, **dict(zip(OPTION_NAMES, values)))
+
+
+@pytest.mark.parametrize('language', sorted(TOKEN_ROWS))
+def test_fused_and_id_stages_match_the_staged_stages(atp, engine, language):
+    vocab = engine.vocab
+    for options in option_sets(atp):
+        for tokens in TOKEN_ROWS[language]:
+            staged = engine.process_tokens_staged(list(tokens), language, options, [])
+            fused = ' '.join(engine.process_tokens_fused(list(tokens), language, options))
+            by_ids = ' '.join(vocab.decode(engine.process_ids_fused(vocab.encode(tokens), language, options, vocab)))
+            assert fused == staged, (options, tokens)
+            assert by_ids == staged, (options, tokens)
+
+
+def test_changes_count_negations_and_corrections(atp, engine):
+    options = dict(atp.DEFAULT_OPTIONS, lemmatize=False, negation=True, stopwords=False, spellcheck=False)
+    changes = []
+    result = engine.process_tokens_fused(["hiç", "güzel", "gelmez", "kargo"], 'turkish', options, changes=changes)
+    assert result == ["güzel_NEG", "gel_NEG", "kargo"]
+    assert changes == [(2, 0)]